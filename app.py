@@ -1,14 +1,36 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, Response
 import os
-import subprocess
+import sys
+import json
 import re
-import ast
+import glob
+import time
+import threading
+from collections import OrderedDict
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'  # Change this in production
 
 OUTPUTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Outputs')
-TOOLS_MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools', 'main.py')
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools')
+
+# Shared helpers live next to the tool modules
+sys.path.insert(0, TOOLS_DIR)
+import line_index
+import compression
+import records
+import store
+import summary
+import progress
+import jobs
+
+# Parsed results cache: (domain, file suffix) -> (mtime_ns, size, parsed value).
+# Entries are weighed by the size of the file they were parsed from and evicted
+# least-recently-used first once the total goes over the budget.
+RESULTS_CACHE_MAX_BYTES = int(os.environ.get('RESULTS_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+_results_cache = OrderedDict()
+_results_cache_bytes = 0
+_results_cache_lock = threading.Lock()
 
 # Helper to get all files for a domain
 def get_domain_files(domain):
@@ -20,16 +42,16 @@ def get_domain_files(domain):
 
 # Helper to read file content (text or json)
 def read_file_content(filepath):
-    if filepath.endswith('.json'):
+    if filepath.endswith(('.json', '.json.gz')):
         try:
             import json
-            with open(filepath, 'r') as f:
+            with compression.open_text(filepath) as f:
                 return json.load(f)
         except Exception as e:
             return f"[Error reading JSON: {e}]"
     else:
         try:
-            with open(filepath, 'r') as f:
+            with compression.open_text(filepath) as f:
                 return f.read()
         except Exception as e:
             return f"[Error reading file: {e}]"
@@ -37,8 +59,8 @@ def read_file_content(filepath):
 # --- New helpers for pretty results ---
 def read_lines(filepath):
     try:
-        with open(filepath, 'r') as f:
-            return [line.strip() for line in f if line.strip()]
+        with compression.open_text(filepath) as f:
+            return [line for line in map(str.strip, f) if line]
     except Exception as e:
         return [f"[Error reading file: {e}]"]
 
@@ -46,7 +68,7 @@ def read_json_lines(filepath):
     import json
     lines = []
     try:
-        with open(filepath, 'r') as f:
+        with compression.open_text(filepath) as f:
             for line in f:
                 line = line.strip()
                 if line:
@@ -58,168 +80,341 @@ def read_json_lines(filepath):
         lines.append({'error': str(e)})
     return lines
 
-def clean_evidence_text(text):
-    if not text:
-        return ''
-    import re
-    # Remove tabs, newlines, carriage returns, and collapse multiple spaces
-    cleaned = re.sub(r'[\t\n\r]+', ' ', text)
-    cleaned = re.sub(r' +', ' ', cleaned)
-    # Remove all leading whitespace (including tabs and spaces)
-    cleaned = re.sub(r'^\s+', '', cleaned)
-    return cleaned.strip()
-
-def safe_parse_evidence(evidence):
-    if not evidence:
-        return []
+def load_records(iterate):
+    """cached_parse loader that materialises one of the records.iter_* parsers."""
+    def loader(filepath):
+        try:
+            return list(iterate(filepath))
+        except OSError:
+            return []
+    return loader
+
+def cached_parse(domain, suffix, loader, default=None):
+    """Return loader(path) for Outputs/{domain}_{suffix}, re-parsing only when
+    the file's mtime or size changed since it was last parsed."""
+    global _results_cache_bytes
+    path = compression.resolve(os.path.join(OUTPUTS_DIR, f'{domain}_{suffix}'))
+    try:
+        st = os.stat(path)
+    except OSError:
+        return default
+    key = (domain, suffix)
+    with _results_cache_lock:
+        entry = _results_cache.get(key)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            _results_cache.move_to_end(key)
+            return entry[2]
+    value = loader(path)
+    with _results_cache_lock:
+        old = _results_cache.pop(key, None)
+        if old:
+            _results_cache_bytes -= old[1]
+        if st.st_size <= RESULTS_CACHE_MAX_BYTES:
+            _results_cache[key] = (st.st_mtime_ns, st.st_size, value)
+            _results_cache_bytes += st.st_size
+        while _results_cache_bytes > RESULTS_CACHE_MAX_BYTES and _results_cache:
+            _, evicted = _results_cache.popitem(last=False)
+            _results_cache_bytes -= evicted[1]
+    return value
+
+def load_emails(filepath):
     try:
-        if evidence.startswith('[') and evidence.endswith(']'):
-            import ast
-            items = ast.literal_eval(evidence)
-            return [clean_evidence_text(str(item)) for item in items]
-        return [clean_evidence_text(evidence)]
+        import json
+        with compression.open_text(filepath) as f:
+            data_json = json.load(f)
+        return data_json.get('emails', [])
     except Exception:
-        return [clean_evidence_text(evidence)]
-
-def parse_fuzzing_vulns(lines):
-    parsed = []
-    for line in lines:
-        # Example: [type] [protocol] [severity] url [evidence] [extra] [method]
-        m = re.match(r'\[(.*?)\] \[(.*?)\] \[(.*?)\] (\S+) (\[.*?\])? ?(\[.*?\])? ?(\[.*?\])?', line)
-        if m:
-            type_, proto, severity, url, evidence, extra, method = m.groups()
-            parsed.append({
-                'type': type_,
-                'protocol': proto,
-                'severity': severity,
-                'url': url,
-                'evidence': safe_parse_evidence(evidence),
-                'extra': extra,
-                'method': method
-            })
-        else:
-            parsed.append({'raw': line})
-    return parsed
-
-def parse_nuclei_vulns(lines):
-    parsed = []
-    for line in lines:
-        # Example: [type] [protocol] [severity] target [evidence]
-        m = re.match(r'\[(.*?)\] \[(.*?)\] \[(.*?)\] \[(.*?)\] (\S+)(?: (\[.*\]))?', line)
-        if m:
-            type_, proto, severity, extra, target, evidence = m.groups()
-            parsed.append({
-                'type': type_,
-                'protocol': proto,
-                'severity': severity,
-                'extra': extra,
-                'target': target,
-                'evidence': safe_parse_evidence(evidence)
-            })
-        else:
-            # fallback: try to parse without [extra]
-            m2 = re.match(r'\[(.*?)\] \[(.*?)\] \[(.*?)\] (\S+)(?: (\[.*\]))?', line)
-            if m2:
-                type_, proto, severity, target, evidence = m2.groups()
-                parsed.append({
-                    'type': type_,
-                    'protocol': proto,
-                    'severity': severity,
-                    'extra': '',
-                    'target': target,
-                    'evidence': safe_parse_evidence(evidence)
-                })
-            else:
-                parsed.append({'raw': line})
-    return parsed
-
-def parse_fuzzing_dirs(lines):
-    parsed = []
-    for line in lines:
-        m = re.match(r'(.+?) \(Status: (\d+)\)', line)
-        if m:
-            path, status = m.groups()
-            parsed.append({
-                'path': path.strip(),
-                'status': status.strip()
-            })
-        else:
-            parsed.append({'raw': line})
-    return parsed
+        return []
 
 def parse_results(domain):
     data = {}
     # Active subdomains
-    subdomain_file = os.path.join(OUTPUTS_DIR, f'{domain}_subdomain.txt')
-    if os.path.exists(subdomain_file):
-        data['active_subdomains'] = read_lines(subdomain_file)
-    else:
-        data['active_subdomains'] = []
+    data['active_subdomains'] = cached_parse(domain, 'subdomain.txt', read_lines, [])
     # All subdomains
-    overall_file = os.path.join(OUTPUTS_DIR, f'{domain}_overall_subdomain.txt')
-    if os.path.exists(overall_file):
-        data['all_subdomains'] = read_lines(overall_file)
-    else:
-        data['all_subdomains'] = []
+    data['all_subdomains'] = cached_parse(domain, 'overall_subdomain.txt', read_lines, [])
     # Open ports
-    naabu_file = os.path.join(OUTPUTS_DIR, f'{domain}_naabu.json')
-    if os.path.exists(naabu_file):
-        data['open_ports'] = read_json_lines(naabu_file)
-    else:
-        data['open_ports'] = []
+    data['open_ports'] = cached_parse(domain, 'naabu.json', load_records(records.iter_ports), [])
     # Directory fuzzing
-    dirfuzz_file = os.path.join(OUTPUTS_DIR, f'{domain}_directory_fuzz.json')
-    if os.path.exists(dirfuzz_file):
-        lines = read_lines(dirfuzz_file)
-        data['directories'] = lines
-        data['directories_parsed'] = parse_fuzzing_dirs(lines)
-    else:
-        data['directories'] = []
-        data['directories_parsed'] = []
+    data['directories'] = data['directories_parsed'] = cached_parse(
+        domain, 'directory_fuzz.json', load_records(records.iter_dirs), [])
     # URL finder
-    urlfinder_file = os.path.join(OUTPUTS_DIR, f'{domain}_urlfinder.json')
-    if os.path.exists(urlfinder_file):
-        data['endpoints'] = read_json_lines(urlfinder_file)
-    else:
-        data['endpoints'] = []
+    data['endpoints'] = cached_parse(domain, 'urlfinder.json', load_records(records.iter_endpoints), [])
     # Vulnerabilities (DAST)
-    vuln_file = os.path.join(OUTPUTS_DIR, f'{domain}_vulnerabilities.json')
-    if os.path.exists(vuln_file):
-        lines = read_lines(vuln_file)
-        data['fuzzing_vulns'] = lines
-        data['fuzzing_vulns_parsed'] = parse_fuzzing_vulns(lines)
-    else:
-        data['fuzzing_vulns'] = []
-        data['fuzzing_vulns_parsed'] = []
+    data['fuzzing_vulns'] = data['fuzzing_vulns_parsed'] = cached_parse(
+        domain, 'vulnerabilities.json', load_records(records.iter_dast_findings), [])
     # HTTPX (tech info)
-    httpx_file = os.path.join(OUTPUTS_DIR, f'{domain}_httpx.json')
-    if os.path.exists(httpx_file):
-        data['httpx'] = read_json_lines(httpx_file)
-    else:
-        data['httpx'] = []
+    data['httpx'] = cached_parse(domain, 'httpx.json', load_records(records.iter_http), [])
     # Nuclei (vulns)
-    nuclei_file = os.path.join(OUTPUTS_DIR, f'{domain}_nuclei.json')
-    if os.path.exists(nuclei_file):
-        lines = read_lines(nuclei_file)
-        data['nuclei_vulns'] = lines
-        data['nuclei_vulns_parsed'] = parse_nuclei_vulns(lines)
-    else:
-        data['nuclei_vulns'] = []
-        data['nuclei_vulns_parsed'] = []
+    data['nuclei_vulns'] = data['nuclei_vulns_parsed'] = cached_parse(
+        domain, 'nuclei.json', load_records(records.iter_findings), [])
     # Emails
-    email_file = os.path.join(OUTPUTS_DIR, f'{domain}_emails.json')
-    if os.path.exists(email_file):
-        try:
-            import json
-            with open(email_file, 'r') as f:
-                data_json = json.load(f)
-            data['emails_parsed'] = data_json.get('emails', [])
-        except Exception:
-            data['emails_parsed'] = []
-    else:
-        data['emails_parsed'] = []
+    data['emails_parsed'] = cached_parse(domain, 'emails.json', load_emails, [])
     return data
 
+def load_summary(domain):
+    """The scan's precomputed summary, or one built from a full parse when the
+    scan wrote none or its outputs changed afterwards."""
+    doc = summary.load_summary(domain, OUTPUTS_DIR)
+    if doc is None:
+        data = parse_results(domain)
+        doc = summary.summarize({name: data[name] for name in summary.SECTIONS}, data['emails_parsed'])
+        doc['domain'] = domain
+    return doc
+
+# --- Scan jobs ---
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager():
+    # Created on first use so spawned worker processes re-importing this
+    # module do not start job managers of their own
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = jobs.ScanJobManager()
+        return _job_manager
+
+@app.route('/status')
+@app.route('/status/<domain>')
+def scan_status(domain=None):
+    if domain is None:
+        return jsonify(get_job_manager().status())
+    job = get_job_manager().status(domain)
+    if job is None:
+        abort(404)
+    if job['status'] == jobs.QUEUED:
+        job['position'] = get_job_manager().position(domain)
+    return jsonify(job)
+
+# --- Live scan progress (server-sent events) ---
+EVENTS_POLL_SECONDS = 0.5
+EVENTS_KEEPALIVE_SECONDS = 15
+
+def sse(event, data, event_id=None):
+    message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return f"id: {event_id}\n{message}" if event_id is not None else message
+
+def stream_scan_events(domain, offset=0):
+    """Yield a scan's progress events as SSE messages until it ends. The event
+    id is the byte offset in the progress file, so a reconnecting browser
+    (Last-Event-ID) resumes where it left off."""
+    manager = get_job_manager()
+    last_sent = time.time()
+    while True:
+        job = manager.status(domain)
+        if job and job['status'] == jobs.QUEUED:
+            yield sse('queued', {'domain': domain, 'position': manager.position(domain)})
+            last_sent = time.time()
+            time.sleep(EVENTS_KEEPALIVE_SECONDS / 5)
+            continue
+        ended = False
+        for next_offset, event in progress.read_events(domain, offset):
+            if (offset == 0 and job and job['started_at'] and event['event'] == 'scan_start'
+                    and event['time'] < job['started_at']):
+                # The previous scan's file; the worker has not replaced it yet
+                break
+            offset = next_offset
+            yield sse(event['event'], event, offset)
+            last_sent = time.time()
+            ended = event['event'] == 'scan_end'
+        if ended:
+            return
+        if job and job['status'] in (jobs.FINISHED, jobs.PARTIAL, jobs.FAILED) and job['finished_at'] \
+                and time.time() - job['finished_at'] > EVENTS_KEEPALIVE_SECONDS:
+            # The worker exited without a scan_end (killed, crashed)
+            yield sse('scan_end', {'domain': domain, 'status': jobs.FAILED, 'error': job.get('error')})
+            return
+        if job is None and not os.path.exists(progress.path(domain)):
+            yield sse('scan_end', {'domain': domain, 'status': 'unknown'})
+            return
+        if time.time() - last_sent > EVENTS_KEEPALIVE_SECONDS:
+            yield ': keepalive\n\n'
+            last_sent = time.time()
+        time.sleep(EVENTS_POLL_SECONDS)
+
+@app.route('/events/<domain>')
+def scan_events(domain):
+    if not DOMAIN_RE.match(domain):
+        abort(404)
+    try:
+        offset = max(int(request.headers.get('Last-Event-ID', 0)), 0)
+    except ValueError:
+        offset = 0
+    return Response(stream_scan_events(domain, offset), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# --- Paginated JSON API for result sections ---
+DOMAIN_RE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9.-]*$')
+API_MAX_LIMIT = 1000
+
+# section -> (file suffix, line parser, {query param: record field})
+RESULT_SECTIONS = {
+    'subdomains': ('subdomain.txt', records.parse_subdomain, {}),
+    'all_subdomains': ('overall_subdomain.txt', records.parse_subdomain, {}),
+    'ports': ('naabu.json', records.parse_port, {'host': 'host', 'ip': 'ip', 'port': 'port', 'cdn': 'cdn_name'}),
+    'endpoints': ('urlfinder.json', records.parse_endpoint, {'source': 'source'}),
+    'httpx': ('httpx.json', records.parse_http, {'status': 'status_code', 'webserver': 'webserver', 'cdn': 'cdn_name'}),
+    'directories': ('directory_fuzz.json', records.parse_dir, {'status': 'status'}),
+    'fuzzing_vulns': ('vulnerabilities.json', records.parse_dast_finding, {'severity': 'severity'}),
+    'nuclei_vulns': ('nuclei.json', records.parse_finding, {'severity': 'severity'}),
+}
+
+# section -> (store table, fixed column filters)
+STORE_SECTIONS = {
+    'subdomains': ('subdomains', {'source': 'resolved'}),
+    'all_subdomains': ('subdomains', {'source': 'all'}),
+    'ports': ('ports', {}),
+    'endpoints': ('endpoints', {}),
+    'httpx': ('http', {}),
+    'directories': ('directories', {}),
+    'fuzzing_vulns': ('findings', {'kind': 'dast'}),
+    'nuclei_vulns': ('findings', {'kind': 'nuclei'}),
+}
+
+def store_scan_for(domain, path):
+    """Latest ingested scan ID if it is at least as new as the output file."""
+    try:
+        row = store.latest_scan(domain)
+    except Exception:
+        return None
+    if not row:
+        return None
+    try:
+        if os.path.getmtime(path) > row[1]:
+            return None
+    except OSError:
+        pass
+    return row[0]
+
+def query_section(domain, section, offset=0, limit=100, q='', filters=None):
+    suffix, parse_line, _ = RESULT_SECTIONS[section]
+    path = compression.resolve(os.path.join(OUTPUTS_DIR, f'{domain}_{suffix}'))
+    filters = {k: v for k, v in (filters or {}).items() if v}
+
+    scan_id = store_scan_for(domain, path)
+    if scan_id is not None:
+        table, where = STORE_SECTIONS[section]
+        total, lines = store.query(table, scan_id, dict(where, **filters), q, offset=offset, limit=limit)
+        return total, [parse_line(line) for line in lines]
+
+    q = q.lower()
+
+    if not q and not filters:
+        # Unfiltered pages come straight from the line-offset index
+        lines = line_index.read_line_range(path, offset, limit)
+        return line_index.count_lines(path), [parse_line(line) for line in lines]
+
+    total = 0
+    items = []
+    for line in line_index.iter_lines(path):
+        if q and q not in line.lower():
+            continue
+        record = parse_line(line)
+        if any(str(record.get(field, '')) != value for field, value in filters.items()):
+            continue
+        if offset <= total < offset + limit:
+            items.append(record)
+        total += 1
+    return total, items
+
+@app.route('/api/<domain>/<section>')
+def api_section(domain, section):
+    if not DOMAIN_RE.match(domain) or section not in RESULT_SECTIONS:
+        abort(404)
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', 100)), 1), API_MAX_LIMIT)
+    except ValueError:
+        abort(400)
+    field_map = RESULT_SECTIONS[section][2]
+    filters = {field: request.args.get(param, '').strip() for param, field in field_map.items()}
+    total, items = query_section(domain, section, offset, limit,
+                                 request.args.get('q', '').strip(), filters)
+    return jsonify({'section': section, 'total': total, 'offset': offset,
+                    'limit': limit, 'items': [item.as_dict() for item in items]})
+
+@app.route('/api/search')
+def api_search():
+    """Hosts (or URLs with kind=url) across the latest scan of every domain,
+    e.g. /api/search?q=api&tech=nginx&status=200,301"""
+    kind = request.args.get('kind', 'host')
+    domain = request.args.get('domain', '').strip() or None
+    if kind not in ('host', 'url') or (domain and not DOMAIN_RE.match(domain)):
+        abort(400)
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', 100)), 1), API_MAX_LIMIT)
+    except ValueError:
+        abort(400)
+    terms = {}
+    for field in store.SEARCH_FIELDS:
+        values = [v for arg in request.args.getlist(field) for v in arg.split(',') if v.strip()]
+        if values:
+            terms[field] = values
+    start = time.perf_counter()
+    total, items = store.search(request.args.get('q', '').strip(), terms, domain, kind, offset, limit)
+    return jsonify({'total': total, 'total_is_exact': total < store.SEARCH_COUNT_LIMIT,
+                    'offset': offset, 'limit': limit, 'items': items,
+                    'took_ms': round((time.perf_counter() - start) * 1000, 2)})
+
+# --- Tool execution metrics ---
+def load_metrics():
+    rows = []
+    for path in glob.glob(os.path.join(OUTPUTS_DIR, '*_metrics.json')):
+        rows.extend(r for r in read_json_lines(path) if 'stage' in r)
+    return rows
+
+# Stages recorded per shard as well as once for the whole sharded run
+SHARD_SUFFIX = '_shard'
+
+def aggregate_metrics(rows):
+    stages = {}
+
+    def stage_entry(name):
+        return stages.setdefault(name, {
+            'stage': name, 'runs': 0, 'failures': 0, 'wall_seconds': 0.0,
+            'cpu_seconds': 0.0, 'max_rss_kb': 0, 'input_lines': 0, 'output_lines': 0,
+            'scans': []
+        })
+
+    for r in rows:
+        cpu = (r.get('cpu_user_seconds') or 0) + (r.get('cpu_system_seconds') or 0)
+        if r['stage'].endswith(SHARD_SUFFIX):
+            # The parent stage's own record already covers the shards' wall
+            # time; only their CPU and memory are added to it
+            s = stage_entry(r['stage'][:-len(SHARD_SUFFIX)])
+            s['cpu_seconds'] += cpu
+            s['max_rss_kb'] = max(s['max_rss_kb'], r.get('max_rss_kb') or 0)
+            continue
+        s = stage_entry(r['stage'])
+        s['runs'] += 1
+        if r.get('exit_code') not in (0, None):
+            s['failures'] += 1
+        s['wall_seconds'] += r.get('wall_seconds') or 0
+        s['cpu_seconds'] += cpu
+        s['max_rss_kb'] = max(s['max_rss_kb'], r.get('max_rss_kb') or 0)
+        s['input_lines'] += r.get('input_lines') or 0
+        s['output_lines'] += r.get('output_lines') or 0
+        s['scans'].append({'domain': r['domain'], 'input_lines': r.get('input_lines'),
+                           'wall_seconds': r.get('wall_seconds')})
+    # A stage seen only through its shards (its run record was lost) has no runs
+    stages = {name: s for name, s in stages.items() if s['runs']}
+    total_wall = sum(s['wall_seconds'] for s in stages.values()) or 1
+    for s in stages.values():
+        s['mean_wall_seconds'] = s['wall_seconds'] / s['runs']
+        s['share'] = s['wall_seconds'] / total_wall
+        # How the stage scales with target size
+        s['seconds_per_1k_input_lines'] = (s['wall_seconds'] / s['input_lines'] * 1000) if s['input_lines'] else None
+        s['scans'].sort(key=lambda x: x['input_lines'] or 0)
+    return sorted(stages.values(), key=lambda s: s['wall_seconds'], reverse=True)
+
+@app.route('/metrics')
+def metrics():
+    stages = aggregate_metrics(load_metrics())
+    if request.args.get('format') == 'json':
+        return jsonify(stages)
+    return render_template('metrics.html', stages=stages)
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
@@ -227,18 +422,26 @@ def index():
         if not domain:
             flash('Please enter a domain name.', 'danger')
             return redirect(url_for('index'))
+        if not DOMAIN_RE.match(domain):
+            flash(f'"{domain}" is not a valid domain name.', 'danger')
+            return redirect(url_for('index'))
         subdomain_file = os.path.join(OUTPUTS_DIR, f'{domain}_subdomain.txt')
-        if os.path.exists(subdomain_file):
-            # Parse and organize all results for this domain
-            results = parse_results(domain)
-            return render_template('results.html', domain=domain, results=results)
+        if compression.exists(subdomain_file):
+            return render_template('results.html', domain=domain, summary=load_summary(domain))
         else:
             try:
-                subprocess.Popen(['python3', TOOLS_MAIN, '-d', domain, '--all'])
-                flash(f'Scan started for {domain}. Please refresh this page after a while.', 'info')
+                manager = get_job_manager()
+                job, created = manager.submit(domain)
+                position = manager.position(domain)
+                if not created:
+                    flash(f'A scan for {domain} is already {job["status"]}.', 'info')
+                elif position:
+                    flash(f'Scan queued for {domain} (position {position}).', 'info')
             except Exception as e:
                 flash(f'Failed to start scan: {e}', 'danger')
-            return redirect(url_for('index'))
+                return redirect(url_for('index'))
+            # The page follows the scan over /events/<domain>
+            return render_template('index.html', scan_started_domain=domain)
     return render_template('index.html')
 
 if __name__ == '__main__':
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Offline checks for tools/resolver.py against the stub DNS server
+(stubs/dns_stub.py).
+
+Checks that resolution matches what the stub serves, that names under a
+wildcard are filtered, that an unresponsive resolver is retried past,
+that replies echoing a different question are ignored, that answers are
+served from the cache until their TTL runs out, and that abandoning
+iter_resolved early stops the resolver thread. Exits 1 on the first
+failed check.
+
+Usage:
+  python3 bench/check_resolver.py [--names 2000]
+"""
+
+import os
+import sys
+import time
+import socket
+import sqlite3
+import asyncio
+import argparse
+import tempfile
+import threading
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "tools"))
+sys.path.insert(0, os.path.join(BENCH_DIR, "stubs"))
+
+import dns_stub
+import resolver
+
+DOMAIN = "bench.example"
+
+
+def serve_udp(protocol_factory):
+    """Run a UDP server on its own loop thread; returns its address."""
+    ready = threading.Event()
+    address = []
+
+    async def serve():
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(protocol_factory, local_addr=("127.0.0.1", 0))
+        address.append(transport.get_extra_info("sockname")[:2])
+        ready.set()
+        await asyncio.Event().wait()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait(5)
+    return address[0]
+
+
+class Liar(asyncio.DatagramProtocol):
+    """Answers every query with the right txid but another question."""
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        forged = data[:12] + resolver.question_section("evil.example", resolver.A)
+        self.transport.sendto(dns_stub.respond(forged), addr)
+
+
+def dead_resolver():
+    """A bound UDP socket nobody reads: queries to it simply time out."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    return sock, sock.getsockname()
+
+
+def collect(names, **kwargs):
+    stream = resolver.iter_resolved(names, **kwargs)
+    found = []
+    while True:
+        try:
+            found.append(next(stream))
+        except StopIteration as stop:
+            return {item["name"] for item in found}, stop.value or {}
+
+
+def check(ok, message):
+    print(f"[{'+' if ok else '!'}] {message}")
+    if not ok:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check tools/resolver.py against the stub DNS server")
+    parser.add_argument("--names", type=int, default=2000, help="Names to resolve")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="resolver_check_")
+    stub = serve_udp(dns_stub.StubDNS)
+    dead_sock, dead = dead_resolver()
+    resolver.TIMEOUT = 0.2
+
+    names = [f"host{i}.{DOMAIN}" for i in range(args.names)]
+    names += [f"host{i}.wild.{DOMAIN}" for i in range(50)]
+    expected = {name for name in names if dns_stub.answer_for(name) and "wild" not in name.split(".")}
+
+    cache_path = os.path.join(workdir, "dns_cache.db")
+    started = time.time()
+    found, stats = collect(names, resolvers=[stub], cache=resolver.DNSCache(cache_path))
+    check(found == expected, f"{len(found)} of {len(names)} names resolve, as the stub serves "
+                             f"({time.time() - started:.2f}s)")
+    check(stats.get("wildcard") == 50, f"{stats.get('wildcard')} names under a wildcard filtered")
+
+    # Half the queries go to a resolver that never answers first
+    client = resolver.AsyncResolver([dead, stub], None, timeout=0.2, retries=8)
+    sample = sorted(expected)[:20]
+
+    async def retried():
+        await client.open()
+        try:
+            return await asyncio.gather(*(client.query(name, resolver.A) for name in sample))
+        finally:
+            client.close()
+
+    answers = asyncio.run(retried())
+    check(all(answer and answer[1] for answer in answers), "queries time out on a dead resolver and retry on another")
+
+    client = resolver.AsyncResolver([dead], None, timeout=0.2, retries=2)
+
+    async def unanswered():
+        await client.open()
+        try:
+            return await client.query(sample[0], resolver.A)
+        finally:
+            client.close()
+
+    started = time.time()
+    check(asyncio.run(unanswered()) is None and time.time() - started < 1,
+          "a resolver that never answers gives up after its retries")
+
+    liar = serve_udp(Liar)
+    client = resolver.AsyncResolver([liar], None, timeout=0.2, retries=2)
+
+    async def forged():
+        await client.open()
+        try:
+            return await client.query(sample[0], resolver.A)
+        finally:
+            client.close()
+
+    check(asyncio.run(forged()) is None, "replies echoing another question are ignored")
+
+    # Only the dead resolver left: everything has to come from the cache
+    found, stats = collect(names, resolvers=[dead], cache=resolver.DNSCache(cache_path))
+    check(found == expected and stats.get("cache_misses") == 0,
+          f"second pass served from the cache ({stats.get('cache_hits')} hits, {stats.get('cache_misses')} misses)")
+
+    # Age every entry past its TTL
+    conn = sqlite3.connect(cache_path)
+    with conn:
+        conn.execute("UPDATE answers SET expires_at = expires_at - ?", (resolver.MAX_TTL + 1,))
+    conn.close()
+    found, stats = collect(names[:100], resolvers=[stub], cache=resolver.DNSCache(cache_path))
+    check(stats.get("cache_hits") == 0 and stats.get("cache_misses", 0) >= 100,
+          f"expired answers are queried again ({stats.get('cache_misses')} misses)")
+
+    # A consumer that stops after one record must not leave the resolver running
+    before = threading.active_count()
+    stream = resolver.iter_resolved(names, resolvers=[stub], cache=resolver.DNSCache(os.path.join(workdir, "c2.db")))
+    next(stream)
+    stream.close()
+    deadline = time.time() + 10
+    while threading.active_count() > before and time.time() < deadline:
+        time.sleep(0.05)
+    check(threading.active_count() <= before, "closing iter_resolved early stops the resolver thread")
+
+    dead_sock.close()
+
+
+if __name__ == "__main__":
+    main()
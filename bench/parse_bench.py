@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the output parsers in tools/records.py.
+
+Writes synthetic nuclei, nuclei -dast, gobuster and naabu outputs shaped
+like the real files in Outputs/ and times, per output, the parsers app.py
+used before tools/records.py (kept below as legacy_*) against the records
+parsers. "records" materialises every record; "records+evidence" also
+forces the lazily parsed evidence, which is what the legacy parsers always
+paid for.
+
+Usage:
+  python3 bench/parse_bench.py [--lines 50000] [--repeat 3]
+"""
+
+import os
+import re
+import sys
+import ast
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "tools"))
+
+import records
+
+
+# --- app.py parsers before tools/records.py ---
+def legacy_read_lines(filepath):
+    with open(filepath, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def legacy_read_json_lines(filepath):
+    lines = []
+    with open(filepath, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    lines.append(json.loads(line))
+                except Exception as e:
+                    lines.append({'error': str(e), 'raw': line})
+    return lines
+
+def legacy_clean_evidence_text(text):
+    if not text:
+        return ''
+    cleaned = re.sub(r'[\t\n\r]+', ' ', text)
+    cleaned = re.sub(r' +', ' ', cleaned)
+    cleaned = re.sub(r'^\s+', '', cleaned)
+    return cleaned.strip()
+
+def legacy_safe_parse_evidence(evidence):
+    if not evidence:
+        return []
+    try:
+        if evidence.startswith('[') and evidence.endswith(']'):
+            items = ast.literal_eval(evidence)
+            return [legacy_clean_evidence_text(str(item)) for item in items]
+        return [legacy_clean_evidence_text(evidence)]
+    except Exception:
+        return [legacy_clean_evidence_text(evidence)]
+
+def legacy_parse_fuzzing_vulns(lines):
+    parsed = []
+    for line in lines:
+        m = re.match(r'\[(.*?)\] \[(.*?)\] \[(.*?)\] (\S+) (\[.*?\])? ?(\[.*?\])? ?(\[.*?\])?', line)
+        if m:
+            type_, proto, severity, url, evidence, extra, method = m.groups()
+            parsed.append({'type': type_, 'protocol': proto, 'severity': severity, 'url': url,
+                           'evidence': legacy_safe_parse_evidence(evidence), 'extra': extra, 'method': method})
+        else:
+            parsed.append({'raw': line})
+    return parsed
+
+def legacy_parse_nuclei_vulns(lines):
+    parsed = []
+    for line in lines:
+        m = re.match(r'\[(.*?)\] \[(.*?)\] \[(.*?)\] \[(.*?)\] (\S+)(?: (\[.*\]))?', line)
+        if m:
+            type_, proto, severity, extra, target, evidence = m.groups()
+            parsed.append({'type': type_, 'protocol': proto, 'severity': severity, 'extra': extra,
+                           'target': target, 'evidence': legacy_safe_parse_evidence(evidence)})
+        else:
+            m2 = re.match(r'\[(.*?)\] \[(.*?)\] \[(.*?)\] (\S+)(?: (\[.*\]))?', line)
+            if m2:
+                type_, proto, severity, target, evidence = m2.groups()
+                parsed.append({'type': type_, 'protocol': proto, 'severity': severity, 'extra': '',
+                               'target': target, 'evidence': legacy_safe_parse_evidence(evidence)})
+            else:
+                parsed.append({'raw': line})
+    return parsed
+
+def legacy_parse_fuzzing_dirs(lines):
+    parsed = []
+    for line in lines:
+        m = re.match(r'(.+?) \(Status: (\d+)\)', line)
+        if m:
+            path, status = m.groups()
+            parsed.append({'path': path.strip(), 'status': status.strip()})
+        else:
+            parsed.append({'raw': line})
+    return parsed
+
+
+def write_outputs(workdir, count):
+    evidence = json.dumps(["SQL syntax; check the manual that corresponds to your MySQL",
+                           "check the manual that corresponds to your MySQL server version"])
+    generators = {
+        "nuclei": lambda i: (f"[dns-waf-detect:cloudflare] [dns] [info] h{i}.bench.example" if i % 2 else
+                             f"[secrets-patterns-rules:key_{i}] [global] [http] [info] https://h{i}.bench.example/app.js "
+                             f"[\"secret\" value=\"{i:040x}\"]"),
+        "dast": lambda i: (f"[sqli-error-based:mysql] [http] [critical] http://h{i}.bench.example/%27 "
+                           f"{evidence} [path:/] [GET]"),
+        "dirs": lambda i: f"http://h{i % 500}.bench.example/dir{i}/ (Status: {[200, 301, 403][i % 3]}) [Size: {900 + i % 97}]",
+        "naabu": lambda i: json.dumps({"host": f"h{i}.bench.example", "ip": "172.67.140.50",
+                                       "timestamp": "2025-07-24T08:30:24.148198525Z", "port": 443,
+                                       "protocol": "tcp", "tls": False}, separators=(",", ":")),
+    }
+    paths = {}
+    for name, line in generators.items():
+        paths[name] = os.path.join(workdir, f"{name}.txt")
+        with open(paths[name], "w") as f:
+            f.writelines(line(i) + "\n" for i in range(count))
+    return paths
+
+
+def best_of(repeat, fn, *args):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(fn, *args):
+    """Peak bytes allocated while parsing and holding the result."""
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        return tracemalloc.get_traced_memory()[1], result
+    finally:
+        tracemalloc.stop()
+
+
+def force_evidence(findings):
+    for finding in findings:
+        finding.evidence
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy vs records parser micro-benchmark")
+    parser.add_argument("--lines", type=int, default=50000, help="Lines per synthetic output")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per parser; the best is reported")
+    args = parser.parse_args()
+
+    cases = {
+        "nuclei": (lambda p: legacy_parse_nuclei_vulns(legacy_read_lines(p)),
+                   lambda p: list(records.iter_findings(p)),
+                   lambda p: force_evidence(list(records.iter_findings(p)))),
+        "dast": (lambda p: legacy_parse_fuzzing_vulns(legacy_read_lines(p)),
+                 lambda p: list(records.iter_dast_findings(p)),
+                 lambda p: force_evidence(list(records.iter_dast_findings(p)))),
+        "dirs": (lambda p: legacy_parse_fuzzing_dirs(legacy_read_lines(p)),
+                 lambda p: list(records.iter_dirs(p)), None),
+        "naabu": (legacy_read_json_lines, lambda p: list(records.iter_ports(p)), None),
+    }
+
+    with tempfile.TemporaryDirectory(prefix="parse_bench_") as workdir:
+        paths = write_outputs(workdir, args.lines)
+        print(f"[*] {args.lines} lines per output, best of {args.repeat}")
+        print(f"    {'output':<8} {'legacy':>9} {'records':>9} {'speedup':>8} {'+evidence':>10} {'speedup':>8}"
+              f" {'legacy MB':>10} {'records MB':>11}")
+        for name, (legacy, fast, full) in cases.items():
+            old = best_of(args.repeat, legacy, paths[name])
+            new = best_of(args.repeat, fast, paths[name])
+            row = f"    {name:<8} {old:>8.3f}s {new:>8.3f}s {old / new:>7.1f}x"
+            if full:
+                forced = best_of(args.repeat, full, paths[name])
+                row += f" {forced:>9.3f}s {old / forced:>7.1f}x"
+            else:
+                row += " " * 19
+            old_mem, _ = peak_memory(legacy, paths[name])
+            new_mem, _ = peak_memory(full or fast, paths[name])
+            row += f" {old_mem / 1e6:>10.1f} {new_mem / 1e6:>11.1f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark harness for the recon pipeline and the results parsers.
+
+Puts stub versions of every external recon tool on PATH (see
+stubs/recon_stub.py), points all tool modules at a scratch Outputs/
+directory and times, per scale:
+
+  run_all        ReconTool.run_all end to end
+  merge_outputs  subdomain.merge_outputs
+  extract_ports  httpx.extract_host_ports
+  parse_results  app.parse_results (cold cache)
+  load_summary   app.load_summary (the summary run_all wrote)
+  render         results page render (needs Flask)
+
+Results are written to bench/last_run.json and compared against
+bench/baseline.json; anything slower than the baseline by more than
+--threshold is reported as a regression and the exit status is 1.
+
+Needs nothing beyond the standard library: the pipeline does not import
+the chatbot, and without Flask installed only the parse_results,
+load_summary and render timings are skipped.
+
+Usage:
+  python3 bench/run_bench.py [--scales 1000,10000] [--latency 0.0] [--resolver builtin] [--update-baseline]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import importlib
+import logging
+import threading
+import asyncio
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+TOOLS_DIR = os.path.join(ROOT_DIR, "tools")
+STUB = os.path.join(BENCH_DIR, "stubs", "recon_stub.py")
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+LAST_RUN = os.path.join(BENCH_DIR, "last_run.json")
+
+STUB_TOOLS = ["subfinder", "puredns", "naabu", "httpx", "nuclei", "urlfinder", "gobuster", "theharvester"]
+DOMAIN = "bench.example"
+
+# Timings below this many seconds are too noisy to call regressions
+MIN_SECONDS = 0.05
+
+sys.path.insert(0, TOOLS_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "stubs"))
+
+
+def install_stubs(workdir):
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir)
+    for tool in STUB_TOOLS:
+        os.symlink(STUB, os.path.join(bin_dir, tool))
+    oneforall_dir = os.path.join(workdir, "OneForAll")
+    os.makedirs(os.path.join(oneforall_dir, "results"))
+    os.symlink(STUB, os.path.join(oneforall_dir, "oneforall.py"))
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+    return oneforall_dir
+
+
+def start_stub_dns(workdir):
+    """Serve DNS from a local stub and point resolver.py (used by the builtin
+    resolver and naabu's IP grouping) at it."""
+    import dns_stub
+    import resolver
+
+    ready = threading.Event()
+    port = []
+    threading.Thread(
+        target=lambda: asyncio.run(dns_stub.serve(0, lambda p: (port.append(p), ready.set()))),
+        daemon=True
+    ).start()
+    ready.wait(5)
+    resolvers_file = os.path.join(workdir, "resolvers.txt")
+    with open(resolvers_file, "w") as f:
+        f.write(f"127.0.0.1:{port[0]}\n")
+    resolver.RESOLVERS_FILE = resolvers_file
+    resolver.CACHE_PATH = os.path.join(workdir, "dns_cache.db")
+
+
+def point_modules_at(output_dir, oneforall_dir):
+    """Redirect every module's Outputs/ (and OneForAll) paths to the scratch dir."""
+    modules = []
+    for name in os.listdir(TOOLS_DIR):
+        if not name.endswith(".py"):
+            continue
+        try:
+            module = importlib.import_module(name[:-3])
+        except Exception:
+            continue
+        modules.append(module)
+        if hasattr(module, "OUTPUT_DIR"):
+            module.OUTPUT_DIR = output_dir
+    import subdomain
+    import store
+    import workspace
+    import progress
+    workspace.WORK_ROOT = os.path.join(output_dir, ".work")
+    progress.PROGRESS_DIR = os.path.join(output_dir, ".progress")
+    subdomain.ONEFORALL_DIR = oneforall_dir
+    subdomain.RESULTS_DIR = os.path.join(oneforall_dir, "results")
+    store.DB_PATH = os.path.join(output_dir, "recon.db")
+    return modules
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def bench_scale(scale, latency, workdir):
+    os.environ["BENCH_SCALE"] = str(scale)
+    os.environ["BENCH_LATENCY"] = str(latency)
+    output_dir = os.path.join(workdir, f"Outputs-{scale}")
+    os.makedirs(output_dir)
+    oneforall_dir = os.path.join(workdir, "OneForAll")
+    point_modules_at(output_dir, oneforall_dir)
+
+    import main
+    import subdomain
+    import httpx
+    import workspace
+
+    results = {}
+    results["run_all"], _ = timed(main.ReconTool().run_all, DOMAIN)
+
+    # Scan stages read the plain files of a workspace, not the gzipped
+    # published outputs, so time them in one seeded from the run above
+    scan_dir = workspace.create(DOMAIN)
+    workspace.seed(DOMAIN, scan_dir, ["subfinder.txt", "oneforall.txt", "naabu.json"])
+    previous = workspace.bind(scan_dir)
+    try:
+        results["merge_outputs"], _ = timed(subdomain.merge_outputs, DOMAIN)
+        results["extract_ports"], _ = timed(
+            httpx.extract_host_ports,
+            os.path.join(scan_dir, f"{DOMAIN}_naabu.json"),
+            os.path.join(workdir, "hostport.txt"),
+        )
+    finally:
+        workspace.unbind(previous)
+        workspace.discard(scan_dir)
+
+    try:
+        import app
+    except ImportError as e:
+        print(f"    [!] Skipping web benchmarks: {e}")
+        return results
+    app.OUTPUTS_DIR = output_dir
+    app._results_cache.clear()
+    app._results_cache_bytes = 0
+    results["parse_results"], _ = timed(app.parse_results, DOMAIN)
+    results["load_summary"], doc = timed(app.load_summary, DOMAIN)
+    with app.app.test_request_context():
+        results["render"], _ = timed(
+            app.render_template, "results.html", domain=DOMAIN, summary=doc
+        )
+    return results
+
+
+def compare(current, baseline, threshold):
+    regressions = []
+    for key, seconds in sorted(current.items()):
+        base = baseline.get(key)
+        if base is None or max(seconds, base) < MIN_SECONDS:
+            continue
+        if seconds > base * (1 + threshold):
+            regressions.append((key, base, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline recon benchmark")
+    parser.add_argument("--scales", default="1000,10000", help="Comma separated subdomain counts (1k-1M)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each stub tool call sleeps")
+    parser.add_argument("--resolver", choices=["puredns", "builtin"], default="puredns",
+                        help="Resolve with the puredns stub or resolver.py against a stub DNS server")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    workdir = tempfile.mkdtemp(prefix="recon_bench_")
+    cwd = os.getcwd()
+    current = {}
+    try:
+        install_stubs(workdir)
+        os.chdir(workdir)
+        start_stub_dns(workdir)
+        if args.resolver == "builtin":
+            import subdomain
+            subdomain.RESOLVER = "builtin"
+        for scale in scales:
+            print(f"[*] Scale {scale} subdomains, {args.latency}s tool latency")
+            for name, seconds in bench_scale(scale, args.latency, workdir).items():
+                suffix = "" if args.resolver == "puredns" else f"/{args.resolver}"
+                current[f"{name}@{scale}{suffix}"] = round(seconds, 4)
+                print(f"    {name:<14} {seconds:9.4f}s")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(LAST_RUN, "w") as f:
+        json.dump(current, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(BASELINE, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f"[+] Baseline updated: {BASELINE}")
+        return 0
+
+    try:
+        with open(BASELINE, "r") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        print("[*] No baseline yet; run with --update-baseline to record one.")
+        return 0
+
+    regressions = compare(current, baseline, args.threshold)
+    for key, base, seconds in regressions:
+        print(f"[!] Regression in {key}: {base:.4f}s -> {seconds:.4f}s ({seconds / base - 1:+.0%})")
+    if not regressions:
+        print("[+] No regressions against baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
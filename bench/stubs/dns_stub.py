@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Local stub DNS server for exercising tools/resolver.py offline.
+
+Answers A queries over UDP the way recon_stub.py's puredns decides what
+resolves: a BENCH_RESOLVE_RATIO share of names get the address the stub
+naabu/httpx would report for them, names under
+a "wild" label resolve to a fixed wildcard address, and everything else is
+NXDOMAIN with an SOA carrying a negative TTL. AAAA queries get NODATA.
+
+Usage:
+  python3 bench/stubs/dns_stub.py [port]
+"""
+
+import os
+import sys
+import socket
+import struct
+import asyncio
+import zlib
+
+from recon_stub import ip_for
+
+RESOLVE_RATIO = float(os.environ.get("BENCH_RESOLVE_RATIO", 0.05))
+TTL = 300
+WILDCARD_IP = "198.51.100.200"
+
+
+def question(data):
+    labels = []
+    offset = 12
+    while data[offset]:
+        length = data[offset]
+        labels.append(data[offset + 1:offset + 1 + length].decode("ascii", "replace"))
+        offset += 1 + length
+    qtype = struct.unpack(">H", data[offset + 1:offset + 3])[0]
+    return ".".join(labels).lower(), qtype, data[12:offset + 5]
+
+
+def answer_for(name):
+    labels = name.split(".")
+    if "wild" in labels[1:]:
+        return WILDCARD_IP
+    value = zlib.crc32(name.encode())
+    if len(labels) <= 2:
+        return ip_for(name)
+    # resolver.py probes wildcards with 16 character random labels; never answer those
+    if value % 1000 < RESOLVE_RATIO * 1000 and len(labels[0]) < 16:
+        return ip_for(name)
+    return None
+
+
+def respond(data):
+    txid = struct.unpack(">H", data[:2])[0]
+    name, qtype, qsection = question(data)
+    ip = answer_for(name)
+    if ip is None:
+        # NXDOMAIN plus an SOA so the client learns a negative TTL
+        soa = (b"\xc0\x0c" + struct.pack(">HHIH", 6, 1, TTL, 22) + b"\x00\x00"
+               + struct.pack(">IIIII", 1, 3600, 600, 86400, 60))
+        return struct.pack(">HHHHHH", txid, 0x8183, 1, 0, 1, 0) + qsection + soa
+    if qtype != 1:
+        return struct.pack(">HHHHHH", txid, 0x8180, 1, 0, 0, 0) + qsection
+    record = b"\xc0\x0c" + struct.pack(">HHIH", 1, 1, TTL, 4) + socket.inet_aton(ip)
+    return struct.pack(">HHHHHH", txid, 0x8180, 1, 1, 0, 0) + qsection + record
+
+
+class StubDNS(asyncio.DatagramProtocol):
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            self.transport.sendto(respond(data), addr)
+        except (IndexError, struct.error):
+            pass
+
+
+async def serve(port, ready=None):
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(StubDNS, local_addr=("127.0.0.1", port))
+    transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+    if ready is not None:
+        ready(transport.get_extra_info("sockname")[1])
+    try:
+        await asyncio.Event().wait()
+    finally:
+        transport.close()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5353
+    print(f"[*] Stub DNS listening on 127.0.0.1:{port}")
+    asyncio.run(serve(port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the recon binaries used by tools/.
+
+The harness links this file onto PATH as subfinder, puredns, naabu, httpx,
+nuclei, urlfinder, gobuster and theharvester (and as OneForAll's
+oneforall.py); the tool to imitate is picked from the invoked name. Output
+follows the formats of the real files in Outputs/.
+
+Environment:
+  BENCH_SCALE          subdomains produced by subfinder (default 1000)
+  BENCH_LATENCY        seconds each invocation sleeps before answering (default 0)
+  BENCH_RESOLVE_RATIO  share of names puredns reports as resolving (default 0.05)
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import uuid
+import zlib
+
+SCALE = int(os.environ.get("BENCH_SCALE", 1000))
+LATENCY = float(os.environ.get("BENCH_LATENCY", 0))
+RESOLVE_RATIO = float(os.environ.get("BENCH_RESOLVE_RATIO", 0.05))
+
+PREFIXES = ["api", "dev", "mail", "shop", "cdn", "vpn", "staging", "blog", "app", "m", "admin", "test"]
+# Shared edge IPs (Cloudflare, Shopify) and a few origin IPs, as seen in cm2.pw/unthinkable.me
+CDN_IPS = ["172.67.140.50", "104.21.28.182", "23.227.38.74"]
+ORIGIN_IPS = ["185.199.110.153", "185.199.109.153", "203.0.113.10", "198.51.100.7"]
+CDN_PORTS = [80, 443, 2052, 2053, 2082, 2083, 2086, 2087, 2095, 2096, 8080, 8443, 8880]
+ORIGIN_PORTS = [22, 80, 443]
+TECH = [["Cloudflare", "HTTP/3"], ["Nginx"], ["Apache HTTP Server", "PHP"], ["Shopify"]]
+STATIC = ["favicon.ico", "robots.txt", "assets/app.js", "css/site.css", "img/logo.png"]
+
+
+def arg(flag, default=None):
+    argv = sys.argv
+    return argv[argv.index(flag) + 1] if flag in argv else default
+
+
+def h(value):
+    return zlib.crc32(value.encode())
+
+
+def emit(lines, out_path=None):
+    if out_path:
+        with open(out_path, "w") as f:
+            f.writelines(line + "\n" for line in lines)
+    else:
+        out = sys.stdout
+        for line in lines:
+            out.write(line + "\n")
+        out.flush()
+
+
+def read_list(path):
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def names(domain, count):
+    for i in range(count):
+        yield f"{PREFIXES[i % len(PREFIXES)]}{i}.{domain}"
+
+
+def subfinder():
+    domain = arg("-d")
+    emit(names(domain, SCALE), arg("-o"))
+
+
+def oneforall():
+    domain = arg("--target")
+    path = arg("--path", os.path.join("results", f"{domain}.csv"))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Overlaps subfinder for the first half and adds new names after it
+    count = max(SCALE // 2, 1)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "alive", "request", "resolve", "url", "subdomain", "level", "cname", "ip", "port"])
+        for i, name in enumerate(names(domain, count + SCALE // 4)):
+            if i >= count:
+                name = f"legacy{i}.{domain}"
+            writer.writerow([i, 1, 1, 1, f"http://{name}", name, 1, "", "1.1.1.1,1.0.0.1", 80])
+
+
+def puredns():
+    hosts = read_list(sys.argv[sys.argv.index("resolve") + 1])
+    keep = [name for name in hosts if h(name) % 1000 < RESOLVE_RATIO * 1000] or hosts[:1]
+    emit(keep, arg("-w"))
+
+
+def ip_for(host):
+    value = h(host)
+    return CDN_IPS[value % len(CDN_IPS)] if value % 4 else ORIGIN_IPS[value % len(ORIGIN_IPS)]
+
+
+def naabu():
+    hosts = read_list(arg("-l"))
+    wanted = arg("-p", "-")
+    wanted = None if wanted == "-" else {int(p) for p in wanted.split(",")}
+    lines = []
+    for host in dict.fromkeys(hosts):
+        # naabu.py hands over resolved IPs; bare hostnames are resolved here
+        ip = host if host.replace(".", "").isdigit() else ip_for(host)
+        ports = CDN_PORTS if ip in CDN_IPS else ORIGIN_PORTS
+        for port in ports[: 2 + h(host) % len(ports)]:
+            if wanted is not None and port not in wanted:
+                continue
+            lines.append(json.dumps({
+                "host": host, "ip": ip, "timestamp": "2025-07-24T08:30:24.148198525Z",
+                "port": port, "protocol": "tcp", "tls": False
+            }, separators=(",", ":")))
+    emit(lines, arg("-o"))
+
+
+def catch_all(host):
+    """Hosts that answer every path with the same 200 page."""
+    return h(host.split(":")[0]) % 5 == 0
+
+
+def page(url):
+    """(status, length, words) the stub web server returns for url."""
+    host = url.split("/")[2]
+    path = "/" + url.split("/", 3)[3] if url.count("/") > 2 else "/"
+    if catch_all(host):
+        return 200, 5120 + len(path), 310
+    if path.strip("/") in DIR_PATHS:
+        return 200, 921 + h(path) % 500, 40 + h(path) % 60
+    return 404, 19, 4
+
+
+def httpx():
+    lines = []
+    for hostport in read_list(arg("-l")):
+        if "://" in hostport:
+            # Path probes (gobuster_fuzz.py baselines) only need the response shape
+            status, length, words = page(hostport)
+            lines.append(json.dumps({"url": hostport, "input": hostport, "status_code": status,
+                                     "content_length": length, "words": words, "failed": False}))
+            continue
+        host, _, port = hostport.partition(":")
+        port = port or "80"
+        scheme = "https" if port in ("443", "2053", "2083", "2087", "2096", "8443") else "http"
+        value = h(hostport)
+        lines.append(json.dumps({
+            "timestamp": "2025-07-24T08:30:25.670676749Z", "port": port,
+            "url": f"{scheme}://{host}:{port}", "input": hostport,
+            "title": "Attention Required! | Cloudflare" if value % 3 == 0 else "Welcome",
+            "scheme": scheme, "webserver": ["cloudflare", "nginx", "Apache"][value % 3],
+            "content_type": "text/html", "method": "GET", "host": ip_for(host), "path": "/",
+            "time": "61.420423ms", "a": [ip_for(host)], "tech": TECH[value % len(TECH)],
+            "words": 620, "lines": 93, "status_code": [200, 403, 301, 404][value % 4],
+            "content_length": 4516, "failed": False
+        }, separators=(",", ":")))
+    emit(lines, arg("-o"))
+
+
+def nuclei():
+    targets = read_list(arg("-list"))
+    dast = "-dast" in sys.argv
+    findings = []
+    for target in targets:
+        value = h(target)
+        if value % 10:
+            continue
+        findings.append({
+            "template-id": "sqli-error-based" if dast else ["missing-sri", "dns-waf-detect", "tech-detect"][value % 3],
+            "info": {"name": "Stub finding", "severity": ["info", "low", "medium", "high", "critical"][value % 5]},
+            "type": "http", "host": target.split("/")[2] if "://" in target else target,
+            "matched-at": target, "extracted-results": ["stub evidence"],
+        })
+    with open(arg("-json-export"), "w") as f:
+        json.dump(findings, f)
+
+
+def urlfinder():
+    domain = arg("-d")
+    lines = []
+    for i, name in enumerate(names(domain, max(SCALE // 3, 1))):
+        path = STATIC[i % len(STATIC)] if i % 3 == 0 else f"item/{i}?id={i}&ref=home"
+        lines.append(json.dumps({"url": f"http://{name}/{path}", "input": domain, "source": "waybackarchive"},
+                                separators=(",", ":")))
+    emit(lines, arg("-o"))
+
+
+DIR_PATHS = [".git", ".htaccess", "admin", "api", "backup", "blog", "images", "login", "test", "uploads"]
+
+
+def gobuster():
+    url = arg("-u").rstrip("/")
+    if "://" not in url:
+        url = "http://" + url
+    # gobuster's precheck refuses catch-all hosts unless forced
+    if page(f"{url}/{uuid.uuid4()}/")[0] != 404 and "--force" not in sys.argv:
+        sys.stderr.write("the server returns a status code that matches the provided options "
+                         "for non existing urls\n")
+        sys.exit(1)
+    lines = []
+    # Real hits, plus a few wordlist entries that only "exist" on catch-all hosts
+    for path in DIR_PATHS + ["nothere", "random", "zzz"]:
+        status, length, _ = page(f"{url}/{path}/")
+        if status == 404:
+            continue
+        lines.append(f"/{path}/                (Status: {status}) [Size: {length}]")
+    emit(lines, arg("-o"))
+
+
+def theharvester():
+    domain = arg("-d")
+    base = arg("-f")
+    with open(base + ".json", "w") as f:
+        json.dump({"emails": [f"info@{domain}", f"admin@{domain}", f"info@{domain}"]}, f)
+    with open(base + ".xml", "w") as f:
+        f.write("<theHarvester/>\n")
+
+
+TOOLS = {
+    "subfinder": subfinder,
+    "oneforall.py": oneforall,
+    "puredns": puredns,
+    "naabu": naabu,
+    "httpx": httpx,
+    "nuclei": nuclei,
+    "urlfinder": urlfinder,
+    "gobuster": gobuster,
+    "theharvester": theharvester,
+}
+
+
+def main():
+    name = os.path.basename(sys.argv[0])
+    if name not in TOOLS:
+        print(f"[!] Unknown stub tool: {name}")
+        sys.exit(2)
+    if LATENCY:
+        time.sleep(LATENCY)
+    TOOLS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import concurrent.futures
+from urllib.parse import urlparse
+
+import subdomain
+import urlfinder
+import theharvester_email
+import gobuster_fuzz
+import nuclei_dast
+import naabu
+import httpx
+import nuclei
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
+
+BATCH_CONCURRENCY = int(os.environ.get("RECON_BATCH_CONCURRENCY", 8))
+# Outputs of the shared stages; a batch workspace starts from the published
+# ones so a domain keeps them when its shared stage fails
+SHARED_OUTPUTS = ["naabu.json", "httpx.json", "nuclei.json"]
+
+
+def read_domains(path):
+    domains = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip().lower().rstrip(".")
+            if line and not line.startswith("#") and line not in domains:
+                domains.append(line)
+    return domains
+
+
+def owner_domain(host, domains):
+    """Longest batch domain that host is, or is a subdomain of."""
+    if not host:
+        return None
+    if "://" in host:
+        host = urlparse(host).hostname or ""
+    labels = host.split(":")[0].lower().rstrip(".").split(".")
+    for i in range(len(labels)):
+        candidate = ".".join(labels[i:])
+        if candidate in domains:
+            return candidate
+    return None
+
+
+def enumerate_domain(domain):
+    """Per-domain stages that cannot be shared across the batch."""
+    subdomain.main(domain)
+    urlfinder.run_urlfinder(domain)
+    nuclei_dast.run_nuclei_dast(domain)
+    theharvester_email.run_theharvester(domain)
+
+
+def write_union(domains, path):
+    hosts = set()
+    for domain in domains:
+        try:
+            with open(os.path.join(OUTPUT_DIR, f"{domain}_subdomain.txt"), "r") as f:
+                hosts.update(line.strip().lower() for line in f if line.strip())
+        except OSError:
+            continue
+    with open(path, "w") as f:
+        f.writelines(f"{host}\n" for host in sorted(hosts))
+    return len(hosts)
+
+
+def split_json_lines(path, domains, suffix, key):
+    """Fan a combined JSON-lines output back out to {domain}_{suffix} files."""
+    handles = {}
+    try:
+        for domain in domains:
+            handles[domain] = open(os.path.join(OUTPUT_DIR, f"{domain}_{suffix}"), "w")
+        if not os.path.isfile(path):
+            return
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                owner = owner_domain(key(record), domains)
+                if owner:
+                    handles[owner].write(line if line.endswith("\n") else line + "\n")
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+
+def split_json_array(path, domains, suffix):
+    try:
+        with open(path, "r") as f:
+            items = json.load(f)
+    except (OSError, ValueError):
+        items = []
+    per_domain = {domain: [] for domain in domains}
+    for item in items if isinstance(items, list) else []:
+        owner = owner_domain(item.get("host") or item.get("matched-at"), domains)
+        if owner:
+            per_domain[owner].append(item)
+    for domain, findings in per_domain.items():
+        with open(os.path.join(OUTPUT_DIR, f"{domain}_{suffix}"), "w") as f:
+            json.dump(findings, f)
+
+
+def run_batch(domains, concurrency=BATCH_CONCURRENCY, log=print):
+    """Enumerate every domain in parallel, then run one shared naabu, httpx
+    and nuclei pass over the union of resolved hosts, split the results
+    back into each domain's output files and fuzz each domain's live URLs.
+
+    A failed stage only loses its own outputs: whatever the other stages
+    finished is still split out. Returns "finished", or "partial" when any
+    stage failed for any domain."""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    domain_set = set(domains)
+    status = "finished"
+
+    log(f"[*] Enumerating {len(domains)} domains ({concurrency} at a time)...")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(enumerate_domain, d): d for d in domains}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                log(f"[!] Enumeration failed for {futures[future]}: {e}")
+                status = "partial"
+
+    workdir = tempfile.mkdtemp(prefix="recon_batch_")
+    try:
+        union_file = os.path.join(workdir, "batch_subdomain.txt")
+        naabu_out = os.path.join(workdir, "batch_naabu.json")
+        httpx_out = os.path.join(workdir, "batch_httpx.json")
+        nuclei_out = os.path.join(workdir, "batch_nuclei.json")
+
+        total = write_union(domains, union_file)
+        log(f"[*] Running shared naabu/httpx/nuclei over {total} hosts...")
+
+        finished = set()
+
+        def ports_then_http():
+            naabu.run_naabu("batch", union_file, naabu_out)
+            finished.add("naabu")
+            httpx.run_httpx("batch", naabu_out, httpx_out)
+            finished.add("httpx")
+
+        def vulns():
+            nuclei.run_nuclei("batch", union_file, nuclei_out)
+            finished.add("nuclei")
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            shared = {executor.submit(ports_then_http): "naabu/httpx", executor.submit(vulns): "nuclei"}
+            for future in concurrent.futures.as_completed(shared):
+                try:
+                    future.result()
+                except Exception as e:
+                    log(f"[!] Shared {shared[future]} failed: {e}")
+                    status = "partial"
+
+        # A failed stage's outputs are left out, so each domain keeps its
+        # previously published ones
+        if "naabu" in finished:
+            split_json_lines(naabu_out, domain_set, "naabu.json", lambda r: r.get("host"))
+        if "httpx" in finished:
+            split_json_lines(httpx_out, domain_set, "httpx.json", lambda r: r.get("input") or r.get("url"))
+        if "nuclei" in finished:
+            split_json_array(nuclei_out, domain_set, "nuclei.json")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # Directory fuzzing targets the live URLs httpx found for each domain
+    for domain in domains:
+        try:
+            gobuster_fuzz.run_gobuster(domain)
+        except Exception as e:
+            log(f"[!] Directory fuzzing failed for {domain}: {e}")
+            status = "partial"
+    return status
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python3 batch.py <domains_file>")
+        sys.exit(1)
+
+    run_batch(read_domains(sys.argv[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import bisect
+import ipaddress
+import threading
+import urllib.request
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+RANGES_FILE = os.environ.get("RECON_CDN_RANGES", os.path.join(BASE_DIR, "cdn_ranges.json"))
+
+# Ports CDN edges proxy (Cloudflare's HTTP/HTTPS set covers the others' too)
+CDN_PORTS = os.environ.get(
+    "RECON_CDN_PORTS", "80,443,2052,2053,2082,2083,2086,2087,2095,2096,8080,8443,8880"
+)
+
+# provider -> (url, extractor) used by --update; other providers keep their stored ranges
+SOURCES = {
+    "cloudflare": [
+        ("https://www.cloudflare.com/ips-v4", lambda body: body.split()),
+        ("https://www.cloudflare.com/ips-v6", lambda body: body.split()),
+    ],
+    "fastly": [
+        ("https://api.fastly.com/public-ip-list",
+         lambda body: json.loads(body)["addresses"] + json.loads(body).get("ipv6_addresses", [])),
+    ],
+    "cloudfront": [
+        ("https://ip-ranges.amazonaws.com/ip-ranges.json",
+         lambda body: [p["ip_prefix"] for p in json.loads(body)["prefixes"] if p["service"] == "CLOUDFRONT"]),
+    ],
+}
+
+_db = None
+_db_mtime = None
+_db_lock = threading.Lock()
+
+
+class RangeDB:
+    """Sorted, non-overlapping CIDR ranges per IP version, searched with bisect."""
+
+    def __init__(self, data):
+        self.cnames = sorted(
+            ((suffix.lower().strip("."), provider)
+             for provider, suffixes in data.get("cnames", {}).items() for suffix in suffixes),
+            key=lambda item: -len(item[0])
+        )
+        spans = {4: [], 6: []}
+        for provider, cidrs in data.get("ranges", {}).items():
+            networks = [ipaddress.ip_network(c, strict=False) for c in cidrs]
+            for version in (4, 6):
+                same = [n for n in networks if n.version == version]
+                for net in ipaddress.collapse_addresses(same):
+                    spans[version].append((int(net.network_address), int(net.broadcast_address), provider))
+        self.starts = {}
+        self.spans = {}
+        for version, items in spans.items():
+            items.sort()
+            self.spans[version] = items
+            self.starts[version] = [start for start, _, _ in items]
+
+    def lookup_ip(self, ip):
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        value = int(address)
+        index = bisect.bisect_right(self.starts[address.version], value) - 1
+        if index >= 0:
+            _, end, provider = self.spans[address.version][index]
+            if value <= end:
+                return provider
+        return None
+
+    def lookup_cname(self, cname):
+        cname = cname.lower().rstrip(".")
+        for suffix, provider in self.cnames:
+            if cname == suffix or cname.endswith("." + suffix):
+                return provider
+        return None
+
+    def classify(self, ips=(), cnames=()):
+        """CDN/WAF provider fronting a host, or None for an origin."""
+        for ip in ips:
+            provider = self.lookup_ip(ip)
+            if provider:
+                return provider
+        for cname in cnames:
+            provider = self.lookup_cname(cname)
+            if provider:
+                return provider
+        return None
+
+
+def load_db():
+    """The range database, reloaded when the file changes."""
+    global _db, _db_mtime
+    try:
+        mtime = os.stat(RANGES_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+    with _db_lock:
+        if _db is None or mtime != _db_mtime:
+            try:
+                with open(RANGES_FILE, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[!] CDN range database unavailable ({e}); treating every host as origin")
+                data = {}
+            _db = RangeDB(data)
+            _db_mtime = mtime
+        return _db
+
+
+def classify(ips=(), cnames=()):
+    return load_db().classify(ips, cnames)
+
+
+def update_ranges(path=None, timeout=30):
+    """Refresh providers with published IP lists, keeping the rest as they are."""
+    path = path or RANGES_FILE
+    with open(path, "r") as f:
+        data = json.load(f)
+    for provider, sources in SOURCES.items():
+        cidrs = []
+        try:
+            for url, extract in sources:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    cidrs.extend(extract(response.read().decode()))
+            for cidr in cidrs:
+                ipaddress.ip_network(cidr, strict=False)
+        except Exception as e:
+            print(f"[!] Keeping stored {provider} ranges: {e}")
+            continue
+        if cidrs:
+            data["ranges"][provider] = sorted(set(cidrs))
+            print(f"[+] {provider}: {len(data['ranges'][provider])} ranges")
+    data["updated"] = time.strftime("%Y-%m-%d")
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main():
+    if len(sys.argv) == 2 and sys.argv[1] == "--update":
+        update_ranges()
+        return
+    if len(sys.argv) < 2:
+        print("Usage: python3 cdn.py --update | <ip_or_cname> [...]")
+        sys.exit(1)
+
+    db = load_db()
+    for value in sys.argv[1:]:
+        provider = db.lookup_ip(value) or db.lookup_cname(value)
+        print(f"{value}: {provider or 'origin'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import os
+import sys
+import gzip
+import shutil
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
+
+# Published outputs are gzipped (stdlib zlib); the scan workspace stays plain
+# text because the external tools read and write it directly
+ENABLED = os.environ.get("RECON_COMPRESS_OUTPUTS", "1") != "0"
+LEVEL = int(os.environ.get("RECON_COMPRESS_LEVEL", 6))
+EXT = ".gz"
+
+# Line-oriented tool outputs worth compressing; small state files stay plain
+COMPRESSED_SUFFIXES = [
+    "subfinder.txt", "oneforall.txt", "overall_subdomain.txt", "subdomain.txt",
+    "naabu.json", "httpx.json", "urlfinder.json", "nuclei.json",
+    "vulnerabilities.json", "directory_fuzz.json",
+]
+
+CHUNK = 1 << 20
+
+
+def should_compress(name):
+    return any(name.endswith("_" + suffix) for suffix in COMPRESSED_SUFFIXES)
+
+
+def resolve(path):
+    """path, or its compressed twin when only that exists. Missing files come
+    back unchanged so callers see the usual FileNotFoundError."""
+    if not os.path.exists(path) and os.path.exists(path + EXT):
+        return path + EXT
+    return path
+
+
+def exists(path):
+    return os.path.exists(path) or os.path.exists(path + EXT)
+
+
+def open_text(path):
+    """Open an output for reading as text, decompressing as it streams."""
+    path = resolve(path)
+    if path.endswith(EXT):
+        return gzip.open(path, "rt", errors="replace")
+    return open(path, "r", errors="replace")
+
+
+def open_binary(path):
+    path = resolve(path)
+    if path.endswith(EXT):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def compress_file(src, dst=None):
+    """gzip src into dst (default src + .gz) atomically, keeping src's mtime
+    so caches and the result store still see the file as unchanged."""
+    dst = dst or src + EXT
+    tmp = dst + ".tmp"
+    st = os.stat(src)
+    with open(src, "rb") as f_in, gzip.open(tmp, "wb", compresslevel=LEVEL) as f_out:
+        shutil.copyfileobj(f_in, f_out, CHUNK)
+    os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp, dst)
+    return dst
+
+
+def decompress_file(src, dst):
+    tmp = dst + ".tmp"
+    with gzip.open(src, "rb") as f_in, open(tmp, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out, CHUNK)
+    shutil.copystat(src, tmp)
+    os.replace(tmp, dst)
+    return dst
+
+
+def remove_stale(path):
+    """Drop whichever of path / path.gz is not the copy just published."""
+    stale = path[:-len(EXT)] if path.endswith(EXT) else path + EXT
+    try:
+        os.remove(stale)
+    except FileNotFoundError:
+        pass
+
+
+def migrate(output_dir=None):
+    """Compress every plain tool output already in output_dir.
+    Returns (files, bytes before, bytes after)."""
+    output_dir = output_dir or OUTPUT_DIR
+    files = before = after = 0
+    for name in sorted(os.listdir(output_dir)):
+        src = os.path.join(output_dir, name)
+        if not should_compress(name) or not os.path.isfile(src):
+            continue
+        size = os.path.getsize(src)
+        dst = compress_file(src)
+        os.remove(src)
+        files += 1
+        before += size
+        after += os.path.getsize(dst)
+    return files, before, after
+
+
+def main():
+    if len(sys.argv) not in (2, 3) or sys.argv[1] != "--migrate":
+        print("Usage: python3 compression.py --migrate [output_dir]")
+        sys.exit(1)
+
+    files, before, after = migrate(sys.argv[2] if len(sys.argv) == 3 else None)
+    ratio = f" ({after / before:.1%} of the original size)" if before else ""
+    print(f"[+] Compressed {files} outputs: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB{ratio}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,185 @@
 import os
+import re
 import sys
+import json
+import time
+import uuid
+import tempfile
+import threading
 import subprocess
+import concurrent.futures
+from urllib.parse import urlsplit
+
+from runner import capture_run, finish_popen
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
 WORDLIST = os.path.expanduser("~/SecLists/Discovery/Web-Content/big.txt")
 
-def silent_run(command):
-    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+# Pipeline stage declaration (see pipeline.py)
+STAGE_INPUTS = ["httpx.json"]
+STAGE_OUTPUTS = ["directory_fuzz.json"]
+STAGE_RESOURCE = "network"
+
+# gobuster threads per host, and across every host being fuzzed at once
+HOST_THREADS = int(os.environ.get("RECON_GOBUSTER_HOST_THREADS", 10))
+GLOBAL_THREADS = int(os.environ.get("RECON_GOBUSTER_THREADS", 50))
+# Random paths requested per host to learn what "not found" looks like
+BASELINE_PROBES = 3
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+HIT_RE = re.compile(r"^(\S+)\s+\(Status: (\d+)\)(?:\s+\[Size: (\d+)\])?")
+
+
+def live_urls(httpx_file):
+    """One base URL per distinct live site httpx reported. A host serving the
+    same page on several ports (CDN edges proxy a dozen) is fuzzed once, on
+    its default port when it has one."""
+    sites = {}
+    try:
+        with open(httpx_file, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                url = record.get("url")
+                if not url or record.get("failed") or not record.get("status_code"):
+                    continue
+                parts = urlsplit(url)
+                key = (parts.scheme, parts.hostname, record.get("status_code"), record.get("title"),
+                       record.get("content_length"), record.get("words"))
+                rank = (parts.port not in (None, DEFAULT_PORTS.get(parts.scheme)), parts.port or 0)
+                if key not in sites or rank < sites[key][0]:
+                    sites[key] = (rank, url.rstrip("/"))
+    except OSError:
+        return []
+    return list(dict.fromkeys(url for _, url in sites.values()))
+
+
+def fingerprint_hosts(domain, urls):
+    """{url: [(status, length, words)]} for BASELINE_PROBES random paths per
+    URL, probed in a single httpx run."""
+    # Same trailing-slash form as the paths gobuster requests (-f)
+    probes = {f"{url}/{uuid.uuid4().hex[:12]}/": url for url in urls for _ in range(BASELINE_PROBES)}
+    baselines = {url: [] for url in urls}
+    for record in probe(domain, probes, "gobuster_baseline"):
+        url = probes.get(record.get("input"))
+        if url is not None:
+            baselines[url].append(fingerprint(record))
+    return baselines
+
+
+def probe(domain, urls, stage):
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
+        f.writelines(f"{url}\n" for url in urls)
+        path = f.name
+    try:
+        stdout = capture_run(["httpx", "-l", path, "-sc", "-cl", "-wc", "-j", "-silent"],
+                             domain=domain, stage=stage, input_file=path)
+    finally:
+        os.remove(path)
+    for line in stdout.splitlines():
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
+def fingerprint(record):
+    return record.get("status_code"), record.get("content_length") or 0, record.get("words") or 0
+
+
+def catch_all(baseline):
+    """The (status, min length, max length, min words, max words) soft-404
+    signature of a host answering random paths with anything but 404."""
+    hits = [fp for fp in baseline if fp[0] and fp[0] != 404]
+    if not hits:
+        return None
+    lengths = [length for _, length, _ in hits]
+    words = [count for _, _, count in hits]
+    # Pages that echo the requested path vary by a few bytes per character
+    slack = max(max(lengths) - min(lengths), 64)
+    return ({status for status, _, _ in hits}, max(min(lengths) - slack, 0), max(lengths) + slack,
+            min(words) - 2, max(words) + 2)
+
+
+def is_soft_404(signature, status, size):
+    statuses, low, high, _, _ = signature
+    return status in statuses and size is not None and low <= size <= high
+
+
+def fuzz_host(domain, url, signature, out, lock):
+    command = ["gobuster", "dir", "-u", url, "-w", WORDLIST, "-t", str(HOST_THREADS),
+               "-f", "-q", "--no-error", "--no-color"]
+    if signature:
+        # gobuster's own wildcard precheck would refuse a catch-all host; its
+        # soft-404s are filtered below by status and size together
+        command.append("--force")
+
+    started = time.time()
+    kept = []
+    suspects = []
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+    try:
+        for line in proc.stdout:
+            line = line.strip()
+            m = HIT_RE.match(line)
+            if not m:
+                continue
+            status, size = int(m.group(2)), int(m.group(3)) if m.group(3) else None
+            if signature and is_soft_404(signature, status, size):
+                continue
+            entry = f"{url}{m.group(1)} {line[m.end(1):].strip()}"
+            if signature and status in signature[0]:
+                # Same status as the catch-all page: compare word counts before keeping it
+                suspects.append((url + m.group(1), entry))
+                continue
+            kept.append(entry)
+            with lock:
+                out.write(entry + "\n")
+                out.flush()
+    finally:
+        proc.stdout.close()
+        finish_popen(proc, command, started, domain=domain, stage="gobuster",
+                     input_file=WORDLIST, output_lines=len(kept))
+
+    if suspects:
+        _, _, _, low_words, high_words = signature
+        words = {record.get("input"): fingerprint(record)[2]
+                 for record in probe(domain, [hit for hit, _ in suspects], "gobuster_verify")}
+        confirmed = [entry for hit, entry in suspects
+                     if words.get(hit) is None or not low_words <= words[hit] <= high_words]
+        with lock:
+            out.writelines(entry + "\n" for entry in confirmed)
+        kept += confirmed
+    return len(kept)
+
 
 def run_gobuster(domain):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     output_file = os.path.join(OUTPUT_DIR, f"{domain}_directory_fuzz.json")
+    urls = live_urls(os.path.join(OUTPUT_DIR, f"{domain}_httpx.json")) or [f"http://{domain}"]
+
+    baselines = fingerprint_hosts(domain, urls)
+    signatures = {url: catch_all(baseline) for url, baseline in baselines.items()}
+    wildcards = sum(1 for signature in signatures.values() if signature)
 
-    command = [
-        "gobuster", 
-        "-u", domain,
-        "-w", WORDLIST,
-        "-o", output_file,
-        "-f", "json"
-    ]
+    lock = threading.Lock()
+    hosts_at_once = max(GLOBAL_THREADS // HOST_THREADS, 1)
+    found = 0
+    with open(output_file, "w") as out:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=hosts_at_once) as executor:
+            futures = {executor.submit(fuzz_host, domain, url, signatures[url], out, lock): url for url in urls}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    found += future.result()
+                except Exception as e:
+                    print(f"[!] gobuster failed for {futures[future]} - {e}")
 
-    silent_run(command)
+    print(f"[*] gobuster: {found} paths on {len(urls)} live URLs "
+          f"({wildcards} catch-all hosts filtered by baseline)")
 
 def main():
     if len(sys.argv) < 2:
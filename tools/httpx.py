@@ -1,14 +1,27 @@
 import os
 import sys
-import subprocess
 import json
+import queue
+import tempfile
+import threading
+import concurrent.futures
+
+from runner import silent_run, capture_run
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
 
+# Pipeline stage declaration (see pipeline.py)
+STAGE_INPUTS = ["naabu.json"]
+STAGE_OUTPUTS = ["httpx.json"]
+STAGE_RESOURCE = "network"
+
+HTTPX_FLAGS = ["-sc", "-td", "-title", "-ip", "-fr", "-j"]
 
-def silent_run(command):
-    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+# Streaming mode: host:port batches handed to httpx workers
+STREAM_BATCH_SIZE = 50
+STREAM_FLUSH_SECONDS = 5
+STREAM_WORKERS = 4
 
 
 def extract_host_ports(naabu_json_path, hostport_txt_path):
@@ -34,10 +47,10 @@ def extract_host_ports(naabu_json_path, hostport_txt_path):
         print(f"[!] Failed to extract host:port - {e}")
 
 
-def run_httpx(domain):
-    naabu_input = os.path.join(OUTPUT_DIR, f"{domain}_naabu.json")
-    hostport_file = os.path.join(OUTPUT_DIR, f"{domain}_hostport.txt")
-    httpx_output = os.path.join(OUTPUT_DIR, f"{domain}_httpx.json")
+def run_httpx(domain, naabu_input=None, httpx_output=None):
+    naabu_input = naabu_input or os.path.join(OUTPUT_DIR, f"{domain}_naabu.json")
+    httpx_output = httpx_output or os.path.join(OUTPUT_DIR, f"{domain}_httpx.json")
+    hostport_file = os.path.join(os.path.dirname(httpx_output), f"{domain}_hostport.txt")
 
     if not os.path.isfile(naabu_input):
         print(f"[!] Missing input file: {naabu_input}")
@@ -47,14 +60,8 @@ def run_httpx(domain):
 
     extract_host_ports(naabu_input, hostport_file)
 
-    command = [
-        "httpx",
-        "-l", hostport_file,
-        "-sc", "-td", "-title", "-ip", "-fr",
-        "-j",
-        "-o", httpx_output
-    ]
-    silent_run(command)
+    command = ["httpx", "-l", hostport_file] + HTTPX_FLAGS + ["-o", httpx_output]
+    silent_run(command, domain=domain, stage="httpx", input_file=hostport_file, output_file=httpx_output)
 
     # Cleanup temp file
     try:
@@ -63,6 +70,97 @@ def run_httpx(domain):
         pass
 
 
+def probe_batch(domain, hostports, httpx_output, lock):
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as temp_file:
+        temp_file.write("\n".join(hostports) + "\n")
+        temp_file_path = temp_file.name
+
+    try:
+        command = ["httpx", "-l", temp_file_path] + HTTPX_FLAGS + ["-silent"]
+        stdout = capture_run(command, domain=domain, stage="httpx", input_file=temp_file_path)
+        lines = [line for line in stdout.splitlines() if line.strip()]
+        if lines:
+            with lock:
+                with open(httpx_output, "a") as out:
+                    out.write("\n".join(lines) + "\n")
+    finally:
+        try:
+            os.remove(temp_file_path)
+        except OSError:
+            pass
+
+
+def run_httpx_stream(domain, naabu_records, batch_size=STREAM_BATCH_SIZE,
+                     flush_seconds=STREAM_FLUSH_SECONDS, workers=STREAM_WORKERS):
+    """Probe host:port pairs while naabu is still scanning.
+
+    naabu_records is any iterable of naabu JSON records (see
+    naabu.stream_naabu). New host:port pairs are batched and handed to a pool
+    of httpx workers whenever a batch fills up or the stream has been quiet
+    for flush_seconds; their results are appended to {domain}_httpx.json.
+    Raises RuntimeError, after probing what it did report, if the naabu
+    stream failed.
+    """
+    httpx_output = os.path.join(OUTPUT_DIR, f"{domain}_httpx.json")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    open(httpx_output, "w").close()
+
+    pending = queue.Queue()
+    done = object()
+    failure = []
+
+    def reader():
+        try:
+            for record in naabu_records:
+                host, port = record.get("host"), record.get("port")
+                if host and port:
+                    pending.put(f"{host}:{port}")
+        except Exception as e:
+            # Re-raised below once the hosts found so far are probed
+            failure.append(e)
+        finally:
+            pending.put(done)
+
+    threading.Thread(target=reader, daemon=True).start()
+
+    seen = set()
+    batch = []
+    lock = threading.Lock()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+
+        def flush():
+            if batch:
+                futures.append(executor.submit(probe_batch, domain, list(batch), httpx_output, lock))
+                batch.clear()
+
+        while True:
+            try:
+                item = pending.get(timeout=flush_seconds)
+            except queue.Empty:
+                flush()
+                continue
+            if item is done:
+                break
+            if item in seen:
+                continue
+            seen.add(item)
+            batch.append(item)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"[!] httpx batch failed - {e}")
+
+    if failure:
+        raise RuntimeError(f"naabu stream failed after {len(seen)} host:port pairs: {failure[0]}") from failure[0]
+    return len(seen)
+
+
 def main():
     if len(sys.argv) != 2:
         print("Usage: python3 httpx.py <domain>")
@@ -0,0 +1,273 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+from urllib.parse import urlparse
+
+import naabu
+import httpx
+import nuclei
+import resolver
+import compression
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
+
+# Pipeline stage declaration (see pipeline.py): the rescan plan every
+# incremental naabu/httpx/nuclei stage works from
+STAGE_INPUTS = ["subdomain.txt"]
+STAGE_OUTPUTS = ["delta.json"]
+STAGE_RESOURCE = "network"
+
+
+def state_path(domain):
+    return os.path.join(OUTPUT_DIR, f"{domain}_scan_state.json")
+
+
+def plan_path(domain):
+    return os.path.join(OUTPUT_DIR, f"{domain}_delta.json")
+
+
+def load_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def read_hosts(path):
+    try:
+        with compression.open_text(path) as f:
+            return {line.strip().lower() for line in f if line.strip()}
+    except OSError:
+        return set()
+
+
+def resolve_ips(hosts):
+    """{host: sorted IPv4 addresses}, empty for hosts that do not resolve."""
+    ips = {host: [] for host in hosts}
+    for found in resolver.iter_resolved(hosts, wildcard_filter=False):
+        if found["name"] in ips:
+            ips[found["name"]] = found["a"]
+    return ips
+
+
+def plan_rescan(domain, ttl=None):
+    """Diff the fresh {domain}_subdomain.txt against the previous scan's state
+    and write the set of hosts naabu/httpx/nuclei must (re)scan.
+
+    A full rescan is planned when there is no previous state or the last full
+    refresh is older than `ttl` seconds. Otherwise only new hosts, hosts whose
+    resolved IPs changed, and hosts last scanned more than `ttl` ago are targeted.
+    """
+    now = time.time()
+    state = load_json(state_path(domain), {})
+    previous = state.get("hosts", {})
+    current = read_hosts(os.path.join(OUTPUT_DIR, f"{domain}_subdomain.txt"))
+    ips = resolve_ips(current)
+
+    full = not previous or (ttl is not None and now - state.get("last_full_refresh", 0) > ttl)
+    if full:
+        targets = set(current)
+        reasons = {"full": len(targets)}
+    else:
+        new = current - set(previous)
+        changed = {
+            h for h in current & set(previous)
+            if ips.get(h) and previous[h].get("ips") and ips[h] != previous[h]["ips"]
+        }
+        stale = set()
+        if ttl is not None:
+            stale = {
+                h for h in current & set(previous)
+                if now - previous[h].get("scanned_at", 0) > ttl
+            }
+        targets = new | changed | stale
+        reasons = {"new": len(new), "changed": len(changed), "stale": len(stale - new - changed)}
+
+    plan = {
+        "domain": domain,
+        "mode": "full" if full else "incremental",
+        "planned_at": now,
+        "targets": sorted(targets),
+        "removed": sorted(set(previous) - current),
+        "ips": {h: ips.get(h, []) for h in sorted(current)},
+        "reasons": reasons,
+    }
+    write_json(plan_path(domain), plan)
+    return plan
+
+
+def host_of(value):
+    """Bare lowercase hostname from a host, host:port or URL."""
+    if not value:
+        return ""
+    if "://" in value:
+        return (urlparse(value).hostname or "").lower()
+    return value.split(":")[0].lower()
+
+
+def merge_json_lines(old_path, new_path, out_path, drop_hosts, key):
+    """Keep previous records whose host was not rescanned or removed, then
+    append the fresh records."""
+    lines = []
+    if os.path.isfile(old_path):
+        with open(old_path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if host_of(key(record)) not in drop_hosts:
+                    lines.append(line)
+    if new_path and os.path.isfile(new_path):
+        with open(new_path, "r") as f:
+            lines.extend(line.strip() for line in f if line.strip())
+
+    tmp = out_path + ".tmp"
+    with open(tmp, "w") as f:
+        f.writelines(line + "\n" for line in lines)
+    os.replace(tmp, out_path)
+
+
+def merge_json_array(old_path, new_path, out_path, drop_hosts):
+    """Same as merge_json_lines for nuclei's -json-export arrays."""
+    old = load_json(old_path, [])
+    new = load_json(new_path, []) if new_path else []
+    if not isinstance(old, list):
+        old = []
+    if not isinstance(new, list):
+        new = []
+    merged = [
+        item for item in old
+        if host_of(item.get("host") or item.get("matched-at")) not in drop_hosts
+    ] + new
+    write_json(out_path, merged)
+
+
+def load_plan(domain):
+    plan = load_json(plan_path(domain), None)
+    if plan is None:
+        raise RuntimeError(f"No rescan plan for {domain}; run plan_rescan first")
+    return plan
+
+
+def _incremental(domain, plan, run, output_suffix, merge):
+    output_file = os.path.join(OUTPUT_DIR, f"{domain}_{output_suffix}")
+    drop = set(plan["targets"]) | set(plan["removed"])
+    if not plan["targets"]:
+        merge(output_file, None, output_file, drop)
+        return
+
+    workdir = tempfile.mkdtemp(prefix=f"{domain}_incremental_")
+    try:
+        new_output = os.path.join(workdir, f"{domain}_{output_suffix}")
+        run(workdir, new_output)
+        merge(output_file, new_output, output_file, drop)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def write_targets(workdir, domain, targets):
+    path = os.path.join(workdir, f"{domain}_subdomain.txt")
+    with open(path, "w") as f:
+        f.writelines(f"{host}\n" for host in targets)
+    return path
+
+
+def run_naabu_delta(domain):
+    plan = load_plan(domain)
+    if plan["mode"] == "full":
+        naabu.run_naabu(domain)
+        return
+
+    def run(workdir, new_output):
+        naabu.run_naabu(domain, write_targets(workdir, domain, plan["targets"]), new_output)
+
+    _incremental(domain, plan, run, "naabu.json",
+                 lambda o, n, out, drop: merge_json_lines(o, n, out, drop, lambda r: r.get("host")))
+
+
+def run_httpx_delta(domain):
+    plan = load_plan(domain)
+    if plan["mode"] == "full":
+        httpx.run_httpx(domain)
+        return
+
+    targets = set(plan["targets"])
+    if not os.path.isfile(os.path.join(OUTPUT_DIR, f"{domain}_naabu.json")):
+        print(f"[!] Missing naabu output for {domain}")
+        return
+
+    def run(workdir, new_output):
+        # Probe only the naabu records of rescanned hosts
+        naabu_subset = os.path.join(workdir, f"{domain}_naabu.json")
+        with open(os.path.join(OUTPUT_DIR, f"{domain}_naabu.json"), "r") as src, open(naabu_subset, "w") as dst:
+            for line in src:
+                try:
+                    if host_of(json.loads(line).get("host")) in targets:
+                        dst.write(line)
+                except json.JSONDecodeError:
+                    continue
+        httpx.run_httpx(domain, naabu_subset, new_output)
+
+    _incremental(domain, plan, run, "httpx.json",
+                 lambda o, n, out, drop: merge_json_lines(o, n, out, drop, lambda r: r.get("input") or r.get("url")))
+
+
+def run_nuclei_delta(domain):
+    plan = load_plan(domain)
+    if plan["mode"] == "full":
+        nuclei.run_nuclei(domain)
+        return
+
+    def run(workdir, new_output):
+        nuclei.run_nuclei(domain, write_targets(workdir, domain, plan["targets"]), new_output)
+
+    _incremental(domain, plan, run, "nuclei.json", merge_json_array)
+
+
+def commit_state(domain):
+    """Record the hosts just scanned so the next run can diff against them."""
+    plan = load_plan(domain)
+    state = load_json(state_path(domain), {})
+    hosts = state.get("hosts", {})
+    targets = set(plan["targets"])
+    for host in plan["removed"]:
+        hosts.pop(host, None)
+    for host, ips in plan["ips"].items():
+        entry = hosts.setdefault(host, {"scanned_at": plan["planned_at"]})
+        if host in targets:
+            entry["scanned_at"] = plan["planned_at"]
+        entry["ips"] = ips
+    state["hosts"] = hosts
+    if plan["mode"] == "full":
+        state["last_full_refresh"] = plan["planned_at"]
+    write_json(state_path(domain), state)
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python3 incremental.py <domain> [ttl_hours]")
+        sys.exit(1)
+
+    ttl = float(sys.argv[2]) * 3600 if len(sys.argv) == 3 else None
+    plan = plan_rescan(sys.argv[1], ttl)
+    print(f"[+] {plan['mode']} rescan: {len(plan['targets'])} targets, {len(plan['removed'])} removed")
+
+
+if __name__ == "__main__":
+    main()
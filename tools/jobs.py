@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+import threading
+import collections
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+MAX_CONCURRENT_SCANS = int(os.environ.get("MAX_CONCURRENT_SCANS", 2))
+
+# PARTIAL: the scan ran but some stages failed or were skipped
+QUEUED, RUNNING, FINISHED, PARTIAL, FAILED = "queued", "running", "finished", "partial", "failed"
+
+
+def _warm_worker():
+    # Pay interpreter start-up and tool imports once per worker, not per scan
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    import main  # noqa: F401
+
+
+def _noop():
+    return os.getpid()
+
+
+def _run_scan(domain, stream):
+    import main
+    return main.ReconTool(stream=stream).run_all(domain)
+
+
+class ScanJobManager:
+    """Queue of full scans run by a fixed pool of pre-warmed worker processes.
+
+    Scans run in submission order; domains already queued or running are
+    not queued again.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_SCANS, stream=False):
+        self.max_concurrent = max_concurrent
+        self.stream = stream
+        self._cond = threading.Condition()
+        self._queue = collections.deque()
+        self._jobs = {}
+        self._running = 0
+        self._executor = self._new_executor()
+        threading.Thread(target=self._dispatch, daemon=True).start()
+
+    def _new_executor(self):
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_concurrent,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+        # Submitting one task per slot at once starts every worker up front
+        for _ in range(self.max_concurrent):
+            executor.submit(_noop)
+        return executor
+
+    def _replace_broken(self, broken):
+        """Swap in a fresh pool once a worker died and broke the old one."""
+        with self._cond:
+            if self._executor is broken:
+                self._executor = self._new_executor()
+                broken.shutdown(wait=False)
+            return self._executor
+
+    def submit(self, domain):
+        """Queue a scan. Returns (job, created) where created is False if the
+        domain was already queued or running."""
+        with self._cond:
+            job = self._jobs.get(domain)
+            if job and job["status"] in (QUEUED, RUNNING):
+                return dict(job), False
+            job = {
+                "domain": domain,
+                "status": QUEUED,
+                "queued_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+            }
+            self._jobs[domain] = job
+            self._queue.append(domain)
+            self._cond.notify()
+            return dict(job), True
+
+    def position(self, domain):
+        with self._cond:
+            if domain in self._queue:
+                return self._queue.index(domain) + 1
+        return None
+
+    def status(self, domain=None):
+        with self._cond:
+            if domain is not None:
+                job = self._jobs.get(domain)
+                return dict(job) if job else None
+            return {d: dict(job) for d, job in self._jobs.items()}
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._queue or self._running >= self.max_concurrent:
+                    self._cond.wait()
+                domain = self._queue.popleft()
+                job = self._jobs[domain]
+                job["status"] = RUNNING
+                job["started_at"] = time.time()
+                self._running += 1
+                executor = self._executor
+            try:
+                future = executor.submit(_run_scan, domain, self.stream)
+            except BrokenProcessPool:
+                future = self._replace_broken(executor).submit(_run_scan, domain, self.stream)
+            future.add_done_callback(lambda f, d=domain, e=executor: self._finished(d, f, e))
+
+    def _finished(self, domain, future, executor):
+        try:
+            # run_all logs and swallows stage errors; its return value says how it went
+            status = future.result() or FAILED
+            error = None if status != FAILED else "scan failed, see recon_tool.log"
+        except BrokenProcessPool as e:
+            status, error = FAILED, f"worker process died: {e}"
+            self._replace_broken(executor)
+        except Exception as e:
+            status, error = FAILED, str(e)
+        with self._cond:
+            job = self._jobs[domain]
+            job["finished_at"] = time.time()
+            job["status"] = status
+            job["error"] = error
+            self._running -= 1
+            self._cond.notify()
@@ -0,0 +1,170 @@
+import os
+import sys
+import zlib
+import bisect
+import itertools
+import threading
+from array import array
+from collections import OrderedDict
+
+import compression
+
+# path -> (mtime_ns, size, offsets, checkpoints); offsets holds the byte
+# position of every non-empty line so page N of a file can be read with a
+# single seek. A gzip stream cannot seek, so its index also keeps decompressor
+# snapshots every CHECKPOINT_SPAN bytes (as zlib's zran.c does): a page is
+# decompressed from the nearest one instead of from the start of the file.
+MAX_INDEXES = 64
+CHECKPOINT_SPAN = int(os.environ.get("RECON_GZIP_CHECKPOINT_SPAN", 1 << 20))
+CHUNK = 1 << 16
+GZIP_WBITS = 31
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def build_line_index(path):
+    with open(path, "rb") as f:
+        data = f.read(CHUNK)
+        if not path.endswith(compression.EXT):
+            return index_lines(itertools.chain([data], iter(lambda: f.read(CHUNK), b""))), None
+        checkpoints = []
+        return index_lines(decompressed_chunks(f, data, checkpoints)), checkpoints
+
+
+def decompressed_chunks(f, data, checkpoints, decompressor=None, raw_pos=0, out_pos=0):
+    """Decompressed blocks of the gzip file f from raw_pos on (data is the
+    first raw block), recording (out_pos, raw_pos, decompressor) snapshots
+    into checkpoints when it is a list."""
+    d = decompressor or zlib.decompressobj(GZIP_WBITS)
+    last = out_pos
+    while data:
+        if checkpoints is not None and (not checkpoints or out_pos - last >= CHECKPOINT_SPAN):
+            checkpoints.append((out_pos, raw_pos, d.copy()))
+            last = out_pos
+        raw_pos += len(data)
+        block = d.decompress(data)
+        while d.eof and d.unused_data:
+            # Concatenated gzip members
+            rest = d.unused_data
+            d = zlib.decompressobj(GZIP_WBITS)
+            block += d.decompress(rest)
+        if block:
+            out_pos += len(block)
+            yield block
+        data = f.read(CHUNK)
+
+
+def index_lines(blocks):
+    offsets = array("Q")
+    pos = 0
+    carry = b""
+    for block in blocks:
+        lines = (carry + block).split(b"\n")
+        carry = lines.pop()
+        for line in lines:
+            if line.strip():
+                offsets.append(pos)
+            pos += len(line) + 1
+    if carry.strip():
+        offsets.append(pos)
+    return offsets
+
+
+def line_offsets(path):
+    return line_index(path)[0]
+
+
+def line_index(path):
+    """(offsets, checkpoints) for path, rebuilt when the file changes."""
+    path = compression.resolve(path)
+    st = os.stat(path)
+    with _lock:
+        entry = _indexes.get(path)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            _indexes.move_to_end(path)
+            return entry[2], entry[3]
+
+    offsets, checkpoints = build_line_index(path)
+
+    with _lock:
+        _indexes[path] = (st.st_mtime_ns, st.st_size, offsets, checkpoints)
+        _indexes.move_to_end(path)
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return offsets, checkpoints
+
+
+def count_lines(path):
+    try:
+        return len(line_offsets(path))
+    except OSError:
+        return 0
+
+
+def read_line_range(path, offset, limit):
+    """Return up to `limit` stripped, non-empty lines starting at line `offset`."""
+    path = compression.resolve(path)
+    try:
+        offsets, checkpoints = line_index(path)
+    except OSError:
+        return []
+    if offset >= len(offsets) or limit <= 0:
+        return []
+
+    lines = []
+    start = offsets[offset]
+    with open(path, "rb") as f:
+        if checkpoints is None:
+            f.seek(start)
+            stream = f
+        else:
+            out_pos, raw_pos, d = checkpoints[bisect.bisect_right(checkpoints, start, key=lambda c: c[0]) - 1]
+            f.seek(raw_pos)
+            blocks = decompressed_chunks(f, f.read(CHUNK), None, d.copy(), raw_pos, out_pos)
+            stream = split_lines(blocks, start - out_pos)
+        for raw in stream:
+            line = raw.strip()
+            if not line:
+                continue
+            lines.append(line.decode("utf-8", errors="replace"))
+            if len(lines) >= limit:
+                break
+    return lines
+
+
+def split_lines(blocks, skip):
+    """Lines of a stream of blocks, after dropping its first skip bytes."""
+    carry = b""
+    for block in blocks:
+        if skip:
+            dropped = min(skip, len(block))
+            block = block[dropped:]
+            skip -= dropped
+        lines = (carry + block).split(b"\n")
+        carry = lines.pop()
+        yield from lines
+    if carry:
+        yield carry
+
+
+def iter_lines(path):
+    try:
+        with compression.open_text(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+    except OSError:
+        return
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python3 line_index.py <file>")
+        sys.exit(1)
+
+    print(f"{count_lines(sys.argv[1])} lines indexed")
+
+
+if __name__ == "__main__":
+    main()
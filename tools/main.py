@@ -24,8 +24,15 @@ import theharvester_email
 import gobuster_fuzz
 import nuclei_dast
 import nuclei
-import chatbot
 import parser
+import store
+import summary
+import incremental
+import batch
+import runner
+import workspace
+import progress
+from pipeline import Stage, build_graph, run_pipeline, write_timing_report
 
 # Logging setup
 logging.basicConfig(
@@ -35,8 +42,11 @@ logging.basicConfig(
 )
 
 class ReconTool:
-    def __init__(self):
+    def __init__(self, stream=False, incremental=False, ttl=None):
         self.logger = logging.getLogger(__name__)
+        self.stream = stream
+        self.incremental = incremental
+        self.ttl = ttl
 
     def run_subdomain(self, domain):
         self.logger.info("[*] Running Subdomain Enumeration...")
@@ -54,6 +64,11 @@ class ReconTool:
         self.logger.info("[*] Running Naabu Port Scan...")
         naabu.run_naabu(domain)
 
+    def run_naabu_httpx_stream(self, domain):
+        self.logger.info("[*] Running Naabu Port Scan streamed into HTTPx...")
+        probed = httpx.run_httpx_stream(domain, naabu.stream_naabu(domain))
+        self.logger.info(f"[+] HTTPx probed {probed} host:port pairs as naabu found them")
+
     def run_theharvester(self, domain):
         self.logger.info("[*] Running theHarvester Email Harvest...")
         theharvester_email.run_theharvester(domain)
@@ -70,58 +85,142 @@ class ReconTool:
         self.logger.info("[*] Running Nuclei Scan...")
         nuclei.run_nuclei(domain)
 
+    def run_rescan_plan(self, domain):
+        self.logger.info("[*] Planning incremental rescan...")
+        plan = incremental.plan_rescan(domain, self.ttl)
+        self.logger.info(
+            f"[+] {plan['mode'].capitalize()} rescan of {len(plan['targets'])} hosts "
+            f"({plan['reasons']}), {len(plan['removed'])} hosts gone"
+        )
+
+    def run_naabu_delta(self, domain):
+        self.logger.info("[*] Running Naabu Port Scan on new/changed hosts...")
+        incremental.run_naabu_delta(domain)
+
+    def run_httpx_delta(self, domain):
+        self.logger.info("[*] Running HTTPx Check on new/changed hosts...")
+        incremental.run_httpx_delta(domain)
+
+    def run_nuclei_delta(self, domain):
+        self.logger.info("[*] Running Nuclei Scan on new/changed hosts...")
+        incremental.run_nuclei_delta(domain)
+
+    def run_commit_state(self, domain):
+        incremental.commit_state(domain)
+
+    def run_ingest(self, domain):
+        self.logger.info("[*] Ingesting outputs into the result store...")
+        scan_id = store.ingest_outputs(domain)
+        self.logger.info(f"[+] Stored results for {domain} as scan {scan_id}")
+
+    def run_summary(self, domain):
+        self.logger.info("[*] Writing scan summary...")
+        summary.write_summary(domain)
+
+    def build_stages(self):
+        """The full recon pipeline as a stage graph; ordering comes from each
+        module's declared inputs and outputs."""
+        stages = [
+            Stage.from_module("subdomain", self.run_subdomain, subdomain),
+            Stage.from_module("urlfinder", self.run_urlfinder, urlfinder),
+            Stage.from_module("theharvester", self.run_theharvester, theharvester_email),
+            Stage.from_module("gobuster", self.run_gobuster, gobuster_fuzz),
+            Stage.from_module("nuclei_dast", self.run_nuclei_dast, nuclei_dast),
+        ]
+        if self.incremental:
+            # naabu/httpx/nuclei only touch hosts the rescan plan selects
+            delta = incremental.STAGE_OUTPUTS
+            stages += [
+                Stage.from_module("rescan_plan", self.run_rescan_plan, incremental),
+                Stage("naabu", self.run_naabu_delta, naabu.STAGE_INPUTS + delta, naabu.STAGE_OUTPUTS),
+                Stage("httpx", self.run_httpx_delta, httpx.STAGE_INPUTS + delta, httpx.STAGE_OUTPUTS),
+                Stage("nuclei", self.run_nuclei_delta, nuclei.STAGE_INPUTS + delta, nuclei.STAGE_OUTPUTS),
+                Stage("commit_state", self.run_commit_state,
+                      naabu.STAGE_OUTPUTS + httpx.STAGE_OUTPUTS + nuclei.STAGE_OUTPUTS,
+                      ["scan_state.json"], "cpu"),
+            ]
+        elif self.stream:
+            stages.append(Stage(
+                "naabu_httpx", self.run_naabu_httpx_stream,
+                inputs=naabu.STAGE_INPUTS,
+                outputs=naabu.STAGE_OUTPUTS + httpx.STAGE_OUTPUTS,
+                resource=naabu.STAGE_RESOURCE
+            ))
+        else:
+            stages.append(Stage.from_module("naabu", self.run_naabu, naabu))
+            stages.append(Stage.from_module("httpx", self.run_httpx, httpx))
+        if not self.incremental:
+            stages.append(Stage.from_module("nuclei", self.run_nuclei, nuclei))
+        stages.append(Stage.from_module("ingest", self.run_ingest, store))
+        return stages
+
     def run_all(self, domain):
-        import concurrent.futures
+        """Run the full pipeline and publish its outputs. Returns "finished",
+        "partial" (some stages failed or were skipped) or "failed"."""
         start = time.time()
+        carry_over = workspace.CARRY_OVER if self.incremental else ()
+        events = None
+        status, error, published = "finished", None, False
         try:
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                # 1. Start subdomain and theharvester in parallel
-                future_subdomain = executor.submit(self.run_subdomain, domain)
-                future_theharvester = executor.submit(self.run_theharvester, domain)
-
-                # 2. When subdomain is done, run naabu, urlfinder, gobuster, nuclei in parallel
-                def after_subdomain():
-                    f_naabu = executor.submit(self.run_naabu, domain)
-                    f_urlfinder = executor.submit(self.run_urlfinder, domain)
-                    f_gobuster = executor.submit(self.run_gobuster, domain)
-                    f_nuclei = executor.submit(self.run_nuclei, domain)
-                    return f_naabu, f_urlfinder, f_gobuster, f_nuclei
-
-                future_subdomain.result()  # Wait for subdomain to finish
-                f_naabu, f_urlfinder, f_gobuster, f_nuclei = after_subdomain()
-
-                # 3. When urlfinder is done, run nuclei_dast
-                def after_urlfinder():
-                    f_urlfinder.result()
-                    return executor.submit(self.run_nuclei_dast, domain)
-                f_nuclei_dast = after_urlfinder()
-
-                # 4. When naabu is done, run httpx
-                def after_naabu():
-                    f_naabu.result()
-                    return executor.submit(self.run_httpx, domain)
-                f_httpx = after_naabu()
-
-                # Wait for all remaining futures to finish
-                concurrent.futures.wait([
-                    future_theharvester,
-                    f_gobuster,
-                    f_nuclei,
-                    f_nuclei_dast,
-                    f_httpx
-                ])
-        except Exception as e:
-            self.logger.error(f"[!] Error during full run: {e}")
+            with workspace.scan_workspace(domain, carry_over=carry_over) as work:
+                self.logger.info(f"[*] Scan workspace: {work}")
+                runner.start_scan_metrics(domain)
+                events = progress.ScanProgress(domain, work)
+                try:
+                    stages = self.build_stages()
+                    events.begin(stages, build_graph(stages))
+                    report = run_pipeline(stages, domain, logger=self.logger, listener=events)
+                    write_timing_report(report)
+                    self.run_summary(domain)
+                    self.logger.info(
+                        f"[+] Critical path: {' -> '.join(report['critical_path'])} "
+                        f"({report['critical_path_seconds']:.2f}s)"
+                    )
+                    if report["failed"] or report["skipped"]:
+                        status = "partial"
+                except Exception as e:
+                    status, error = "failed", str(e)
+                    self.logger.error(f"[!] Error during full run: {e}")
+                finally:
+                    events.drain()
+            published = True
+        finally:
+            # Sent after publishing so the results are in Outputs/ when it arrives
+            if not published:
+                status = "failed"
+            if events:
+                events.finish(status, error)
         end = time.time()
-        self.logger.info(f"[+] Completed all tools in {end - start:.2f} seconds.")
+        self.logger.info(f"[+] Completed all tools in {end - start:.2f} seconds, outputs published.")
+        return status
+
+    def run_batch(self, domains_file, concurrency=batch.BATCH_CONCURRENCY):
+        domains = batch.read_domains(domains_file)
+        start = time.time()
+        status = "failed"
+        try:
+            with workspace.scan_workspace(*domains, carry_over=batch.SHARED_OUTPUTS):
+                status = batch.run_batch(domains, concurrency, log=self.logger.info)
+                for domain in domains:
+                    self.run_ingest(domain)
+                    self.run_summary(domain)
+        except Exception as e:
+            status = "failed"
+            self.logger.error(f"[!] Error during batch run: {e}")
+        self.logger.info(f"[+] Completed batch of {len(domains)} domains ({status}) in {time.time() - start:.2f} seconds.")
+        return status
 
     def start_chatbot(self):
+        # Imported on use so scans (and the web app's workers) do not need it
+        import chatbot
         self.logger.info("[*] Starting Chatbot...")
         chatbot.chatbot()
 
 def main():
     parser_obj = argparse.ArgumentParser(description="Recon Automation Tool")
     parser_obj.add_argument("-d", "--domain", help="Target domain")
+    parser_obj.add_argument("-f", "--domains-file", help="File of target domains, one per line, scanned as one batch")
+    parser_obj.add_argument("--concurrency", type=int, default=batch.BATCH_CONCURRENCY, help="Domains enumerated at once in batch mode")
     parser_obj.add_argument("--subdomain", action="store_true", help="Run Subdomain Enumeration")
     parser_obj.add_argument("--urlfinder", action="store_true", help="Run URL Finder")
     parser_obj.add_argument("--naabu", action="store_true", help="Run Naabu Port Scan")
@@ -130,15 +229,27 @@ def main():
     parser_obj.add_argument("--gobuster", action="store_true", help="Run Gobuster Fuzz")
     parser_obj.add_argument("--nuclei_dast", action="store_true", help="Run Nuclei DAST")
     parser_obj.add_argument("--nuclei", action="store_true", help="Run Nuclei Scan")
+    parser_obj.add_argument("--ingest", action="store_true", help="Load existing outputs into the result store")
     parser_obj.add_argument("--all", action="store_true", help="Run all tools step by step")
+    parser_obj.add_argument("--stream", action="store_true", help="Feed naabu results into httpx as ports are found")
+    parser_obj.add_argument("--incremental", action="store_true", help="Only probe hosts that are new or changed since the last scan")
+    parser_obj.add_argument("--ttl", type=float, help="Hours after which --incremental forces a full refresh")
 
     args = parser_obj.parse_args()
 
-    recon = ReconTool()
+    recon = ReconTool(
+        stream=args.stream,
+        incremental=args.incremental,
+        ttl=args.ttl * 3600 if args.ttl else None
+    )
 
 
-    if not args.domain and not args.chatbot:
-        print("[!] Domain is required unless using chatbot")
+    if args.domains_file:
+        recon.run_batch(args.domains_file, args.concurrency)
+        return
+
+    if not args.domain:
+        print("[!] A domain (-d) or a domains file (-f) is required")
         return
 
     domain = args.domain
@@ -146,23 +257,40 @@ def main():
     # Run based on flags
     if args.all:
         recon.run_all(domain)
-    else:
-        if args.subdomain:
-            recon.run_subdomain(domain)
-        if args.urlfinder:
-            recon.run_urlfinder(domain)
-        if args.naabu:
-            recon.run_naabu(domain)
-        if args.httpx:
-            recon.run_httpx(domain)
-        if args.theharvester:
-            recon.run_theharvester(domain)
-        if args.gobuster:
-            recon.run_gobuster(domain)
-        if args.nuclei_dast:
-            recon.run_nuclei_dast(domain)
-        if args.nuclei:
-            recon.run_nuclei(domain)
+        return
+
+    selected = [module for flag, module in (
+        (args.subdomain, subdomain), (args.urlfinder, urlfinder), (args.naabu, naabu),
+        (args.httpx, httpx), (args.theharvester, theharvester_email), (args.gobuster, gobuster_fuzz),
+        (args.nuclei_dast, nuclei_dast), (args.nuclei, nuclei),
+    ) if flag]
+    if selected:
+        # Published outputs are gzipped; the workspace starts from plain
+        # copies of the ones these tools read and publishes what they write
+        carry_over = list(dict.fromkeys(suffix for module in selected for suffix in module.STAGE_INPUTS))
+        with workspace.scan_workspace(domain, carry_over=carry_over):
+            if args.subdomain:
+                recon.run_subdomain(domain)
+            if args.urlfinder:
+                recon.run_urlfinder(domain)
+            if args.naabu and args.httpx and args.stream:
+                recon.run_naabu_httpx_stream(domain)
+            else:
+                if args.naabu:
+                    recon.run_naabu(domain)
+                if args.httpx:
+                    recon.run_httpx(domain)
+            if args.theharvester:
+                recon.run_theharvester(domain)
+            if args.gobuster:
+                recon.run_gobuster(domain)
+            if args.nuclei_dast:
+                recon.run_nuclei_dast(domain)
+            if args.nuclei:
+                recon.run_nuclei(domain)
+    if args.ingest:
+        # Reads the published (compressed) outputs directly
+        recon.run_ingest(domain)
 
 if __name__ == "__main__":
     main()
@@ -1,14 +1,163 @@
 import os
 import sys
+import json
+import time
+import tempfile
 import subprocess
 
+from runner import silent_run, finish_popen
+import resolver
+import cdn
+
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
 
-def silent_run(command):
-    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+# Pipeline stage declaration (see pipeline.py)
+STAGE_INPUTS = ["subdomain.txt"]
+STAGE_OUTPUTS = ["naabu.json"]
+STAGE_RESOURCE = "network"
+
+# Scan each resolved IP once and fan its ports out to every hostname on it
+IP_DEDUP = os.environ.get("RECON_NAABU_IP_DEDUP", "1") != "0"
+# Scan CDN/WAF edge IPs (see cdn.py) with cdn.CDN_PORTS instead of all ports
+CDN_PROFILE = os.environ.get("RECON_NAABU_CDN_PROFILE", "1") != "0"
+
+FULL_PORTS = "-"
+
+
+def read_hosts(path):
+    with open(path, "r") as f:
+        return list(dict.fromkeys(line.strip().lower() for line in f if line.strip()))
+
+
+def group_by_ip(hosts):
+    """({target: [hostnames]}, {target: cdn provider}) with one target per
+    IPv4 address. Hostnames that do not resolve to IPv4 are kept as their
+    own target so naabu still gets to try them."""
+    groups = {}
+    cnames = {}
+    resolved = set()
+    for found in resolver.iter_resolved(hosts, wildcard_filter=False):
+        if found["a"]:
+            ip = found["a"][0]
+            groups.setdefault(ip, []).append(found["name"])
+            cnames.setdefault(ip, []).extend(found["cname"])
+            resolved.add(found["name"])
+    for host in hosts:
+        if host not in resolved:
+            groups.setdefault(host, []).append(host)
+    labels = {}
+    if CDN_PROFILE:
+        db = cdn.load_db()
+        for ip, names in cnames.items():
+            provider = db.classify([ip], names)
+            if provider:
+                labels[ip] = provider
+    return groups, labels
+
+
+def write_targets(targets):
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
+        f.writelines(f"{target}\n" for target in targets)
+        return f.name
+
+
+def fan_out(record, groups, labels):
+    """One naabu record per hostname sharing the scanned IP, labelled with
+    the CDN in front of it (httpx's cdn/cdn_name fields)."""
+    target = record.get("ip") or record.get("host")
+    hosts = groups.get(target) or groups.get(record.get("host")) or [record.get("host")]
+    extra = {"ip": record.get("ip") or target}
+    if target in labels:
+        extra["cdn"] = True
+        extra["cdn_name"] = labels[target]
+    for host in hosts:
+        yield dict(record, host=host, **extra)
+
+
+def plan_scans(input_file):
+    """[(stage, ports, targets_file)] plus the IP groups and CDN labels the
+    results are fanned out with (groups is None when IP dedup is off)."""
+    if not IP_DEDUP:
+        return [("naabu", FULL_PORTS, input_file)], None, {}
+    hosts = read_hosts(input_file)
+    groups, labels = group_by_ip(hosts)
+    origin = [target for target in groups if target not in labels]
+    edge = [target for target in groups if target in labels]
+    print(f"[*] naabu: {len(hosts)} hostnames share {len(groups)} unique targets, "
+          f"{len(edge)} behind a CDN get the reduced port profile")
+    scans = []
+    # CDN edges first: their short port list finishes quickly
+    if edge:
+        scans.append(("naabu_cdn", cdn.CDN_PORTS, write_targets(edge)))
+    if origin:
+        scans.append(("naabu", FULL_PORTS, write_targets(origin)))
+    return scans, groups, labels
+
+
+def remove_targets(scans, groups):
+    if groups is not None:
+        for _, _, targets_file in scans:
+            os.remove(targets_file)
+
+
+def run_naabu(domain, input_file=None, output_file=None):
+    input_file = input_file or os.path.join(OUTPUT_DIR, f"{domain}_subdomain.txt")
+    output_file = output_file or os.path.join(OUTPUT_DIR, f"{domain}_naabu.json")
+
+    if not os.path.exists(input_file):
+        print(f"[!] Input file not found: {input_file}")
+        return
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    scans, groups, labels = plan_scans(input_file)
+    parts = []
+    try:
+        for stage, ports, targets_file in scans:
+            part = output_file if groups is None else f"{output_file}.{stage}"
+            command = [
+                "naabu",
+                "-l", targets_file,
+                "-p", ports,
+                "-json",
+                "-o", part
+            ]
+            silent_run(command, domain=domain, stage=stage, input_file=targets_file, output_file=part)
+            parts.append(part)
+        if groups is not None:
+            expand_output(parts, output_file, groups, labels)
+    finally:
+        remove_targets(scans, groups)
+        for part in parts:
+            if part != output_file and os.path.exists(part):
+                os.remove(part)
+
+
+def expand_output(parts, output_file, groups, labels):
+    """Combine naabu's per-IP outputs into one record per hostname."""
+    tmp = output_file + ".tmp"
+    with open(tmp, "w") as dst:
+        for part in parts:
+            if not os.path.isfile(part):
+                continue
+            with open(part, "r") as src:
+                for line in src:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    for expanded in fan_out(record, groups, labels):
+                        dst.write(json.dumps(expanded, separators=(",", ":")) + "\n")
+    os.replace(tmp, output_file)
+
+def stream_naabu(domain):
+    """Run naabu and yield each open port record as soon as it is reported.
 
-def run_naabu(domain):
+    Records are also written to {domain}_naabu.json as they arrive, so the
+    output file is identical to a run_naabu() scan once the stream ends.
+    Raises RuntimeError when naabu exits non-zero.
+    """
     input_file = os.path.join(OUTPUT_DIR, f"{domain}_subdomain.txt")
     output_file = os.path.join(OUTPUT_DIR, f"{domain}_naabu.json")
 
@@ -18,15 +167,48 @@ def run_naabu(domain):
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    command = [
-        "naabu",
-        "-l", input_file,
-        "-p", "-",        
-        "-json",
-        "-o", output_file
-    ]
+    scans, groups, labels = plan_scans(input_file)
+    try:
+        with open(output_file, "w") as out:
+            for stage, ports, targets_file in scans:
+                command = [
+                    "naabu",
+                    "-l", targets_file,
+                    "-p", ports,
+                    "-json",
+                    "-silent"
+                ]
 
-    silent_run(command)
+                started = time.time()
+                produced = 0
+                proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+                try:
+                    for line in proc.stdout:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if groups is None:
+                            records = [record]
+                            out.write(line + "\n")
+                        else:
+                            records = list(fan_out(record, groups, labels))
+                            out.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+                        out.flush()
+                        for record in records:
+                            produced += 1
+                            yield record
+                finally:
+                    proc.stdout.close()
+                    exit_code = finish_popen(proc, command, started, domain=domain, stage=stage,
+                                             input_file=targets_file, output_lines=produced)
+                if exit_code != 0:
+                    raise RuntimeError(f"naabu ({stage}) exited {exit_code}")
+    finally:
+        remove_targets(scans, groups)
 
 def main():
     if len(sys.argv) != 2:
@@ -1,37 +1,34 @@
 import os
 import sys
-import subprocess
+
+import nuclei_shard
 
 # Set base directory paths
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 OUTPUT_DIR = os.path.join(BASE_DIR, "Outputs")
 
-# Silent subprocess run
-def silent_run(command):
-    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+# Pipeline stage declaration (see pipeline.py)
+STAGE_INPUTS = ["subdomain.txt"]
+STAGE_OUTPUTS = ["nuclei.json"]
+STAGE_RESOURCE = "network"
 
 # Main nuclei execution
-def run_nuclei(domain):
+def run_nuclei(domain, subdomain_file=None, output_file=None):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    subdomain_file = os.path.join(OUTPUT_DIR, f"{domain}_subdomain.txt")
-    output_file = os.path.join(OUTPUT_DIR, f"{domain}_nuclei.json")
+    subdomain_file = subdomain_file or os.path.join(OUTPUT_DIR, f"{domain}_subdomain.txt")
+    output_file = output_file or os.path.join(OUTPUT_DIR, f"{domain}_nuclei.json")
 
     if not os.path.isfile(subdomain_file):
         return  # Silently exit if subdomain file not found
 
-    if os.path.exists(output_file):
-        os.remove(output_file)
-
     command = [
         "nuclei",
-        "-list", subdomain_file,
         "-nc",
-        "-silent",
-        "-json-export", output_file
+        "-silent"
     ]
 
-    silent_run(command)
+    nuclei_shard.run_sharded(command, subdomain_file, output_file, domain=domain, stage="nuclei")
 
 # Script entry point
 def main():
@@ -1,15 +1,23 @@
 import os
 import sys
-import subprocess
-import json
+import time
 import tempfile
 
+from runner import record
+import nuclei_shard
+import urlcluster
+
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 OUTPUT_DIR = os.path.join(BASE_DIR, "Outputs")
 NUCLEI_TEMPLATES = os.path.expanduser("~/nuclei-templates/dast/vulnerabilities/")
 
-def silent_run(command):
-    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+# Pipeline stage declaration (see pipeline.py)
+STAGE_INPUTS = ["urlfinder.json"]
+STAGE_OUTPUTS = ["vulnerabilities.json"]
+STAGE_RESOURCE = "network"
+
+# Send one URL per (host, path template, parameter set) cluster instead of all of them (see urlcluster.py)
+CLUSTER_URLS = os.environ.get("RECON_DAST_CLUSTER", "1") != "0"
 
 def run_nuclei_dast(domain):
     urlfinder_file = os.path.join(OUTPUT_DIR, f"{domain}_urlfinder.json")
@@ -18,43 +26,46 @@ def run_nuclei_dast(domain):
     if not os.path.isfile(urlfinder_file):
         return  # Silent exit if input file missing
 
-    urls = []
-    try:
-        with open(urlfinder_file, "r") as f:
-            for line in f:
-                try:
-                    data = json.loads(line.strip())
-                    url = data.get("url")
-                    if url:
-                        urls.append(url)
-                except json.JSONDecodeError:
-                    continue
-    except Exception:
-        return  # Silent exit on error
+    temp_file_path = os.path.join(tempfile.gettempdir(), f"{domain}_dast_targets.txt")
+    if CLUSTER_URLS:
+        started = time.time()
+        try:
+            stats = urlcluster.reduce_file(urlfinder_file, temp_file_path)
+        except OSError:
+            return  # Silent exit on error
+        record(domain, "url_cluster", "urlcluster", started, None, 0, urlfinder_file, output_lines=stats["clusters"])
+        print(f"[*] nuclei -dast: {stats['input']} URLs reduced to {stats['clusters']} targets "
+              f"({stats['reduction']:.1%} fewer)")
+        count = stats["clusters"]
+    else:
+        count = 0
+        try:
+            with open(temp_file_path, "w") as temp_file:
+                for url in urlcluster.urls_from_urlfinder(urlfinder_file):
+                    temp_file.write(url + "\n")
+                    count += 1
+        except OSError:
+            return  # Silent exit on error
 
-    if not urls:
+    if not count:
+        os.remove(temp_file_path)
         return  # Silent exit if no URLs
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as temp_file:
-        temp_file.write("\n".join(urls))
-        temp_file_path = temp_file.name
-
     command = [
         "nuclei",
-        "-list", temp_file_path,
         "-dast",
         "-t", NUCLEI_TEMPLATES,
         "-nc",
-        "-silent",
-        "-json-export", output_file
+        "-silent"
     ]
 
-    silent_run(command)
-
     try:
-        os.remove(temp_file_path)
-    except OSError:
-        pass
+        nuclei_shard.run_sharded(command, temp_file_path, output_file, domain=domain, stage="nuclei_dast")
+    finally:
+        try:
+            os.remove(temp_file_path)
+        except OSError:
+            pass
 
 def main():
     if len(sys.argv) != 2:
@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import tempfile
+import threading
+import concurrent.futures
+from urllib.parse import urlsplit
+
+from runner import silent_run, record
+
+# Parallel nuclei workers; each gets an equal share of the request budget
+WORKERS = int(os.environ.get("RECON_NUCLEI_WORKERS", os.cpu_count() or 2))
+# Requests per second across all workers (nuclei's own default for one process)
+RATE_LIMIT = int(os.environ.get("RECON_NUCLEI_RATE_LIMIT", 150))
+# Below this many requests/second a worker is not worth its template loading time
+MIN_WORKER_RATE = 25
+# Targets per shard below which splitting further only adds startup overhead
+MIN_SHARD_TARGETS = int(os.environ.get("RECON_NUCLEI_MIN_SHARD", 50))
+RETRIES = int(os.environ.get("RECON_NUCLEI_RETRIES", 1))
+
+# RATE_LIMIT is one budget for every run_sharded call in the process
+# (nuclei and nuclei_dast run concurrently); each shard holds its -rl
+# share of it while nuclei runs
+_budget = threading.Condition()
+_rate_in_use = 0
+
+
+def read_targets(path):
+    with open(path, "r") as f:
+        return list(dict.fromkeys(line.strip() for line in f if line.strip()))
+
+
+def worker_count(targets):
+    by_budget = max(RATE_LIMIT // MIN_WORKER_RATE, 1)
+    by_size = max(math.ceil(targets / MIN_SHARD_TARGETS), 1)
+    return max(min(WORKERS, by_budget, by_size), 1)
+
+
+def target_host(target):
+    """Hostname of a URL, host:port or bare host target."""
+    if "://" in target:
+        return (urlsplit(target).hostname or target).lower()
+    return target.split(":")[0].lower()
+
+
+def split_targets(targets, shards):
+    """Up to `shards` chunks of targets with every host's targets kept in the
+    same chunk. Hosts go largest first to the smallest chunk so far, which
+    keeps chunk sizes within one host's share of each other."""
+    hosts = {}
+    for target in sorted(targets):
+        hosts.setdefault(target_host(target), []).append(target)
+    chunks = [[] for _ in range(shards)]
+    for group in sorted(hosts.values(), key=len, reverse=True):
+        min(chunks, key=len).extend(group)
+    return [sorted(chunk) for chunk in chunks if chunk]
+
+
+def load_export(path):
+    """Findings from a -json-export file, or None if nuclei did not finish it."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, list) else None
+
+
+def write_merged(output_file, results):
+    """Rewrite output_file with every finished shard's findings, in shard order."""
+    tmp = output_file + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump([item for index in sorted(results) for item in results[index]], f, separators=(",", ":"))
+    os.replace(tmp, output_file)
+
+
+def acquire_rate(share):
+    """Take up to `share` requests/second from the shared budget, waiting
+    until at least MIN_WORKER_RATE (or the whole share, if smaller) is free."""
+    global _rate_in_use
+    need = min(share, MIN_WORKER_RATE)
+    with _budget:
+        _budget.wait_for(lambda: RATE_LIMIT - _rate_in_use >= need)
+        rate = min(share, RATE_LIMIT - _rate_in_use)
+        _rate_in_use += rate
+        return rate
+
+
+def release_rate(rate):
+    global _rate_in_use
+    with _budget:
+        _rate_in_use -= rate
+        _budget.notify_all()
+
+
+def run_shard(command, chunk_file, export_file, domain, stage, share):
+    for attempt in range(RETRIES + 1):
+        if os.path.exists(export_file):
+            os.remove(export_file)
+        rate = acquire_rate(share)
+        try:
+            exit_code = silent_run(command + ["-rl", str(rate), "-list", chunk_file, "-json-export", export_file],
+                                   domain=domain, stage=f"{stage}_shard", input_file=chunk_file,
+                                   output_file=export_file)
+        finally:
+            release_rate(rate)
+        findings = load_export(export_file)
+        if exit_code == 0 and findings is None:
+            # nuclei skips the export when nothing matched
+            findings = []
+        if exit_code == 0:
+            return findings
+        print(f"[!] {stage} shard {os.path.basename(chunk_file)} exited {exit_code} "
+              f"(attempt {attempt + 1}/{RETRIES + 1})")
+    raise RuntimeError(f"{stage} shard {os.path.basename(chunk_file)} failed")
+
+
+def run_sharded(command, targets_file, output_file, domain=None, stage="nuclei"):
+    """Run nuclei `command` (without -list/-json-export) over targets_file in
+    balanced parallel shards, merging their -json-export arrays into
+    output_file as each shard finishes. Shards share RATE_LIMIT with any
+    other run_sharded call in progress; one that finds the budget taken
+    waits for a running shard to finish. Raises RuntimeError once the
+    others are merged if any shard failed."""
+    started = time.time()
+    targets = read_targets(targets_file)
+    workers = worker_count(len(targets))
+    chunks = split_targets(targets, workers)
+    share = max(RATE_LIMIT // workers, 1)
+
+    results = {}
+    failed = []
+    workdir = tempfile.mkdtemp(prefix=f"{stage}_shards_")
+    write_merged(output_file, results)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for index, chunk in enumerate(chunks):
+                chunk_file = os.path.join(workdir, f"shard{index:03d}.txt")
+                with open(chunk_file, "w") as f:
+                    f.writelines(target + "\n" for target in chunk)
+                export_file = os.path.join(workdir, f"shard{index:03d}.json")
+                futures[executor.submit(run_shard, command, chunk_file, export_file, domain, stage, share)] = index
+            for future in concurrent.futures.as_completed(futures):
+                index = futures[future]
+                try:
+                    findings = future.result()
+                except Exception as e:
+                    print(f"[!] {e}")
+                    failed.append(index)
+                    continue
+                results[index] = findings
+                write_merged(output_file, results)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    found = sum(len(items) for items in results.values())
+    record(domain, stage, command, started, None, 1 if failed else 0, targets_file, output_lines=found)
+    print(f"[*] {stage}: {len(targets)} targets in {len(chunks)} shards at up to {share} req/s each, "
+          f"{found} findings" + (f", {len(failed)} shards failed" if failed else ""))
+    if failed:
+        # output_file keeps the finished shards' findings
+        raise RuntimeError(f"{stage}: {len(failed)} of {len(chunks)} shards failed")
+    return found
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python3 nuclei_shard.py <targets_file> <output_json>")
+        sys.exit(1)
+
+    run_sharded(["nuclei", "-nc", "-silent"], sys.argv[1], sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,94 +1,244 @@
 import os
 import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import store
+import records
+import compression
 
 DATA_DIR = "../Outputs"
 
-def read_json_lines(filepath):
-    """Reads a JSON file line-by-line as separate objects (used for httpx, naabu)."""
+# Parsed artifacts: (domain, artifact) -> (store stamp, latest scan, output
+# file stamps, value), least recently used evicted first. A chat asks about
+# the same domain over and over, so each artifact is read once and its
+# aggregates kept until its sources change
+CACHE_ENTRIES = int(os.environ.get("RECON_PARSER_CACHE_ENTRIES", 64))
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def outputs_newer(paths, finished_at):
+    """Whether any of the output files was written after an ingest finished."""
+    for path in paths:
+        try:
+            if os.path.getmtime(path) > finished_at:
+                return True
+        except OSError:
+            pass
+    return False
+
+def fresh_scan(domain, paths, conn=None):
+    """(scan_id, finished_at) of the domain's latest ingested scan if it is at
+    least as new as every one of the output files, else None: a rescan whose
+    outputs were written but not yet ingested is read from the files."""
+    row = store.latest_scan(domain, conn)
+    if not row or outputs_newer(paths, row[1]):
+        return None
+    return row
+
+def query_store(domain, sql, params=(), conn=None, scan_id=None, paths=()):
+    """Run an indexed lookup against the domain's latest ingested scan.
+    Returns None when the domain has not been ingested, or its output files
+    are newer than the ingest, so callers fall back to files."""
+    own = conn is None
     try:
-        with open(filepath, 'r') as f:
-            return [json.loads(line.strip()) for line in f if line.strip()]
-    except Exception as e:
-        return f"[!] Failed to read {filepath}: {e}"
+        conn = conn or store.connect()
+        try:
+            if scan_id is None:
+                row = fresh_scan(domain, paths, conn)
+                if row is None:
+                    return None
+                scan_id = row[0]
+            return store.fetch_column(sql, (scan_id,) + tuple(params), conn)
+        finally:
+            if own:
+                conn.close()
+    except sqlite3.Error:
+        return None
 
-def read_directory_fuzz_file(filepath):
-    """Parses lines like '/.git/                (Status: 200) [Size: 921]'."""
+def read_records(iterate, filepath):
+    """Materialise a records.iter_* parser, or return an error message."""
     try:
-        with open(filepath, 'r') as f:
-            return [line.strip() for line in f if line.strip()]
+        return list(iterate(filepath))
     except Exception as e:
         return f"[!] Failed to read {filepath}: {e}"
 
-def get_alive_urls(domain):
-    file = os.path.join(DATA_DIR, f"{domain}_httpx.json")
-    entries = read_json_lines(file)
-    if isinstance(entries, str): return entries  # error message
+def output_path(domain, suffix):
+    return compression.resolve(os.path.join(DATA_DIR, f"{domain}_{suffix}"))
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def load_alive_urls(domain, lookup):
+    """200-status URLs, or an error message."""
+    urls = lookup("SELECT url FROM http WHERE scan_id = ? AND status_code = 200 ORDER BY rowid")
+    if urls:
+        return urls
+    probes = read_records(records.iter_http, output_path(domain, "httpx.json"))
+    if isinstance(probes, str): return probes  # error message
+    return [probe.url for probe in probes if probe.status_code == 200]
+
+def load_open_ports(domain, lookup):
+    """Sorted unique ports open on the domain's hosts, or an error message."""
+    ports = lookup("SELECT DISTINCT port FROM ports WHERE scan_id = ? AND host LIKE ?", (f"%{domain}",))
+    if ports:
+        return sorted(str(port) for port in ports)
+    hits = read_records(records.iter_ports, output_path(domain, "naabu.json"))
+    if isinstance(hits, str): return hits
+    # Same case-insensitive suffix match as the LIKE above
+    suffix = domain.lower()
+    return sorted(set(str(hit.port) for hit in hits if (hit.get("host") or "").lower().endswith(suffix)))
+
+def load_fuzzed_paths(domain, lookup):
+    lines = lookup("SELECT raw FROM directories WHERE scan_id = ? ORDER BY rowid")
+    if lines:
+        return lines
+    return read_records(records.iter_lines, output_path(domain, "directory_fuzz.json"))
+
+def load_emails(domain, lookup):
+    """Harvested emails; None when there is no email data at all."""
+    emails = lookup("SELECT email FROM emails WHERE scan_id = ? ORDER BY rowid")
+    if emails:
+        return emails
+    try:
+        with compression.open_text(output_path(domain, "emails.json")) as f:
+            return json.load(f).get('emails', [])
+    except FileNotFoundError:
+        return None
+
+def load_subdomains(domain, lookup):
+    """(source, subdomains), resolved ones preferred; None when there is no
+    list of all subdomains to fall back to."""
+    for source in ("resolved", "all"):
+        subdomains = lookup("SELECT raw FROM subdomains WHERE scan_id = ? AND source = ? ORDER BY rowid", (source,))
+        if subdomains:
+            return source, subdomains
+
+    for source, suffix in (("resolved", "subdomain.txt"), ("all", "overall_subdomain.txt")):
+        try:
+            with compression.open_text(output_path(domain, suffix)) as f:
+                subdomains = [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            if source == "all":
+                return None
+            continue
+        if subdomains:
+            return source, subdomains
+    return source, []
+
+# artifact -> (loader, output files it falls back to)
+ARTIFACTS = {
+    "alive_urls": (load_alive_urls, ["httpx.json"]),
+    "open_ports": (load_open_ports, ["naabu.json"]),
+    "fuzzed_paths": (load_fuzzed_paths, ["directory_fuzz.json"]),
+    "emails": (load_emails, ["emails.json"]),
+    "subdomains": (load_subdomains, ["subdomain.txt", "overall_subdomain.txt"]),
+}
 
-    urls = [entry["url"] for entry in entries if entry.get("status_code") == 200]
+def store_stamp():
+    """Stats of the store's database and WAL: they change on every ingest."""
+    return tuple(file_stamp(path) for path in (store.DB_PATH, store.DB_PATH + "-wal"))
+
+def cached(domain, artifact):
+    """ARTIFACTS[artifact] for domain, served from memory until the domain's
+    latest ingested scan or one of the artifact's output files changes.
+
+    Hits only stat files. When the store has changed since an entry was made
+    (any domain's ingest), the domain's latest scan is looked up once and the
+    entry kept if that scan is the same."""
+    loader, suffixes = ARTIFACTS[artifact]
+    paths = [output_path(domain, suffix) for suffix in suffixes]
+    files = tuple(file_stamp(path) for path in paths)
+    db = store_stamp()
+    key = (domain, artifact)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and entry[0] == db and entry[2] == files:
+            _cache.move_to_end(key)
+            return entry[3]
+
+    # Reading never creates the store
+    conn = None
+    if db[0] is not None:
+        try:
+            conn = store.connect()
+        except sqlite3.Error:
+            conn = None
+    try:
+        try:
+            row = store.latest_scan(domain, conn) if conn else None
+        except sqlite3.Error:
+            row = None
+        scan = tuple(row) if row else None
+        if entry and entry[1] == scan and entry[2] == files:
+            value = entry[3]
+        else:
+            scan_id = row[0] if row and not outputs_newer(paths, row[1]) else None
+
+            def lookup(sql, params=()):
+                if scan_id is None:
+                    return None
+                return query_store(domain, sql, params, conn, scan_id)
+
+            value = loader(domain, lookup)
+    finally:
+        if conn:
+            conn.close()
+    with _cache_lock:
+        _cache[key] = (db, scan, files, value)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return value
+
+def get_alive_urls(domain):
+    urls = cached(domain, "alive_urls")
+    if isinstance(urls, str): return urls  # error message
     if not urls:
         return f"No alive URLs (status 200) found for {domain}."
     return f"{len(urls)} alive URLs found:\n" + "\n".join(urls)
 
 def get_open_ports(domain):
-    file = os.path.join(DATA_DIR, f"{domain}_naabu.json")
-    entries = read_json_lines(file)
-    if isinstance(entries, str): return entries
-
-    ports = sorted(set(str(entry["port"]) for entry in entries if entry.get("host", "").endswith(domain)))
+    ports = cached(domain, "open_ports")
+    if isinstance(ports, str): return ports
     if not ports:
         return f"No open ports found for {domain}."
     return f"{len(ports)} open ports found for {domain}:\n" + ", ".join(ports)
 
 def get_fuzzed_paths(domain):
-    file = os.path.join(DATA_DIR, f"{domain}_directory_fuzz.json")
-    lines = read_directory_fuzz_file(file)
+    lines = cached(domain, "fuzzed_paths")
     if isinstance(lines, str): return lines
 
     return f"{len(lines)} paths found via directory fuzzing for {domain}:\n" + "\n".join(lines)
 
 def get_harvested_emails(domain):
     """Get harvested emails for a domain"""
-    file = os.path.join(DATA_DIR, f"{domain}_emails.json")
     try:
-        with open(file, 'r') as f:
-            data = json.load(f)
-        
-        emails = data.get('emails', [])
-        if not emails:
-            return f"No emails found for {domain}."
-        
-        return f"{len(emails)} emails found for {domain}:\n" + "\n".join(emails)
-    except FileNotFoundError:
-        return f"No email data found for {domain}. Run email harvesting first."
+        emails = cached(domain, "emails")
     except Exception as e:
         return f"[!] Failed to read email data for {domain}: {e}"
+    if emails is None:
+        return f"No email data found for {domain}. Run email harvesting first."
+    if not emails:
+        return f"No emails found for {domain}."
+    return f"{len(emails)} emails found for {domain}:\n" + "\n".join(emails)
 
 def get_subdomains(domain):
     """Get subdomains for a domain"""
-    # Try to read from the subdomain file first (resolved subdomains)
-    subdomain_file = os.path.join(DATA_DIR, f"{domain}_subdomain.txt")
-    overall_file = os.path.join(DATA_DIR, f"{domain}_overall_subdomain.txt")
-    
-    # Try resolved subdomains first
-    try:
-        with open(subdomain_file, 'r') as f:
-            subdomains = [line.strip() for line in f if line.strip()]
-        if subdomains:
-            return f"{len(subdomains)} resolved subdomains found for {domain}:\n" + "\n".join(subdomains)
-    except FileNotFoundError:
-        pass
-    except Exception as e:
-        return f"[!] Failed to read resolved subdomain data for {domain}: {e}"
-    
-    # Try overall subdomains (unresolved)
     try:
-        with open(overall_file, 'r') as f:
-            subdomains = [line.strip() for line in f if line.strip()]
-        if subdomains:
-            return f"{len(subdomains)} total subdomains found for {domain} (may include unresolved):\n" + "\n".join(subdomains)
-    except FileNotFoundError:
-        return f"No subdomain data found for {domain}. Run subdomain enumeration first."
+        found = cached(domain, "subdomains")
     except Exception as e:
         return f"[!] Failed to read subdomain data for {domain}: {e}"
-    
-    return f"No subdomains found for {domain}."
+    if found is None:
+        return f"No subdomain data found for {domain}. Run subdomain enumeration first."
+    source, subdomains = found
+    if not subdomains:
+        return f"No subdomains found for {domain}."
+    if source == "resolved":
+        return f"{len(subdomains)} resolved subdomains found for {domain}:\n" + "\n".join(subdomains)
+    return f"{len(subdomains)} total subdomains found for {domain} (may include unresolved):\n" + "\n".join(subdomains)
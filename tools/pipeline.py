@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import logging
+import concurrent.futures
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
+
+# Concurrent stages allowed per resource class
+RESOURCE_LIMITS = {
+    "network": int(os.environ.get("RECON_NETWORK_SLOTS", 5)),
+    "cpu": int(os.environ.get("RECON_CPU_SLOTS", os.cpu_count() or 2)),
+}
+
+
+class Stage:
+    """One pipeline step: func(domain) consumes `inputs` and produces `outputs`,
+    both given as output file suffixes (e.g. "subdomain.txt")."""
+
+    def __init__(self, name, func, inputs=(), outputs=(), resource="network"):
+        if resource not in RESOURCE_LIMITS:
+            raise ValueError(f"Unknown resource class for stage {name}: {resource}")
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.resource = resource
+
+    @classmethod
+    def from_module(cls, name, func, module):
+        """Build a stage from a tool module's STAGE_INPUTS/STAGE_OUTPUTS/STAGE_RESOURCE."""
+        return cls(
+            name, func,
+            inputs=getattr(module, "STAGE_INPUTS", ()),
+            outputs=getattr(module, "STAGE_OUTPUTS", ()),
+            resource=getattr(module, "STAGE_RESOURCE", "network"),
+        )
+
+
+def build_graph(stages):
+    """Map each stage name to the names of the stages producing its inputs.
+    Inputs no stage produces are treated as already available."""
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            producers.setdefault(output, []).append(stage.name)
+    deps = {}
+    for stage in stages:
+        deps[stage.name] = sorted({
+            producer
+            for inp in stage.inputs
+            for producer in producers.get(inp, [])
+            if producer != stage.name
+        })
+    return deps
+
+
+def critical_path(timings, deps):
+    """Walk back from the last stage to finish, always following the
+    dependency that finished last."""
+    finished = {name: t for name, t in timings.items() if t.get("end") is not None}
+    if not finished:
+        return []
+    current = max(finished, key=lambda name: finished[name]["end"])
+    path = [current]
+    while True:
+        preds = [d for d in deps.get(current, []) if d in finished]
+        if not preds:
+            break
+        current = max(preds, key=lambda name: finished[name]["end"])
+        path.append(current)
+    return list(reversed(path))
+
+
+def run_pipeline(stages, domain, limits=None, logger=None, listener=None):
+    """Run stages as soon as their inputs are ready, within per-resource limits.
+    listener(event, stage, error=None) hears stage_start, stage_done,
+    stage_failed and stage_skipped. Returns the timing report."""
+    logger = logger or logging.getLogger(__name__)
+    limits = dict(RESOURCE_LIMITS, **(limits or {}))
+    by_name = {stage.name: stage for stage in stages}
+    deps = build_graph(stages)
+
+    waiting = [stage.name for stage in stages]
+    running = {}
+    done, failed, skipped = set(), set(), set()
+    timings = {}
+    start = time.time()
+
+    def run_stage(stage):
+        stage.func(domain)
+
+    def notify(event, name, error=None):
+        if listener is None:
+            return
+        try:
+            listener(event, by_name[name], error=error)
+        except Exception as e:
+            # Progress reporting must never take a scan down
+            logger.warning(f"[!] Progress listener failed on {event} {name}: {e}")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=sum(limits.values())) as executor:
+        while waiting or running:
+            busy = {}
+            for name in running.values():
+                busy[by_name[name].resource] = busy.get(by_name[name].resource, 0) + 1
+
+            for name in list(waiting):
+                stage = by_name[name]
+                if any(d in failed or d in skipped for d in deps[name]):
+                    waiting.remove(name)
+                    skipped.add(name)
+                    logger.warning(f"[!] Skipping {name}: an upstream stage failed")
+                    notify("stage_skipped", name)
+                    continue
+                if not all(d in done for d in deps[name]):
+                    continue
+                if busy.get(stage.resource, 0) >= limits[stage.resource]:
+                    continue
+                waiting.remove(name)
+                busy[stage.resource] = busy.get(stage.resource, 0) + 1
+                timings[name] = {"start": time.time() - start, "end": None, "resource": stage.resource}
+                notify("stage_start", name)
+                running[executor.submit(run_stage, stage)] = name
+
+            if not running:
+                if waiting:
+                    # Remaining stages depend on something that can never finish
+                    for name in waiting:
+                        skipped.add(name)
+                        logger.warning(f"[!] Skipping {name}: unresolvable dependencies")
+                        notify("stage_skipped", name)
+                    waiting.clear()
+                break
+
+            finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                timings[name]["end"] = time.time() - start
+                timings[name]["duration"] = timings[name]["end"] - timings[name]["start"]
+                try:
+                    future.result()
+                    done.add(name)
+                    logger.info(f"[+] {name} finished in {timings[name]['duration']:.2f}s")
+                    notify("stage_done", name)
+                except Exception as e:
+                    failed.add(name)
+                    timings[name]["error"] = str(e)
+                    logger.error(f"[!] {name} failed: {e}")
+                    notify("stage_failed", name, str(e))
+
+    path = critical_path(timings, deps)
+    return {
+        "domain": domain,
+        "started_at": start,
+        "total_seconds": time.time() - start,
+        "stages": timings,
+        "dependencies": deps,
+        "critical_path": path,
+        "critical_path_seconds": sum(timings[name]["duration"] for name in path),
+        "failed": sorted(failed),
+        "skipped": sorted(skipped),
+    }
+
+
+def write_timing_report(report, output_dir=None):
+    output_dir = output_dir or OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{report['domain']}_timing.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
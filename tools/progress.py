@@ -0,0 +1,242 @@
+import os
+import sys
+import json
+import glob
+import time
+import threading
+import concurrent.futures
+
+import summary
+from runner import count_lines
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
+
+# Live scan events, one JSON-lines file per domain. Kept outside the scan
+# workspace (and not bound by it) so the web app can follow a running scan
+PROGRESS_DIR = os.environ.get("RECON_PROGRESS_DIR", os.path.join(OUTPUT_DIR, ".progress"))
+# Seconds between "progress" events while stages run
+INTERVAL = float(os.environ.get("RECON_PROGRESS_INTERVAL", 2))
+# Items per section sent with a stage_end event
+PREVIEW = 20
+
+# output file suffix -> summary section, for partial results
+SECTION_FOR = {suffix: name for name, (suffix, _) in summary.SECTIONS.items()}
+
+
+def path(domain):
+    return os.path.join(PROGRESS_DIR, f"{domain}.json")
+
+
+def stage_history(output_dir=None):
+    """{stage: mean seconds} over every published timing report."""
+    totals = {}
+    for report_path in glob.glob(os.path.join(output_dir or OUTPUT_DIR, "*_timing.json")):
+        try:
+            with open(report_path, "r") as f:
+                stages = json.load(f).get("stages", {})
+        except (OSError, ValueError, AttributeError):
+            continue
+        for name, timing in stages.items():
+            if timing.get("duration") is not None and not timing.get("error"):
+                totals.setdefault(name, []).append(timing["duration"])
+    return {name: sum(runs) / len(runs) for name, runs in totals.items()}
+
+
+def remaining_seconds(deps, history, done, started, now):
+    """Estimated seconds until the last stage finishes: the longest chain of
+    unfinished stages, each costing its historical mean less the time it has
+    already run. None while no stage left has any history."""
+    memo = {}
+    known = False
+
+    def finish(name):
+        nonlocal known
+        if name not in memo:
+            if name in done:
+                memo[name] = 0.0
+            else:
+                expected = history.get(name)
+                known = known or expected is not None
+                left = max((expected or 0.0) - (now - started[name] if name in started else 0.0), 0.0)
+                memo[name] = max((finish(dep) for dep in deps.get(name, ())), default=0.0) + left
+        return memo[name]
+
+    eta = max((finish(name) for name in deps), default=0.0)
+    return round(eta, 1) if known or len(done) == len(deps) else None
+
+
+class ScanProgress:
+    """Pipeline listener (see pipeline.run_pipeline) that writes structured
+    scan events: scan_start, stage_start, periodic progress with records
+    produced so far and an ETA, stage_end with a preview of the stage's
+    results, and scan_end once outputs are published."""
+
+    def __init__(self, domain, workdir):
+        self.domain = domain
+        self.workdir = workdir
+        self.stages = {}
+        self.deps = {}
+        self.history = stage_history()
+        self.done = set()
+        self.started = {}
+        self.start = time.time()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ticker = None
+        self._last_records = None
+        # Stage events are written here, in order: a stage_end parses the
+        # stage's outputs, which must not hold up run_pipeline's scheduling
+        self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        os.makedirs(PROGRESS_DIR, exist_ok=True)
+        # A fresh file per scan; readers notice it shrank and start over
+        tmp = path(domain) + ".tmp"
+        open(tmp, "w").close()
+        os.replace(tmp, path(domain))
+
+    def emit(self, event, **fields):
+        entry = {"event": event, "domain": self.domain, "time": time.time()}
+        entry.update(fields)
+        with self._lock:
+            with open(path(self.domain), "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+
+    def begin(self, stages, deps):
+        self.stages = {stage.name: stage for stage in stages}
+        self.deps = deps
+        self.emit("scan_start", stages=list(self.stages), dependencies=deps, eta=self.eta())
+        self._ticker = threading.Thread(target=self._tick, daemon=True)
+        self._ticker.start()
+
+    def eta(self):
+        return remaining_seconds(self.deps, self.history, self.done, self.started, time.time())
+
+    def output_path(self, suffix):
+        return os.path.join(self.workdir, f"{self.domain}_{suffix}")
+
+    def records(self, suffixes):
+        """{suffix: lines written so far} for the outputs that exist yet."""
+        counts = {}
+        for suffix in suffixes:
+            lines = count_lines(self.output_path(suffix))
+            if lines is not None:
+                counts[suffix] = lines
+        return counts
+
+    def sections(self, suffixes):
+        """Counts, previews and severities of the result sections a finished
+        stage wrote, in the shape of the scan summary."""
+        wanted = {SECTION_FOR[suffix]: suffix for suffix in suffixes if suffix in SECTION_FOR}
+        emails = summary.read_emails(self.output_path("emails.json")) if "emails.json" in suffixes else None
+        if not wanted and emails is None:
+            return {}
+        doc = summary.summarize({
+            name: summary.iter_section(self.output_path(suffix), summary.SECTIONS[name][1])
+            for name, suffix in wanted.items()
+        }, emails or ())
+        names = list(wanted) + (["emails"] if emails is not None else [])
+        return {name: {"count": doc["counts"][name], "preview": doc["preview"][name][:PREVIEW],
+                       "severity": doc["severity"].get(name)} for name in names}
+
+    def __call__(self, event, stage, error=None):
+        now = time.time()
+        if event == "stage_start":
+            self.started[stage.name] = now
+            self._writer.submit(self.emit, "stage_start", stage=stage.name, eta=self.eta())
+            return
+        self.done.add(stage.name)
+        seconds = now - self.started[stage.name] if stage.name in self.started else None
+        fields = {"stage": stage.name, "status": event.split("_", 1)[1], "eta": self.eta(),
+                  "done": len(self.done), "total": len(self.stages)}
+        if seconds is not None:
+            fields["seconds"] = round(seconds, 2)
+        if error:
+            fields["error"] = error
+        self._writer.submit(self._stage_end, fields, stage.outputs if event == "stage_done" else None)
+
+    def _stage_end(self, fields, outputs):
+        if outputs is not None:
+            fields["records"] = self.records(outputs)
+            try:
+                fields["sections"] = self.sections(outputs)
+            except Exception as e:
+                fields["sections_error"] = str(e)
+            else:
+                # Parsed counts beat line counts (nuclei's JSON export is one line)
+                for name, part in fields["sections"].items():
+                    suffix = summary.SECTIONS[name][0] if name in summary.SECTIONS else "emails.json"
+                    fields["records"][suffix] = part["count"]
+        self.emit("stage_end", **fields)
+
+    def drain(self):
+        """Wait for queued stage events; their previews read the workspace,
+        so call this before it is published."""
+        self._writer.shutdown(wait=True)
+
+    def _tick(self):
+        while not self._stop.wait(INTERVAL):
+            running = [name for name in self.started if name not in self.done]
+            if not running:
+                continue
+            produced = self.records({suffix for name in running for suffix in self.stages[name].outputs})
+            if produced == self._last_records:
+                continue
+            self._last_records = produced
+            self.emit("progress", running=running, records=produced, eta=self.eta(),
+                      elapsed=round(time.time() - self.start, 1),
+                      done=len(self.done), total=len(self.stages))
+
+    def finish(self, status="finished", error=None):
+        self._stop.set()
+        if self._ticker:
+            self._ticker.join()
+        self.drain()
+        fields = {"status": status, "seconds": round(time.time() - self.start, 2)}
+        if error:
+            fields["error"] = error
+        self.emit("scan_end", **fields)
+
+
+def read_events(domain, offset=0):
+    """(offset after the event, event) for every complete event appended to
+    domain's progress file since byte offset. A file shorter than offset was
+    replaced by a newer scan and is read from the start."""
+    try:
+        with open(path(domain), "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < offset:
+                offset = 0
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return []
+    events = []
+    # Only whole lines; a line still being written is picked up next time
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break
+        offset += len(line)
+        try:
+            events.append((offset, json.loads(line)))
+        except ValueError:
+            continue
+    return events
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python3 progress.py <domain>")
+        sys.exit(1)
+
+    # Follow a running scan from the terminal
+    offset = 0
+    while True:
+        for offset, event in read_events(sys.argv[1], offset):
+            print(json.dumps(event))
+            if event["event"] == "scan_end":
+                return
+        time.sleep(0.5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+import re
+import ast
+import json
+import json.scanner
+
+import compression
+
+# Compact record types for the tool outputs in Outputs/, plus single-pass
+# parsers that yield them lazily. Every parser keeps lines it cannot make sense
+# of as a record with only `raw` set, so nothing a tool wrote is dropped.
+
+# [type] [protocol] [severity] ([extra]) target ([evidence...])
+NUCLEI_RE = re.compile(r"\[(.*?)\] \[(.*?)\] \[(.*?)\] (?:\[(.*?)\] )?(\S+)(?: (\[.*\]))?")
+# [type] [protocol] [severity] url ([evidence]) ([extra]) ([method])
+DAST_RE = re.compile(r"\[(.*?)\] \[(.*?)\] \[(.*?)\] (\S+) (\[.*?\])? ?(\[.*?\])? ?(\[.*?\])?")
+# /path (Status: 200) [Size: 921]
+DIR_RE = re.compile(r"(.+?) \(Status: (\d+)\)(?:\s*\[Size: (\d+)\])?")
+DIR_SIZE_RE = re.compile(r"\s*\[Size: (\d+)\]")
+WHITESPACE_RE = re.compile(r"\s+")
+SEVERITIES = {"info", "low", "medium", "high", "critical", "unknown"}
+
+
+class Record:
+    # Each type spells out its own __init__ over FIELDS, in order: a generic
+    # setattr loop costs more than the JSON decode it follows
+    __slots__ = ()
+    FIELDS = ()
+
+    def get(self, field, default=None):
+        value = getattr(self, field, None)
+        return default if value is None else value
+
+    def as_dict(self):
+        """The record as a JSON-ready dict, leaving out unset fields."""
+        return {name: value for name in self.FIELDS
+                if (value := getattr(self, name)) is not None}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class Subdomain(Record):
+    __slots__ = FIELDS = ("name", "source")
+
+    def __init__(self, name=None, source=None):
+        self.name = name
+        self.source = source
+
+    def __str__(self):
+        return self.name
+
+
+class PortHit(Record):
+    __slots__ = FIELDS = ("host", "ip", "port", "protocol", "tls", "cdn", "cdn_name", "timestamp", "raw")
+
+    def __init__(self, host=None, ip=None, port=None, protocol=None, tls=None, cdn=None, cdn_name=None,
+                 timestamp=None, raw=None):
+        self.host = host
+        self.ip = ip
+        self.port = port
+        self.protocol = protocol
+        self.tls = tls
+        self.cdn = cdn
+        self.cdn_name = cdn_name
+        self.timestamp = timestamp
+        self.raw = raw
+
+
+class HttpProbe(Record):
+    __slots__ = FIELDS = ("url", "input", "scheme", "port", "host", "path", "title", "webserver",
+                          "content_type", "tech", "status_code", "content_length", "words", "lines",
+                          "a", "cdn", "cdn_name", "failed", "timestamp", "raw")
+
+    def __init__(self, url=None, input=None, scheme=None, port=None, host=None, path=None, title=None,
+                 webserver=None, content_type=None, tech=None, status_code=None, content_length=None,
+                 words=None, lines=None, a=None, cdn=None, cdn_name=None, failed=None, timestamp=None,
+                 raw=None):
+        self.url = url
+        self.input = input
+        self.scheme = scheme
+        self.port = port
+        self.host = host
+        self.path = path
+        self.title = title
+        self.webserver = webserver
+        self.content_type = content_type
+        self.tech = tech
+        self.status_code = status_code
+        self.content_length = content_length
+        self.words = words
+        self.lines = lines
+        self.a = a
+        self.cdn = cdn
+        self.cdn_name = cdn_name
+        self.failed = failed
+        self.timestamp = timestamp
+        self.raw = raw
+
+
+class Endpoint(Record):
+    __slots__ = FIELDS = ("url", "input", "source", "raw")
+
+    def __init__(self, url=None, input=None, source=None, raw=None):
+        self.url = url
+        self.input = input
+        self.source = source
+        self.raw = raw
+
+
+class DirHit(Record):
+    __slots__ = FIELDS = ("path", "status", "size", "raw")
+
+    def __init__(self, path=None, status=None, size=None, raw=None):
+        self.path = path
+        self.status = status
+        self.size = size
+        self.raw = raw
+
+
+class Finding(Record):
+    """A nuclei or nuclei -dast finding. Evidence is only parsed on first use."""
+    __slots__ = ("type", "protocol", "severity", "target", "extra", "method", "raw", "_evidence", "_parsed")
+    FIELDS = ("type", "protocol", "severity", "target", "url", "evidence", "extra", "method", "raw")
+
+    def __init__(self, type=None, protocol=None, severity=None, target=None, evidence=None,
+                 extra=None, method=None, raw=None):
+        self.type = type
+        self.protocol = protocol
+        self.severity = severity
+        self.target = target
+        self.extra = extra
+        self.method = method
+        self.raw = raw
+        self._evidence = evidence
+        self._parsed = isinstance(evidence, list) or raw is not None
+
+    @property
+    def url(self):
+        return self.target
+
+    @property
+    def evidence(self):
+        if not self._parsed:
+            self._evidence = parse_evidence(self._evidence)
+            self._parsed = True
+        return self._evidence
+
+    @property
+    def line(self):
+        """The finding in nuclei's text layout."""
+        if self.raw is not None:
+            return self.raw
+        line = f"[{self.type}] [{self.protocol}] [{self.severity}] {self.target}"
+        if self.evidence:
+            line += " " + json.dumps(self.evidence)
+        return line
+
+
+def clean_evidence(text):
+    return WHITESPACE_RE.sub(" ", text).strip()
+
+
+def parse_evidence(evidence):
+    if not evidence:
+        return []
+    if evidence.startswith("[") and evidence.endswith("]"):
+        try:
+            items = json.loads(evidence)
+        except ValueError:
+            items = None
+            # Only Python-style lists ('...') can still be read as a literal
+            if "'" in evidence:
+                try:
+                    items = ast.literal_eval(evidence)
+                except Exception:
+                    pass
+        if isinstance(items, (list, tuple)):
+            return [clean_evidence(str(item)) for item in items]
+    return [clean_evidence(evidence)]
+
+
+def iter_lines(path):
+    """Stripped, non-empty lines of a text output."""
+    with compression.open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def json_record(cls, line):
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return cls(raw=line)
+    if not isinstance(data, dict):
+        return cls(raw=line)
+    get = data.get
+    return cls(*[get(name) for name in cls.FIELDS])
+
+
+def parse_subdomain(line, source=None):
+    return Subdomain(line, source)
+
+
+def parse_port(line):
+    return json_record(PortHit, line)
+
+
+def parse_http(line):
+    return json_record(HttpProbe, line)
+
+
+def parse_endpoint(line):
+    return json_record(Endpoint, line)
+
+
+def parse_dir(line):
+    m = DIR_RE.match(line)
+    if not m:
+        return DirHit(raw=line)
+    path, status, size = m.groups()
+    return DirHit(path.strip(), status, int(size) if size else None)
+
+
+def parse_finding(line):
+    m = NUCLEI_RE.match(line)
+    if not m:
+        return Finding(raw=line)
+    type_, protocol, severity, extra, target, evidence = m.groups()
+    if severity not in SEVERITIES and extra in SEVERITIES:
+        # [template] [matcher type] [protocol] [severity] target, as global
+        # matchers (secrets-patterns-rules) print
+        protocol, severity, extra = severity, extra, protocol
+    return Finding(type_, protocol, severity, target, evidence, extra or "")
+
+
+def parse_dast_finding(line):
+    m = DAST_RE.match(line)
+    if not m:
+        return Finding(raw=line)
+    type_, protocol, severity, url, evidence, extra, method = m.groups()
+    return Finding(type_, protocol, severity, url, evidence, extra, method)
+
+
+def finding_from_json(item):
+    """A -json-export finding in the same shape as a parsed text line."""
+    template = item.get("template-id", "")
+    if item.get("matcher-name"):
+        template = f"{template}:{item['matcher-name']}"
+    evidence = [clean_evidence(str(e)) for e in item.get("extracted-results") or []]
+    return Finding(template, item.get("type", ""), (item.get("info") or {}).get("severity", "unknown"),
+                   item.get("matched-at") or item.get("host", ""), evidence, "")
+
+
+def iter_parsed(path, parse):
+    for line in iter_lines(path):
+        yield parse(line)
+
+
+# json.loads without its per-call checks; a line holds one whole document
+_scan_json = json.scanner.make_scanner(json.JSONDecoder())
+
+
+def iter_json(path, cls):
+    """Records of type cls from a JSON-lines output, decoded in one pass."""
+    fields = cls.FIELDS
+    scan = _scan_json
+    # Objects with only known keys are passed as keywords, the rest field by
+    # field; one unknown key (httpx has plenty) settles it for the file
+    by_keyword = True
+    with compression.open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data, end = scan(line, 0)
+            except (StopIteration, ValueError):
+                yield cls(raw=line)
+                continue
+            if end != len(line) or not isinstance(data, dict):
+                yield cls(raw=line)
+                continue
+            if by_keyword:
+                try:
+                    yield cls(**data)
+                    continue
+                except TypeError:
+                    by_keyword = False
+            get = data.get
+            yield cls(*map(get, fields))
+
+
+def iter_subdomains(path, source=None):
+    for line in iter_lines(path):
+        yield Subdomain(line, source)
+
+
+def iter_ports(path):
+    return iter_json(path, PortHit)
+
+
+def iter_http(path):
+    return iter_json(path, HttpProbe)
+
+
+def iter_endpoints(path):
+    return iter_json(path, Endpoint)
+
+
+def iter_dirs(path):
+    match = DIR_RE.match
+    size_match = DIR_SIZE_RE.match
+    with compression.open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            # The usual "path (Status: n) [Size: n]" without the regex's
+            # backtracking; anything else goes through DIR_RE
+            path_, sep, tail = line.partition(" (Status: ")
+            status, close, rest = tail.partition(")")
+            if path_ and close and status.isdecimal():
+                m = size_match(rest)
+                yield DirHit(path_.strip(), status, m and int(m.group(1)))
+                continue
+            m = match(line)
+            if m:
+                path_, status, size = m.groups()
+                yield DirHit(path_.strip(), status, size and int(size))
+            else:
+                yield DirHit(raw=line)
+
+
+def iter_findings(path, parse=parse_finding):
+    """Findings from nuclei's -json-export array or its one-line-per-finding
+    text output (parse decides the text layout)."""
+    data = json_export(path)
+    if data is not None:
+        for item in data:
+            yield finding_from_json(item) if isinstance(item, dict) else Finding(raw=json.dumps(item))
+        return
+    yield from iter_parsed(path, parse)
+
+
+def json_export(path):
+    """The items of a nuclei -json-export array, or None for text output."""
+    with compression.open_text(path) as f:
+        head = f.read(1)
+    if head != "[":
+        return None
+    try:
+        with compression.open_text(path) as f:
+            data = json.load(f)
+    except ValueError:
+        return None
+    return data if isinstance(data, list) else None
+
+
+def iter_dast_findings(path):
+    return iter_findings(path, parse_dast_finding)
@@ -0,0 +1,483 @@
+import os
+import sys
+import json
+import time
+import queue
+import random
+import socket
+import struct
+import string
+import asyncio
+import sqlite3
+import threading
+import concurrent.futures
+
+from runner import record
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
+
+# Shared by every scan (not bound to a scan workspace) so overlapping scans reuse answers
+CACHE_PATH = os.environ.get("RECON_DNS_CACHE", os.path.join(OUTPUT_DIR, "dns_cache.db"))
+# Same resolver list puredns reads by default; one "ip" or "ip:port" per line
+RESOLVERS_FILE = os.environ.get("RECON_RESOLVERS", os.path.expanduser("~/.config/puredns/resolvers.txt"))
+CONCURRENCY = int(os.environ.get("RECON_DNS_CONCURRENCY", 200))
+TIMEOUT = float(os.environ.get("RECON_DNS_TIMEOUT", 2.0))
+RETRIES = 3
+WILDCARD_PROBES = 2
+
+# Bounds on cached TTLs; negative answers without an SOA get NEGATIVE_TTL
+MIN_TTL = 30
+MAX_TTL = 86400
+NEGATIVE_TTL = 300
+
+A, CNAME, SOA, AAAA, OPT = 1, 5, 6, 28, 41
+NOERROR, NXDOMAIN = 0, 3
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    name TEXT NOT NULL,
+    qtype TEXT NOT NULL,
+    rcode INTEGER NOT NULL,
+    answers TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (name, qtype)
+);
+"""
+
+
+def load_resolvers(path=None):
+    """Resolver addresses from the resolvers file, else /etc/resolv.conf."""
+    resolvers = []
+    try:
+        with open(path or RESOLVERS_FILE, "r") as f:
+            resolvers = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except OSError:
+        try:
+            with open("/etc/resolv.conf", "r") as f:
+                resolvers = [line.split()[1] for line in f if line.startswith("nameserver") and len(line.split()) > 1]
+        except OSError:
+            pass
+    addresses = []
+    for entry in resolvers or ["1.1.1.1", "8.8.8.8"]:
+        host, _, port = entry.rpartition(":") if entry.count(":") == 1 else (entry, "", "")
+        if ":" in host:
+            continue  # IPv6 resolvers are not supported by the UDP client
+        addresses.append((host, int(port or 53)))
+    return addresses
+
+
+def question_section(name, qtype):
+    qname = b""
+    for label in name.rstrip(".").split("."):
+        encoded = label.encode("idna")
+        if not 0 < len(encoded) < 64:
+            raise ValueError(f"invalid label in {name!r}")
+        qname += bytes([len(encoded)]) + encoded
+    return qname + b"\x00" + struct.pack(">HH", qtype, 1)
+
+
+def build_query(txid, question):
+    header = struct.pack(">HHHHHH", txid, 0x0100, 1, 0, 0, 1)
+    # EDNS0 OPT record so answers up to 1232 bytes are not truncated
+    edns = b"\x00" + struct.pack(">HHIH", OPT, 1232, 0, 0)
+    return header + question + edns
+
+
+def read_name(data, offset):
+    labels = []
+    end = None
+    for _ in range(128):
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            return ".".join(labels).lower(), end if end is not None else offset
+        labels.append(data[offset:offset + length].decode("ascii", "replace"))
+        offset += length
+    raise ValueError("compression loop")
+
+
+def parse_response(data):
+    """(txid, rcode, [(rtype, ttl, value)], negative_ttl) for a DNS response."""
+    txid, flags, qdcount, ancount, nscount, _ = struct.unpack(">HHHHHH", data[:12])
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = read_name(data, offset)
+        offset += 4
+    answers = []
+    for _ in range(ancount):
+        _, offset = read_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack(">HHIH", data[offset:offset + 10])
+        offset += 10
+        if rtype == A and rdlength == 4:
+            answers.append((A, ttl, socket.inet_ntop(socket.AF_INET, data[offset:offset + 4])))
+        elif rtype == AAAA and rdlength == 16:
+            answers.append((AAAA, ttl, socket.inet_ntop(socket.AF_INET6, data[offset:offset + 16])))
+        elif rtype == CNAME:
+            answers.append((CNAME, ttl, read_name(data, offset)[0]))
+        offset += rdlength
+    negative_ttl = NEGATIVE_TTL
+    for _ in range(nscount):
+        _, offset = read_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack(">HHIH", data[offset:offset + 10])
+        offset += 10
+        if rtype == SOA:
+            _, pos = read_name(data, offset)
+            _, pos = read_name(data, pos)
+            minimum = struct.unpack(">I", data[pos + 16:pos + 20])[0]
+            negative_ttl = min(ttl, minimum)
+        offset += rdlength
+    return txid, flags & 0xF, answers, negative_ttl
+
+
+class DNSCache:
+    """On-disk answer cache keyed by (name, qtype) that honours record TTLs.
+    Not thread-safe: AsyncResolver runs every call on one worker thread."""
+
+    def __init__(self, path=None):
+        path = path or CACHE_PATH
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(CACHE_SCHEMA)
+        self.pending = []
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, qtype):
+        row = self.conn.execute(
+            "SELECT rcode, answers FROM answers WHERE name = ? AND qtype = ? AND expires_at > ?",
+            (name, qtype, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0], json.loads(row[1])
+
+    def put(self, name, qtype, rcode, answers, ttl):
+        ttl = max(MIN_TTL, min(MAX_TTL, ttl))
+        self.pending.append((name, qtype, rcode, json.dumps(answers), time.time() + ttl))
+        if len(self.pending) >= 500:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)", self.pending)
+            self.pending = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, pending):
+        self.pending = pending
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        key = (struct.unpack(">H", data[:2])[0], addr[:2])
+        entry = self.pending.get(key)
+        if entry is None:
+            return
+        future, question = entry
+        # A reply must echo the question asked, not just its txid (resolvers
+        # may change the case of the name)
+        if data[12:12 + len(question)].lower() != question.lower():
+            return
+        del self.pending[key]
+        if not future.done():
+            future.set_result(data)
+
+
+class AsyncResolver:
+    """UDP stub resolver that spreads queries over the configured resolvers."""
+
+    def __init__(self, resolvers, cache, timeout=TIMEOUT, retries=RETRIES):
+        self.resolvers = resolvers
+        self.cache = cache
+        self.timeout = timeout
+        self.retries = retries
+        self.pending = {}
+        self.transport = None
+        self.wildcards = {}
+        # SQLite cache I/O stays off the event loop, on a single thread
+        self.cache_thread = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    async def cached(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.cache_thread, method, *args)
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _Protocol(self.pending), local_addr=("0.0.0.0", 0)
+        )
+        # Room for a full burst of answers; the default buffer drops some at high concurrency
+        self.transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+        self.cache_thread.shutdown(wait=True)
+
+    async def query(self, name, qtype):
+        """(rcode, answers, negative_ttl) for name/qtype, or None when no resolver answered."""
+        loop = asyncio.get_running_loop()
+        question = question_section(name, qtype)
+        for _ in range(self.retries):
+            resolver = random.choice(self.resolvers)
+            txid = random.getrandbits(16)
+            while (txid, resolver) in self.pending:
+                txid = random.getrandbits(16)
+            future = loop.create_future()
+            self.pending[(txid, resolver)] = (future, question)
+            try:
+                self.transport.sendto(build_query(txid, question), resolver)
+                # asyncio.wait, unlike wait_for, never swallows a cancellation
+                # that races a reply
+                answered, _ = await asyncio.wait([future], timeout=self.timeout)
+                if not answered:
+                    continue
+                _, rcode, answers, negative_ttl = parse_response(future.result())
+            except (ValueError, struct.error, IndexError):
+                continue
+            finally:
+                self.pending.pop((txid, resolver), None)
+            if rcode not in (NOERROR, NXDOMAIN):
+                continue  # SERVFAIL/REFUSED: try another resolver
+            return rcode, answers, negative_ttl
+        return None
+
+    async def lookup(self, name, qtype):
+        """Cached (rcode, [(rtype, value)]) for name, querying on a miss."""
+        key = "A" if qtype == A else "AAAA"
+        cached = await self.cached(self.cache.get, name, key)
+        if cached is not None:
+            return cached
+        try:
+            result = await self.query(name, qtype)
+        except ValueError:
+            return NXDOMAIN, []
+        if result is None:
+            return None
+        rcode, answers, negative_ttl = result
+        values = [(rtype, value) for rtype, _, value in answers]
+        addresses = [ttl for rtype, ttl, _ in answers if rtype == qtype]
+        ttl = min(ttl for _, ttl, _ in answers) if addresses else negative_ttl
+        await self.cached(self.cache.put, name, key, rcode, values, ttl)
+        return rcode, values
+
+    async def resolve(self, name):
+        """{"name", "a", "aaaa", "cname"} for a resolving name, else None."""
+        result = await self.lookup(name, A)
+        if result is None:
+            return None
+        rcode, values = result
+        if rcode == NOERROR and not any(rtype == A for rtype, _ in values):
+            aaaa = await self.lookup(name, AAAA)
+            if aaaa is not None:
+                values = values + aaaa[1]
+        found = {
+            "name": name,
+            "a": sorted({v for t, v in values if t == A}),
+            "aaaa": sorted({v for t, v in values if t == AAAA}),
+            "cname": [v for t, v in values if t == CNAME],
+        }
+        return found if found["a"] or found["aaaa"] else None
+
+    async def wildcard_ips(self, parent):
+        """Addresses random names under parent resolve to (empty if no wildcard)."""
+        if parent not in self.wildcards:
+            self.wildcards[parent] = asyncio.ensure_future(self._probe_wildcard(parent))
+        return await self.wildcards[parent]
+
+    async def _probe_wildcard(self, parent):
+        cached = await self.cached(self.cache.get, parent, "WILDCARD")
+        if cached is not None:
+            return set(cached[1])
+        ips = set()
+        for _ in range(WILDCARD_PROBES):
+            label = "".join(random.choices(string.ascii_lowercase + string.digits, k=16))
+            try:
+                result = await self.query(f"{label}.{parent}", A)
+            except ValueError:
+                break
+            if result:
+                ips.update(value for rtype, _, value in result[1] if rtype == A)
+        await self.cached(self.cache.put, parent, "WILDCARD", NOERROR, sorted(ips), NEGATIVE_TTL)
+        return ips
+
+    async def is_wildcard(self, found):
+        parent = found["name"].partition(".")[2]
+        if "." not in parent or not found["a"]:
+            return False
+        ips = await self.wildcard_ips(parent)
+        return bool(ips) and set(found["a"]) <= ips
+
+
+async def resolve_stream(names, on_result, resolvers=None, cache=None,
+                         concurrency=CONCURRENCY, wildcard_filter=True):
+    """Resolve names with `concurrency` queries in flight, calling
+    on_result(record) for each name that resolves and is not a wildcard hit.
+    on_result may be a coroutine function; it is awaited before the worker
+    that found the record takes another name."""
+    own_cache = cache is None
+    cache = cache or DNSCache()
+    client = AsyncResolver(resolvers or load_resolvers(), cache)
+    await client.open()
+    work = asyncio.Queue(maxsize=concurrency * 2)
+    stats = {"resolved": 0, "wildcard": 0}
+
+    async def worker():
+        while True:
+            name = await work.get()
+            if name is None:
+                return
+            found = await client.resolve(name)
+            if found is None:
+                continue
+            if wildcard_filter and await client.is_wildcard(found):
+                stats["wildcard"] += 1
+                continue
+            stats["resolved"] += 1
+            delivered = on_result(found)
+            if asyncio.iscoroutine(delivered):
+                await delivered
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    try:
+        for name in names:
+            name = name.strip().lower().rstrip(".")
+            if name:
+                await work.put(name)
+        for _ in workers:
+            await work.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        # Cancelled midway (the consumer went away): stop the workers
+        # before the socket and cache thread they use are closed
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        client.close()
+        stats["cache_hits"], stats["cache_misses"] = cache.hits, cache.misses
+        if own_cache:
+            cache.close()
+        else:
+            cache.flush()
+    return stats
+
+
+def iter_resolved(names, **kwargs):
+    """Yield resolved records as they come in; resolution runs on its own
+    thread. Closing the generator early stops the resolution."""
+    results = queue.Queue(maxsize=10000)
+    stop = threading.Event()
+    done = object()
+    outcome = {}
+
+    def put(item):
+        """Hand item to the consumer; False once it has gone away."""
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def stream():
+        loop = asyncio.get_running_loop()
+        found = asyncio.Queue(maxsize=1000)
+
+        async def forward():
+            while True:
+                item = await found.get()
+                # The blocking hand-off waits on a helper thread, so a slow
+                # consumer never stalls queries in flight on the loop
+                if item is done or not await loop.run_in_executor(None, put, item):
+                    return
+
+        forwarder = asyncio.ensure_future(forward())
+        resolving = asyncio.ensure_future(resolve_stream(names, found.put, **kwargs))
+        try:
+            await asyncio.wait([forwarder, resolving], return_when=asyncio.FIRST_COMPLETED)
+            if not resolving.done():
+                # The forwarder only stops early when the consumer is gone
+                resolving.cancel()
+                await asyncio.gather(resolving, return_exceptions=True)
+                return None
+            stats = resolving.result()
+            await found.put(done)
+            await forwarder
+            return stats
+        finally:
+            forwarder.cancel()
+
+    def run():
+        try:
+            outcome["stats"] = asyncio.run(stream())
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            put(done)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        stop.set()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("stats")
+
+
+def resolve_file(domain, input_file=None, output_file=None, resolvers=None):
+    """Drop-in for `puredns resolve`: writes resolving, non-wildcard names to
+    output_file as they are found, flushing each so a reader can tail it."""
+    input_file = input_file or os.path.join(OUTPUT_DIR, f"{domain}_overall_subdomain.txt")
+    output_file = output_file or os.path.join(OUTPUT_DIR, f"{domain}_subdomain.txt")
+    started = time.time()
+    count = 0
+    with open(input_file, "r") as names, open(output_file, "w") as out:
+        stream = iter_resolved(names, resolvers=resolvers)
+        while True:
+            try:
+                found = next(stream)
+            except StopIteration as stop:
+                stats = stop.value or {}
+                break
+            out.write(found["name"] + "\n")
+            out.flush()
+            count += 1
+    record(domain, "resolve", "resolver", started, None, 0, input_file, output_lines=count)
+    return stats
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python3 resolver.py <names_file> [resolvers_file]")
+        sys.exit(1)
+
+    resolvers = load_resolvers(sys.argv[2]) if len(sys.argv) == 3 else None
+    with open(sys.argv[1], "r") as names:
+        for found in iter_resolved(names, resolvers=resolvers):
+            print(found["name"], ",".join(found["a"] + found["aaaa"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import threading
+import subprocess
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
+
+_metrics_lock = threading.Lock()
+
+
+def metrics_path(domain):
+    return os.path.join(OUTPUT_DIR, f"{domain}_metrics.json")
+
+
+def start_scan_metrics(domain):
+    """Start a fresh per-scan metrics file."""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with _metrics_lock:
+        open(metrics_path(domain), "w").close()
+
+
+def count_lines(path):
+    if not path:
+        return None
+    try:
+        count = 0
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                count += block.count(b"\n")
+        return count
+    except OSError:
+        return None
+
+
+def tool_name(command):
+    if isinstance(command, str):
+        return command.split()[0] if command.split() else ""
+    if command and os.path.basename(command[0]).startswith("python") and len(command) > 1:
+        return os.path.splitext(os.path.basename(command[1]))[0]
+    return os.path.basename(command[0]) if command else ""
+
+
+def record(domain, stage, command, started, rusage, exit_code, input_file=None,
+           output_file=None, output_lines=None):
+    if not domain:
+        return
+    entry = {
+        "timestamp": started,
+        "domain": domain,
+        "stage": stage or tool_name(command),
+        "tool": tool_name(command),
+        "command": command if isinstance(command, str) else " ".join(command),
+        "wall_seconds": round(time.time() - started, 4),
+        "cpu_user_seconds": round(rusage.ru_utime, 4) if rusage else None,
+        "cpu_system_seconds": round(rusage.ru_stime, 4) if rusage else None,
+        # ru_maxrss is in kilobytes on Linux
+        "max_rss_kb": rusage.ru_maxrss if rusage else None,
+        "exit_code": exit_code,
+        "input_lines": count_lines(input_file),
+        "output_lines": output_lines if output_lines is not None else count_lines(output_file),
+    }
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with _metrics_lock:
+        with open(metrics_path(domain), "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def wait_with_rusage(proc):
+    """Reap proc ourselves so the child's rusage is not lost."""
+    try:
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        return proc.returncode, rusage
+    except ChildProcessError:
+        return proc.wait(), None
+
+
+def silent_run(command, cwd=None, shell=False, domain=None, stage=None,
+               input_file=None, output_file=None):
+    """Run an external tool with its output discarded, recording wall time,
+    CPU time, peak RSS, exit code and input/output line counts for the scan."""
+    started = time.time()
+    try:
+        proc = subprocess.Popen(command, cwd=cwd, shell=shell,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        record(domain, stage, command, started, None, None, input_file, output_file)
+        raise
+    exit_code, rusage = wait_with_rusage(proc)
+    record(domain, stage, command, started, rusage, exit_code, input_file, output_file)
+    return exit_code
+
+
+def capture_run(command, domain=None, stage=None, input_file=None):
+    """Like silent_run but returns the tool's stdout."""
+    started = time.time()
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    stdout = proc.stdout.read()
+    proc.stdout.close()
+    exit_code, rusage = wait_with_rusage(proc)
+    output_lines = sum(1 for line in stdout.splitlines() if line.strip())
+    record(domain, stage, command, started, rusage, exit_code, input_file, output_lines=output_lines)
+    return stdout
+
+
+def finish_popen(proc, command, started, domain=None, stage=None, input_file=None, output_lines=None):
+    """Reap a Popen started by the caller (e.g. a streamed tool) and record it."""
+    exit_code, rusage = wait_with_rusage(proc)
+    record(domain, stage, command, started, rusage, exit_code, input_file, output_lines=output_lines)
+    return exit_code
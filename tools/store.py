@@ -0,0 +1,645 @@
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import threading
+from urllib.parse import urlsplit
+
+import records
+import compression
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
+DB_PATH = os.environ.get("RECON_DB", os.path.join(OUTPUT_DIR, "recon.db"))
+
+# Pipeline stage declaration (see pipeline.py): ingest once every output exists
+STAGE_INPUTS = [
+    "subfinder.txt", "oneforall.txt", "overall_subdomain.txt", "subdomain.txt",
+    "naabu.json", "httpx.json", "urlfinder.json", "nuclei.json",
+    "vulnerabilities.json", "directory_fuzz.json", "emails.json"
+]
+STAGE_OUTPUTS = []
+STAGE_RESOURCE = "cpu"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scans_domain ON scans(domain, id);
+
+CREATE TABLE IF NOT EXISTS subdomains (
+    scan_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS subdomains_scan ON subdomains(scan_id, source, name);
+
+CREATE TABLE IF NOT EXISTS ports (
+    scan_id INTEGER NOT NULL,
+    host TEXT,
+    ip TEXT,
+    port INTEGER,
+    raw TEXT NOT NULL,
+    cdn_name TEXT
+);
+CREATE INDEX IF NOT EXISTS ports_scan_port ON ports(scan_id, port);
+CREATE INDEX IF NOT EXISTS ports_scan_host ON ports(scan_id, host);
+CREATE INDEX IF NOT EXISTS ports_scan_ip ON ports(scan_id, ip);
+
+CREATE TABLE IF NOT EXISTS http (
+    scan_id INTEGER NOT NULL,
+    url TEXT,
+    host TEXT,
+    status_code INTEGER,
+    webserver TEXT,
+    raw TEXT NOT NULL,
+    cdn_name TEXT
+);
+CREATE INDEX IF NOT EXISTS http_scan_status ON http(scan_id, status_code);
+CREATE INDEX IF NOT EXISTS http_scan_webserver ON http(scan_id, webserver);
+
+CREATE TABLE IF NOT EXISTS endpoints (
+    scan_id INTEGER NOT NULL,
+    url TEXT,
+    source TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS endpoints_scan_source ON endpoints(scan_id, source);
+
+CREATE TABLE IF NOT EXISTS findings (
+    scan_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    template_id TEXT,
+    severity TEXT,
+    target TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS findings_scan_kind ON findings(scan_id, kind, severity);
+
+CREATE TABLE IF NOT EXISTS directories (
+    scan_id INTEGER NOT NULL,
+    path TEXT,
+    status TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS directories_scan_status ON directories(scan_id, status);
+
+CREATE TABLE IF NOT EXISTS emails (
+    scan_id INTEGER NOT NULL,
+    email TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS emails_scan ON emails(scan_id);
+"""
+
+# Columns added after a table was first released: (table, column, type)
+ADDED_COLUMNS = [
+    ("ports", "cdn_name", "TEXT"),
+    ("http", "cdn_name", "TEXT"),
+]
+
+INDEXES_ON_ADDED = """
+CREATE INDEX IF NOT EXISTS ports_scan_cdn ON ports(scan_id, cdn_name);
+CREATE INDEX IF NOT EXISTS http_scan_cdn ON http(scan_id, cdn_name);
+"""
+
+# Search index over each domain's latest scan, filled in by ingest_outputs:
+# search_names holds hostnames and URLs (trigram-indexed for substring
+# matches), search_terms maps field/value pairs to the hosts that have them
+SEARCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_names (
+    id INTEGER PRIMARY KEY,
+    scan_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    host TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS search_names_scan ON search_names(scan_id, host);
+CREATE INDEX IF NOT EXISTS search_names_kind ON search_names(kind, host);
+CREATE VIRTUAL TABLE IF NOT EXISTS search_trigrams USING fts5(
+    name, content='search_names', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TABLE IF NOT EXISTS search_terms (
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    scan_id INTEGER NOT NULL,
+    host TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS search_terms_value ON search_terms(field, value, scan_id, host);
+CREATE INDEX IF NOT EXISTS search_terms_host ON search_terms(scan_id, host);
+
+CREATE TABLE IF NOT EXISTS search_indexed (
+    scan_id INTEGER PRIMARY KEY
+);
+"""
+
+# Statements filling the search index for the scan bound to :scan
+SEARCH_INDEX_SQL = [
+    """INSERT INTO search_names (scan_id, kind, host, name)
+       SELECT :scan, 'host', h, h FROM (
+           SELECT lower(name) AS h FROM subdomains WHERE scan_id = :scan
+           UNION SELECT lower(host) FROM ports WHERE scan_id = :scan AND host IS NOT NULL
+           UNION SELECT lower(host) FROM http WHERE scan_id = :scan AND host IS NOT NULL
+       ) WHERE h != ''""",
+    """INSERT INTO search_names (scan_id, kind, host, name)
+       SELECT :scan, 'url', url_host(u), u FROM (
+           SELECT url AS u FROM http WHERE scan_id = :scan AND url IS NOT NULL
+           UNION SELECT url FROM endpoints WHERE scan_id = :scan AND url IS NOT NULL
+           UNION SELECT path FROM directories WHERE scan_id = :scan AND path LIKE '%://%'
+       ) WHERE url_host(u) IS NOT NULL""",
+    """INSERT INTO search_trigrams (rowid, name)
+       SELECT id, name FROM search_names WHERE scan_id = :scan""",
+    # tech, webserver and template values are also indexed without their
+    # version or matcher suffix, so "nginx" finds "nginx/1.18.0"
+    """INSERT INTO search_terms (field, value, scan_id, host)
+       SELECT DISTINCT 'tech', v, :scan, h FROM (
+           SELECT lower(t.value) AS v, lower(http.host) AS h FROM http, json_each(http.raw, '$.tech') AS t
+           WHERE http.scan_id = :scan AND http.host IS NOT NULL
+           UNION SELECT lower(base_name(t.value)), lower(http.host) FROM http, json_each(http.raw, '$.tech') AS t
+           WHERE http.scan_id = :scan AND http.host IS NOT NULL
+       ) WHERE v IS NOT NULL AND v != ''""",
+    """INSERT INTO search_terms (field, value, scan_id, host)
+       SELECT DISTINCT 'webserver', v, :scan, h FROM (
+           SELECT lower(webserver) AS v, lower(host) AS h FROM http WHERE scan_id = :scan AND host IS NOT NULL
+           UNION SELECT lower(base_name(webserver)), lower(host) FROM http WHERE scan_id = :scan AND host IS NOT NULL
+       ) WHERE v IS NOT NULL AND v != ''""",
+    """INSERT INTO search_terms (field, value, scan_id, host)
+       SELECT DISTINCT 'status', CAST(status_code AS TEXT), :scan, lower(host) FROM http
+       WHERE scan_id = :scan AND host IS NOT NULL AND status_code IS NOT NULL""",
+    """INSERT INTO search_terms (field, value, scan_id, host)
+       SELECT DISTINCT 'port', CAST(port AS TEXT), :scan, lower(host) FROM ports
+       WHERE scan_id = :scan AND host IS NOT NULL AND port IS NOT NULL""",
+    """INSERT INTO search_terms (field, value, scan_id, host)
+       SELECT DISTINCT 'severity', lower(severity), :scan, url_host(target) FROM findings
+       WHERE scan_id = :scan AND severity IS NOT NULL AND url_host(target) IS NOT NULL""",
+    """INSERT INTO search_terms (field, value, scan_id, host)
+       SELECT DISTINCT 'template', v, :scan, h FROM (
+           SELECT lower(template_id) AS v, url_host(target) AS h FROM findings WHERE scan_id = :scan
+           UNION SELECT lower(base_name(template_id)), url_host(target) FROM findings WHERE scan_id = :scan
+       ) WHERE v IS NOT NULL AND v != '' AND h IS NOT NULL""",
+    "INSERT OR IGNORE INTO search_indexed (scan_id) VALUES (:scan)",
+]
+
+# Search query parameter -> search_terms.field
+SEARCH_FIELDS = ["tech", "webserver", "status", "port", "template", "severity"]
+# Matches counted per search; past this the total is reported as a lower bound
+SEARCH_COUNT_LIMIT = int(os.environ.get("RECON_SEARCH_COUNT_LIMIT", 1000))
+# Longest multi-value posting list a search sorts up front rather than probes
+SEARCH_SORT_LIMIT = 20000
+
+# Finished scans kept per domain; ingesting a new one deletes the rest. The
+# previous scan stays so a reader that just looked up its ID can finish
+KEEP_SCANS = max(int(os.environ.get("RECON_STORE_KEEP_SCANS", 2)), 1)
+
+# Tables holding a scan's results, keyed by scan_id
+RESULT_TABLES = ["subdomains", "ports", "http", "endpoints", "findings", "directories", "emails"]
+
+# subdomains.source -> output file suffix
+SUBDOMAIN_FILES = {
+    "subfinder": "subfinder.txt",
+    "oneforall": "oneforall.txt",
+    "all": "overall_subdomain.txt",
+    "resolved": "subdomain.txt",
+}
+
+VERSION_RE = re.compile(r"[:/]")
+
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+
+def url_host(value):
+    """Lower-cased hostname of a URL, host:port or bare hostname."""
+    if not value:
+        return None
+    if "://" in value:
+        try:
+            return urlsplit(value).hostname
+        except ValueError:
+            return None
+    return value.split("/", 1)[0].rsplit(":", 1)[0].lower() or None
+
+
+def base_name(value):
+    """value without a ":version", "/version" or ":matcher" suffix, or None
+    when it has none."""
+    if not value:
+        return None
+    base = VERSION_RE.split(value, 1)[0]
+    return base if base and base != value else None
+
+
+def connect(db_path=None):
+    db_path = db_path or DB_PATH
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.create_function("url_host", 1, url_host, deterministic=True)
+    conn.create_function("base_name", 1, base_name, deterministic=True)
+    with _schema_lock:
+        if db_path not in _schema_ready:
+            conn.executescript(SCHEMA)
+            for table, column, kind in ADDED_COLUMNS:
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+            conn.executescript(INDEXES_ON_ADDED)
+            conn.executescript(SEARCH_SCHEMA)
+            # Scans ingested before the search index existed
+            with conn:
+                for scan_id, domain in conn.execute(
+                    "SELECT MAX(id), domain FROM scans WHERE finished_at IS NOT NULL GROUP BY domain"
+                ).fetchall():
+                    if not conn.execute("SELECT 1 FROM search_indexed WHERE scan_id = ?", (scan_id,)).fetchone():
+                        index_scan(conn, domain, scan_id)
+            _schema_ready.add(db_path)
+    return conn
+
+
+def new_scan(conn, domain, source="scan"):
+    cur = conn.execute(
+        "INSERT INTO scans (domain, started_at, source) VALUES (?, ?, ?)",
+        (domain, time.time(), source)
+    )
+    return cur.lastrowid
+
+
+def latest_scan(domain, conn=None):
+    """(scan_id, finished_at) of the newest fully ingested scan, or None."""
+    own = conn is None
+    conn = conn or connect()
+    try:
+        return conn.execute(
+            "SELECT id, finished_at FROM scans WHERE domain = ? AND finished_at IS NOT NULL ORDER BY id DESC LIMIT 1",
+            (domain,)
+        ).fetchone()
+    finally:
+        if own:
+            conn.close()
+
+
+def latest_scan_id(domain, conn=None):
+    row = latest_scan(domain, conn)
+    return row[0] if row else None
+
+
+def index_scan(conn, domain, scan_id):
+    """Add scan_id to the search index, replacing the domain's older scans."""
+    older = conn.execute(
+        "SELECT scan_id FROM search_indexed WHERE scan_id IN (SELECT id FROM scans WHERE domain = ? AND id != ?)",
+        (domain, scan_id)
+    ).fetchall()
+    for (old,) in older:
+        conn.execute(
+            "INSERT INTO search_trigrams (search_trigrams, rowid, name) "
+            "SELECT 'delete', id, name FROM search_names WHERE scan_id = ?", (old,)
+        )
+        conn.execute("DELETE FROM search_names WHERE scan_id = ?", (old,))
+        conn.execute("DELETE FROM search_terms WHERE scan_id = ?", (old,))
+        conn.execute("DELETE FROM search_indexed WHERE scan_id = ?", (old,))
+    for sql in SEARCH_INDEX_SQL:
+        conn.execute(sql, {"scan": scan_id})
+
+
+def prune_scans(conn, domain, scan_id, keep=None):
+    """Delete the domain's scans older than scan_id, except the newest `keep`
+    finished ones (scan_id included). Run after index_scan, which drops
+    their search rows. Returns the deleted scan IDs."""
+    old = [row[0] for row in conn.execute(
+        "SELECT id FROM scans WHERE domain = ? AND id < ? AND id NOT IN ("
+        "SELECT id FROM scans WHERE domain = ? AND finished_at IS NOT NULL ORDER BY id DESC LIMIT ?)",
+        (domain, scan_id, domain, keep or KEEP_SCANS)
+    )]
+    for old_id in old:
+        for table in RESULT_TABLES:
+            conn.execute(f"DELETE FROM {table} WHERE scan_id = ?", (old_id,))
+        conn.execute("DELETE FROM scans WHERE id = ?", (old_id,))
+    return old
+
+
+def _json_records(path, cls):
+    """(record, line) for every line of a JSON-lines output that records can
+    decode; the rest are left out of the store."""
+    for line in records.iter_lines(path):
+        record = records.json_record(cls, line)
+        if record.raw is None:
+            yield record, line
+
+
+def _finding_rows(path, parse):
+    """(template_id, severity, target, raw) per finding. Nuclei writes either a
+    JSON array (-json-export) or one text line per finding; JSON findings are
+    stored in the same text layout."""
+    data = records.json_export(path)
+    if data is not None:
+        for item in data:
+            if isinstance(item, dict):
+                finding = records.finding_from_json(item)
+                yield finding.type, finding.severity, finding.target, finding.line
+        return
+    for line in records.iter_lines(path):
+        finding = parse(line)
+        yield finding.type, finding.severity, finding.target, line
+
+
+def ingest_outputs(domain, scan_id=None, output_dir=None, source="scan", conn=None):
+    """Load every existing {domain}_* output file into the store under a scan
+    ID, deleting the domain's scans past KEEP_SCANS in the same transaction."""
+    output_dir = output_dir or OUTPUT_DIR
+    own = conn is None
+    conn = conn or connect()
+
+    def path(suffix):
+        p = compression.resolve(os.path.join(output_dir, f"{domain}_{suffix}"))
+        return p if os.path.isfile(p) else None
+
+    try:
+        with conn:
+            if scan_id is None:
+                scan_id = new_scan(conn, domain, source)
+
+            for src, suffix in SUBDOMAIN_FILES.items():
+                p = path(suffix)
+                if p:
+                    conn.executemany(
+                        "INSERT INTO subdomains (scan_id, source, name, raw) VALUES (?, ?, ?, ?)",
+                        ((scan_id, src, line.lower(), line) for line in records.iter_lines(p))
+                    )
+
+            p = path("naabu.json")
+            if p:
+                conn.executemany(
+                    "INSERT INTO ports (scan_id, host, ip, port, raw, cdn_name) VALUES (?, ?, ?, ?, ?, ?)",
+                    ((scan_id, hit.host, hit.ip, hit.port, raw, hit.cdn_name)
+                     for hit, raw in _json_records(p, records.PortHit))
+                )
+
+            p = path("httpx.json")
+            if p:
+                conn.executemany(
+                    "INSERT INTO http (scan_id, url, host, status_code, webserver, raw, cdn_name) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((scan_id, probe.url, (probe.input or "").split(":")[0] or probe.host,
+                      probe.status_code, probe.webserver, raw, probe.cdn_name)
+                     for probe, raw in _json_records(p, records.HttpProbe))
+                )
+
+            p = path("urlfinder.json")
+            if p:
+                conn.executemany(
+                    "INSERT INTO endpoints (scan_id, url, source, raw) VALUES (?, ?, ?, ?)",
+                    ((scan_id, endpoint.url, endpoint.source, raw)
+                     for endpoint, raw in _json_records(p, records.Endpoint))
+                )
+
+            for kind, suffix, parse in (("nuclei", "nuclei.json", records.parse_finding),
+                                        ("dast", "vulnerabilities.json", records.parse_dast_finding)):
+                p = path(suffix)
+                if p:
+                    conn.executemany(
+                        "INSERT INTO findings (scan_id, kind, template_id, severity, target, raw) VALUES (?, ?, ?, ?, ?, ?)",
+                        ((scan_id, kind) + row for row in _finding_rows(p, parse))
+                    )
+
+            p = path("directory_fuzz.json")
+            if p:
+                conn.executemany(
+                    "INSERT INTO directories (scan_id, path, status, raw) VALUES (?, ?, ?, ?)",
+                    ((scan_id, hit.path, hit.status, line)
+                     for hit, line in ((records.parse_dir(line), line) for line in records.iter_lines(p)))
+                )
+
+            p = path("emails.json")
+            if p:
+                try:
+                    with compression.open_text(p) as f:
+                        emails = json.load(f).get("emails", [])
+                except (ValueError, AttributeError):
+                    emails = []
+                conn.executemany(
+                    "INSERT INTO emails (scan_id, email) VALUES (?, ?)",
+                    ((scan_id, e) for e in emails)
+                )
+
+            conn.execute("UPDATE scans SET finished_at = ? WHERE id = ?", (time.time(), scan_id))
+            index_scan(conn, domain, scan_id)
+            prune_scans(conn, domain, scan_id)
+        return scan_id
+    finally:
+        if own:
+            conn.close()
+
+
+def query(table, scan_id, where=None, q="", q_column="raw", offset=0, limit=100, conn=None):
+    """Return (total, raw lines) for one page of a table, in ingest order."""
+    clauses = ["scan_id = ?"]
+    params = [scan_id]
+    for column, value in (where or {}).items():
+        clauses.append(f"{column} = ?")
+        params.append(value)
+    if q:
+        clauses.append(f"{q_column} LIKE ?")
+        params.append(f"%{q}%")
+    sql_where = " AND ".join(clauses)
+
+    own = conn is None
+    conn = conn or connect()
+    try:
+        total = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {sql_where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT raw FROM {table} WHERE {sql_where} ORDER BY rowid LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        return total, [r[0] for r in rows]
+    finally:
+        if own:
+            conn.close()
+
+
+def _posting_size(conn, field, values):
+    """Length of the posting list for field's values (a covering index scan)."""
+    return conn.execute(
+        f"SELECT COUNT(*) FROM search_terms WHERE field = ? AND value IN ({', '.join('?' * len(values))})",
+        [field, *values]
+    ).fetchone()[0]
+
+
+def _host_terms(conn, keys):
+    """{(scan_id, host): {field: [values]}} for the given hosts."""
+    found = {}
+    for scan_id, host in keys:
+        terms = found.setdefault((scan_id, host), {})
+        for field, value in conn.execute(
+            "SELECT field, value FROM search_terms WHERE scan_id = ? AND host = ? ORDER BY field, value",
+            (scan_id, host)
+        ):
+            terms.setdefault(field, []).append(value)
+    for terms in found.values():
+        for field, values in terms.items():
+            # "nginx" is only listed on its own when no "nginx/1.2" is there
+            versioned = {base_name(value) for value in values}
+            terms[field] = [value for value in values if value not in versioned]
+    return found
+
+
+def search(q="", terms=None, domain=None, kind="host", offset=0, limit=100, conn=None):
+    """Search the latest scan of every domain (or just domain).
+
+    q matches hostnames (kind "host") or URLs (kind "url") by substring;
+    terms maps SEARCH_FIELDS to accepted values, e.g. {"tech": ["nginx"],
+    "status": ["200"]}. Fields are ANDed together, values of one field ORed.
+    Returns (total, items): hosts with their indexed attributes, or URLs.
+    total stops counting at SEARCH_COUNT_LIMIT."""
+    own = conn is None
+    conn = conn or connect()
+    try:
+        postings = []
+        for field, values in (terms or {}).items():
+            values = sorted({str(v).strip().lower() for v in values} - {""})
+            if field in SEARCH_FIELDS and values:
+                postings.append((field, values))
+
+        # Rows come from the most selective source (the trigram match or the
+        # shortest posting list), read in that source's index order; every
+        # other condition is an index probe per row, so a page never needs
+        # the full result set built first
+        source, clauses, params, order = "search_names n", ["n.kind = ?"], [kind], "n.host, n.id"
+        scope = "n"
+        if len(q) >= 3:
+            # A quoted phrase matches as a plain substring
+            source = "search_trigrams t CROSS JOIN search_names n ON n.id = t.rowid"
+            clauses.insert(0, "search_trigrams MATCH ?")
+            params.insert(0, '"' + q.replace('"', '""') + '"')
+            order = "t.rowid"
+        else:
+            if q:
+                clauses.append("instr(lower(n.name), ?) > 0")
+                params.append(q.lower())
+            driver = None
+            if postings:
+                sizes = [_posting_size(conn, field, values) for field, values in postings]
+                smallest = sizes.index(min(sizes))
+                # Several values of one field are merged and sorted before the
+                # first row comes out, which only pays off for a short list;
+                # otherwise walking the names in order finds a page sooner
+                if len(postings[smallest][1]) == 1 or sizes[smallest] <= SEARCH_SORT_LIMIT:
+                    driver = postings.pop(smallest)
+            if driver:
+                field, values = driver
+                if len(values) == 1:
+                    source = "search_terms p"
+                    clauses[:0] = ["p.field = ?", "p.value = ?"]
+                else:
+                    # Several values could list a host twice
+                    source = (f"(SELECT DISTINCT scan_id, host FROM search_terms WHERE field = ? "
+                              f"AND value IN ({', '.join('?' * len(values))})) p")
+                source += " CROSS JOIN search_names n ON n.scan_id = p.scan_id AND n.host = p.host"
+                params = [field, *values] + params
+                order, scope = "p.scan_id, p.host, n.id", "p"
+        for field, values in postings:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM search_terms x WHERE x.field = ? "
+                f"AND x.value IN ({', '.join('?' * len(values))}) AND x.scan_id = n.scan_id AND x.host = n.host)"
+            )
+            params += [field, *values]
+        if domain:
+            clauses.append(f"{scope}.scan_id IN (SELECT id FROM scans WHERE domain = ?)")
+            params.append(domain)
+            if source == "search_names n":
+                # Walk just that scan's names
+                source, order = "search_names n INDEXED BY search_names_scan", "n.scan_id, n.host, n.id"
+
+        sql = f"FROM {source} WHERE {' AND '.join(clauses)}"
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 {sql} LIMIT ?)", params + [SEARCH_COUNT_LIMIT]
+        ).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT n.scan_id, n.host, n.name {sql} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        scan_ids = sorted({row[0] for row in rows})
+        domains = dict(conn.execute(
+            f"SELECT id, domain FROM scans WHERE id IN ({', '.join('?' * len(scan_ids))})", scan_ids
+        )) if scan_ids else {}
+
+        if kind == "url":
+            return total, [{"domain": domains[scan_id], "scan_id": scan_id, "host": host, "url": name}
+                           for scan_id, host, name in rows]
+        found = _host_terms(conn, [(scan_id, host) for scan_id, host, _ in rows])
+        return total, [{"domain": domains[scan_id], "scan_id": scan_id, "host": host, **found[(scan_id, host)]}
+                       for scan_id, host, _ in rows]
+    finally:
+        if own:
+            conn.close()
+
+
+def fetch_column(sql, params=(), conn=None):
+    own = conn is None
+    conn = conn or connect()
+    try:
+        return [r[0] for r in conn.execute(sql, params)]
+    finally:
+        if own:
+            conn.close()
+
+
+def discover_domains(output_dir=None):
+    output_dir = output_dir or OUTPUT_DIR
+    suffixes = set(SUBDOMAIN_FILES.values()) | {
+        "naabu.json", "httpx.json", "urlfinder.json", "nuclei.json",
+        "vulnerabilities.json", "directory_fuzz.json", "emails.json"
+    }
+    domains = set()
+    for fname in os.listdir(output_dir):
+        if fname.endswith(compression.EXT):
+            fname = fname[:-len(compression.EXT)]
+        # Longest suffix first so "_overall_subdomain.txt" wins over "_subdomain.txt"
+        for suffix in sorted(suffixes, key=len, reverse=True):
+            if fname.endswith("_" + suffix):
+                domains.add(fname[:-len(suffix) - 1])
+                break
+    return sorted(domains)
+
+
+def reindex(conn):
+    """Rebuild the search index from the latest scan of every domain."""
+    with conn:
+        conn.execute("DELETE FROM search_terms")
+        conn.execute("DELETE FROM search_names")
+        conn.execute("DELETE FROM search_indexed")
+        conn.execute("INSERT INTO search_trigrams (search_trigrams) VALUES ('delete-all')")
+        rows = conn.execute(
+            "SELECT MAX(id), domain FROM scans WHERE finished_at IS NOT NULL GROUP BY domain"
+        ).fetchall()
+        for scan_id, domain in rows:
+            index_scan(conn, domain, scan_id)
+    return len(rows)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("--backfill", "--reindex"):
+        print("Usage: python3 store.py --backfill [domain ...]")
+        print("       python3 store.py --reindex")
+        sys.exit(1)
+
+    conn = connect()
+    try:
+        if sys.argv[1] == "--reindex":
+            print(f"[+] Indexed the latest scan of {reindex(conn)} domains")
+            return
+        for domain in sys.argv[2:] or discover_domains():
+            scan_id = ingest_outputs(domain, source="backfill", conn=conn)
+            print(f"[+] Imported {domain} as scan {scan_id}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
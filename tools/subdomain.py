@@ -1,18 +1,29 @@
 import os
 import sys
-import subprocess
+import csv
 import threading
-import time
+import heapq
 import shutil
+import tempfile
+
+from runner import silent_run
+import resolver
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
 ONEFORALL_DIR = os.path.join(BASE_DIR, "OneForAll")
 RESULTS_DIR = os.path.join(ONEFORALL_DIR, "results")
 
+# Pipeline stage declaration (see pipeline.py)
+STAGE_INPUTS = []
+STAGE_OUTPUTS = ["subfinder.txt", "oneforall.txt", "overall_subdomain.txt", "subdomain.txt"]
+STAGE_RESOURCE = "network"
+
+# Names held in memory per sorted run; bounds merge_outputs' peak memory
+MERGE_CHUNK_LINES = int(os.environ.get("RECON_MERGE_CHUNK_LINES", 200000))
 
-def silent_run(command, cwd=None, shell=False):
-    subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=shell)
+# "puredns", or "builtin" for the in-process cached resolver (resolver.py)
+RESOLVER = os.environ.get("RECON_RESOLVER", "puredns")
 
 
 def ensure_dirs():
@@ -21,45 +32,165 @@ def ensure_dirs():
 
 def run_subfinder(domain):
     out = os.path.join(OUTPUT_DIR, f"{domain}_subfinder.txt")
-    silent_run(["subfinder", "-d", domain, "-o", out])
+    silent_run(["subfinder", "-d", domain, "-o", out], domain=domain, stage="subfinder", output_file=out)
+
+
+def oneforall_csv_path(domain):
+    # Exported into the scan's own output dir rather than OneForAll's shared results/
+    return os.path.join(OUTPUT_DIR, f"{domain}_oneforall.csv")
 
 
 def run_oneforall(domain):
-    silent_run(["python3", "oneforall.py", "--target", domain, "run"], cwd=ONEFORALL_DIR)
+    csv_file = oneforall_csv_path(domain)
+    silent_run(["python3", "oneforall.py", "--target", domain, "--path", csv_file, "run"],
+               cwd=ONEFORALL_DIR, domain=domain, stage="oneforall", output_file=csv_file)
+
+
+def read_oneforall_csv(csv_file, column="subdomain", batch_rows=10000):
+    """Yield the `column` values of a OneForAll CSV as newline separated blocks."""
+    with open(csv_file, "r", newline="", errors="replace") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        try:
+            index = [h.strip().lower() for h in header].index(column)
+        except ValueError:
+            index = 5  # OneForAll's historical position of the subdomain column
+        batch = []
+        for row in reader:
+            if len(row) > index:
+                batch.append(row[index])
+            if len(batch) >= batch_rows:
+                yield "\n".join(batch) + "\n"
+                batch = []
+        if batch:
+            yield "\n".join(batch) + "\n"
 
 
 def extract_oneforall_subdomains(domain):
-    csv_file = os.path.join(RESULTS_DIR, f"{domain}.csv")
+    """Stream OneForAll's subdomains for merge_outputs, saving them to
+    {domain}_oneforall.txt on the way. Call once the OneForAll process has exited."""
+    csv_file = oneforall_csv_path(domain)
     output_file = os.path.join(OUTPUT_DIR, f"{domain}_oneforall.txt")
 
-    for _ in range(10):  # wait max 10 seconds
-        if os.path.isfile(csv_file):
-            break
-        time.sleep(1)
-    else:
+    if not os.path.isfile(csv_file):
+        csv_file = os.path.join(RESULTS_DIR, f"{domain}.csv")
+    if not os.path.isfile(csv_file):
         print(f"[!] OneForAll CSV not found: {csv_file}")
         return
 
-    # Extract subdomain column (6th)
-    cmd = f"cut -d',' -f6 '{csv_file}' | tail -n +2 | sort -u > '{output_file}'"
-    silent_run(cmd, shell=True)
+    with open(output_file, "w") as out:
+        for block in read_oneforall_csv(csv_file):
+            out.write(block)
+            yield block
 
 
-def merge_outputs(domain):
-    paths = [
-        os.path.join(OUTPUT_DIR, f"{domain}_subfinder.txt"),
-        os.path.join(OUTPUT_DIR, f"{domain}_oneforall.txt")
-    ]
-    combined_file = os.path.join(OUTPUT_DIR, f"{domain}_overall_subdomain.txt")
+def normalise_name(name):
+    """Lowercase a subdomain and strip whitespace, trailing dots and wildcard labels."""
+    name = name.strip().lower().rstrip(".")
+    while name.startswith("*."):
+        name = name[2:]
+    return name
+
+
+def split_names(text):
+    """Normalised names from a block of newline separated names."""
+    text = text.lower()
+    names = text.split()
+    # Only pay for per-name cleanup when the block needs it
+    if "*" in text or "." in text[-1:] or ".\n" in text or ".\r" in text:
+        names = [normalise_name(name) for name in names]
+    return names
+
+
+def write_run(names, workdir):
+    fd, path = tempfile.mkstemp(dir=workdir, suffix=".run")
+    with os.fdopen(fd, "w") as f:
+        write_sorted(f, names)
+    return path
+
+
+def write_sorted(f, names):
+    names = sorted(names)
+    if names:
+        f.write("\n".join(names))
+        f.write("\n")
+
+
+def merge_names(sources, combined_file, chunk_lines=MERGE_CHUNK_LINES):
+    """External-sort the names from `sources` (iterables of text blocks, see
+    read_blocks) into combined_file, deduplicated. About chunk_lines names are
+    held in memory at a time; larger inputs are spilled to sorted runs and
+    k-way merged."""
+    chunk = set()
+    runs = []
+    workdir = None
+    tmp = combined_file + ".tmp"
+    try:
+        for source in sources:
+            for block in source:
+                chunk.update(split_names(block))
+                if len(chunk) >= chunk_lines:
+                    workdir = workdir or tempfile.mkdtemp(prefix="subdomain_merge_",
+                                                          dir=os.path.dirname(combined_file))
+                    runs.append(write_run(chunk, workdir))
+                    chunk = set()
+        chunk.discard("")
 
-    subdomains = set()
-    for path in paths:
-        if os.path.exists(path):
-            with open(path, "r") as f:
-                subdomains.update(line.strip() for line in f if line.strip())
+        with open(tmp, "w") as out:
+            if not runs:
+                write_sorted(out, chunk)
+            else:
+                if chunk:
+                    runs.append(write_run(chunk, workdir))
+                    chunk = set()
+                handles = [open(path, "r", buffering=1 << 16) for path in runs]
+                try:
+                    previous = None
+                    for line in heapq.merge(*handles):
+                        if line != previous and line != "\n":
+                            out.write(line)
+                            previous = line
+                finally:
+                    for handle in handles:
+                        handle.close()
+        os.replace(tmp, combined_file)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
 
-    with open(combined_file, "w") as f:
-        f.writelines(f"{sub}\n" for sub in sorted(subdomains))
+
+def read_blocks(path, size=1 << 20):
+    """Yield a text file in roughly `size` character blocks split on line boundaries."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", errors="replace") as f:
+        rest = ""
+        while True:
+            block = f.read(size)
+            if not block:
+                break
+            block = rest + block
+            cut = block.rfind("\n") + 1
+            rest = block[cut:]
+            if cut:
+                yield block[:cut]
+        if rest:
+            yield rest
+
+
+def merge_outputs(domain, oneforall=None):
+    """Merge subfinder's and OneForAll's names into _overall_subdomain.txt.
+    `oneforall` is a stream from extract_oneforall_subdomains; without one
+    the saved _oneforall.txt is read instead."""
+    if oneforall is None:
+        oneforall = read_blocks(os.path.join(OUTPUT_DIR, f"{domain}_oneforall.txt"))
+    sources = [read_blocks(os.path.join(OUTPUT_DIR, f"{domain}_subfinder.txt")), oneforall]
+    combined_file = os.path.join(OUTPUT_DIR, f"{domain}_overall_subdomain.txt")
+    merge_names(sources, combined_file)
 
 
 def resolve_with_puredns(domain):
@@ -67,15 +198,48 @@ def resolve_with_puredns(domain):
     output_file = os.path.join(OUTPUT_DIR, f"{domain}_subdomain.txt")
 
     if os.path.isfile(input_file):
-        silent_run(["puredns", "resolve", input_file, "-w", output_file])
+        silent_run(["puredns", "resolve", input_file, "-w", output_file],
+                   domain=domain, stage="puredns", input_file=input_file, output_file=output_file)
 
         # Append root domain as it always resolves
         with open(output_file, "a") as f:
             f.write(f"{domain}\n")
 
 
-def clean_oneforall_results():
+def resolve_builtin(domain):
+    input_file = os.path.join(OUTPUT_DIR, f"{domain}_overall_subdomain.txt")
+    output_file = os.path.join(OUTPUT_DIR, f"{domain}_subdomain.txt")
+
+    if os.path.isfile(input_file):
+        stats = resolver.resolve_file(domain, input_file, output_file)
+        print(f"[+] Resolved {stats.get('resolved', 0)} names, dropped {stats.get('wildcard', 0)} "
+              f"wildcard hits ({stats.get('cache_hits', 0)} cache hits)")
+
+        with open(output_file, "a") as f:
+            f.write(f"{domain}\n")
+
+
+def resolve_subdomains(domain):
+    if RESOLVER == "builtin":
+        resolve_builtin(domain)
+    else:
+        resolve_with_puredns(domain)
+
+
+def clean_oneforall_results(domain):
+    """Remove this domain's OneForAll files, leaving other scans' results alone."""
+    try:
+        os.remove(oneforall_csv_path(domain))
+    except OSError:
+        pass
+    if not os.path.isdir(RESULTS_DIR):
+        return
     for item in os.listdir(RESULTS_DIR):
+        # Exact names only: "example.com.au.csv" belongs to another scan. No
+        # other domain can start with "example.com_"
+        if not (item in (domain, f"{domain}.csv", f"{domain}.json", f"{domain}.txt")
+                or item.startswith(f"{domain}_")):
+            continue
         path = os.path.join(RESULTS_DIR, item)
         try:
             if os.path.isfile(path):
@@ -89,7 +253,8 @@ def clean_oneforall_results():
 def main(domain):
     ensure_dirs()
 
-    # Run subfinder & oneforall concurrently
+    # Run subfinder & oneforall concurrently; both have exited once joined,
+    # so OneForAll's CSV is complete and can be streamed into the merge
     threads = [
         threading.Thread(target=run_subfinder, args=(domain,)),
         threading.Thread(target=run_oneforall, args=(domain,))
@@ -97,10 +262,9 @@ def main(domain):
     [t.start() for t in threads]
     [t.join() for t in threads]
 
-    extract_oneforall_subdomains(domain)
-    merge_outputs(domain)
-    resolve_with_puredns(domain)
-    clean_oneforall_results()
+    merge_outputs(domain, extract_oneforall_subdomains(domain))
+    resolve_subdomains(domain)
+    clean_oneforall_results(domain)
 
 
 if __name__ == "__main__":
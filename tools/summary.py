@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+from collections import Counter
+
+import records
+import compression
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
+
+# Outputs a summary is built from; written by run_all once the pipeline is
+# done (not as a stage) so a scan with failed stages still gets one
+SOURCES = [
+    "overall_subdomain.txt", "subdomain.txt", "naabu.json", "httpx.json", "urlfinder.json",
+    "nuclei.json", "vulnerabilities.json", "directory_fuzz.json", "emails.json"
+]
+
+# Items kept per section for the results page; the rest is paged in from the API
+PREVIEW = int(os.environ.get("RECON_SUMMARY_PREVIEW", 200))
+# Hosts shown in the per-host port chart, and technologies in the tech histogram
+CHART_HOSTS = 50
+TOP_TECH = 50
+
+# section -> (output file suffix, records iterator)
+SECTIONS = {
+    "active_subdomains": ("subdomain.txt", records.iter_subdomains),
+    "all_subdomains": ("overall_subdomain.txt", records.iter_subdomains),
+    "open_ports": ("naabu.json", records.iter_ports),
+    "httpx": ("httpx.json", records.iter_http),
+    "endpoints": ("urlfinder.json", records.iter_endpoints),
+    "directories": ("directory_fuzz.json", records.iter_dirs),
+    "fuzzing_vulns": ("vulnerabilities.json", records.iter_dast_findings),
+    "nuclei_vulns": ("nuclei.json", records.iter_findings),
+}
+
+
+def source_mtimes(domain, output_dir):
+    """{suffix: mtime_ns} of the outputs a summary is built from, None when
+    missing. Publishing keeps mtimes (compressed or not), so a summary built
+    in the scan workspace still matches the files in Outputs/."""
+    mtimes = {}
+    for suffix in SOURCES:
+        try:
+            mtimes[suffix] = os.stat(compression.resolve(os.path.join(output_dir, f"{domain}_{suffix}"))).st_mtime_ns
+        except OSError:
+            mtimes[suffix] = None
+    return mtimes
+
+
+def is_fresh(doc, domain, output_dir):
+    """Whether no output has been written since doc was built."""
+    return bool(doc) and doc.get("sources") == source_mtimes(domain, output_dir)
+
+
+def preview_item(record):
+    return str(record) if isinstance(record, (str, records.Subdomain)) else record.as_dict()
+
+
+def summarize(sections, emails=()):
+    """Counts, histograms and preview slices in one pass over each section's
+    records. sections maps a SECTIONS name to any iterable of records."""
+    counts = {}
+    preview = {}
+    severity = {}
+    ports = Counter()
+    ip_ports = {}
+    host_ports = {}
+    tech = Counter()
+    status = Counter()
+
+    for name, items in sections.items():
+        count = 0
+        head = []
+        by_severity = Counter()
+        for record in items:
+            if count < PREVIEW:
+                head.append(preview_item(record))
+            count += 1
+            if name in ("fuzzing_vulns", "nuclei_vulns"):
+                by_severity[record.severity or "unknown"] += 1
+            elif name == "open_ports" and record.port is not None:
+                ports[str(record.port)] += 1
+                if record.ip:
+                    ip_ports.setdefault(record.ip, set()).add(record.port)
+                if record.host:
+                    host_ports.setdefault(record.host, set()).add(record.port)
+            elif name == "httpx":
+                tech.update(record.tech or ())
+                if record.status_code:
+                    status[str(record.status_code)] += 1
+        counts[name] = count
+        preview[name] = head
+        if name in ("fuzzing_vulns", "nuclei_vulns"):
+            severity[name] = dict(by_severity.most_common())
+
+    emails = list(emails)
+    counts["emails"] = len(emails)
+    preview["emails"] = emails[:PREVIEW]
+
+    busiest = sorted(host_ports, key=lambda host: len(host_ports[host]), reverse=True)[:CHART_HOSTS]
+    return {
+        "generated_at": time.time(),
+        "counts": counts,
+        "severity": severity,
+        "ports": dict(sorted(ports.items(), key=lambda item: int(item[0]) if item[0].isdigit() else 0)),
+        "ip_ports": {ip: len(found) for ip, found in ip_ports.items()},
+        "host_ports": {host: sorted(host_ports[host], key=str) for host in busiest},
+        "tech": tech.most_common(TOP_TECH),
+        "status": dict(status.most_common()),
+        "preview": preview,
+    }
+
+
+def read_emails(path):
+    try:
+        with compression.open_text(path) as f:
+            return json.load(f).get("emails", [])
+    except (OSError, ValueError, AttributeError):
+        return []
+
+
+def iter_section(path, iterate):
+    try:
+        yield from iterate(path)
+    except FileNotFoundError:
+        return
+
+
+def build_summary(domain, output_dir=None):
+    """The summary document for domain's outputs in output_dir."""
+    output_dir = output_dir or OUTPUT_DIR
+    sources = source_mtimes(domain, output_dir)
+
+    def path(suffix):
+        return compression.resolve(os.path.join(output_dir, f"{domain}_{suffix}"))
+
+    sections = {name: iter_section(path(suffix), iterate) for name, (suffix, iterate) in SECTIONS.items()}
+    doc = summarize(sections, read_emails(path("emails.json")))
+    doc["domain"] = domain
+    doc["sources"] = sources
+    return doc
+
+
+def write_summary(domain, output_dir=None):
+    output_dir = output_dir or OUTPUT_DIR
+    doc = build_summary(domain, output_dir)
+    output_file = os.path.join(output_dir, f"{domain}_summary.json")
+    tmp = output_file + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(doc, f, separators=(",", ":"))
+    os.replace(tmp, output_file)
+    return output_file
+
+
+def load_summary(domain, output_dir=None):
+    """The stored summary for domain if it is still in step with its outputs."""
+    output_dir = output_dir or OUTPUT_DIR
+    try:
+        with open(os.path.join(output_dir, f"{domain}_summary.json"), "r") as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return doc if is_fresh(doc, domain, output_dir) else None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 summary.py <domain> [domain ...]")
+        sys.exit(1)
+
+    # Rebuild summaries for outputs produced before summaries existed
+    for domain in sys.argv[1:]:
+        print(f"[+] Wrote {write_summary(domain)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 import os
 import sys
-import subprocess
 import json
 
+from runner import silent_run
+
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
 
-def silent_run(command):
-    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+# Pipeline stage declaration (see pipeline.py)
+STAGE_INPUTS = []
+STAGE_OUTPUTS = ["emails.json"]
+STAGE_RESOURCE = "network"
 
 def extract_emails_to_json(json_file, output_file):
     try:
@@ -25,17 +28,18 @@ def extract_emails_to_json(json_file, output_file):
 def run_theharvester(domain):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    result_file = os.path.join(BASE_DIR, "results.json")
+    # Per-domain name so concurrent scans don't share theHarvester's output
+    result_file = os.path.join(OUTPUT_DIR, f"{domain}_theharvester.json")
     email_output_file = os.path.join(OUTPUT_DIR, f"{domain}_emails.json")
 
     command = [
         "theharvester",
         "-d", domain,
         "-b", "all",
-        "-f", result_file.replace(".json", "")
+        "-f", os.path.splitext(result_file)[0]
     ]
 
-    silent_run(command)
+    silent_run(command, domain=domain, stage="theharvester", output_file=result_file)
     extract_emails_to_json(result_file, email_output_file)
 
     # Optionally clean up
@@ -44,7 +48,7 @@ def run_theharvester(domain):
     except FileNotFoundError:
         pass
 
-    xml_file = os.path.join(BASE_DIR, "results.xml")
+    xml_file = os.path.splitext(result_file)[0] + ".xml"
     try:
         os.remove(xml_file)
     except FileNotFoundError:
@@ -0,0 +1,128 @@
+import re
+import sys
+import json
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Extensions nuclei -dast has nothing to inject into
+STATIC_EXTENSIONS = {
+    "css", "js", "mjs", "map", "png", "jpg", "jpeg", "gif", "svg", "ico", "webp", "bmp", "tif", "tiff",
+    "woff", "woff2", "ttf", "otf", "eot", "mp3", "mp4", "m4a", "avi", "mov", "webm", "ogg", "wav",
+    "flv", "pdf", "zip", "gz", "tgz", "rar", "7z", "tar", "bz2", "exe", "dmg", "iso", "swf",
+    "doc", "docx", "xls", "xlsx", "ppt", "pptx", "txt", "csv", "xml", "rss", "atom",
+}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Path segments that vary per object rather than per endpoint, most specific first
+SEGMENT_PATTERNS = [
+    (re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I), "{uuid}"),
+    (re.compile(r"^\d+$"), "{int}"),
+    (re.compile(r"^[0-9a-f]{16,}$", re.I), "{hex}"),
+    (re.compile(r"^\d{4}-\d{2}-\d{2}$"), "{date}"),
+    (re.compile(r"^(?=.*\d)[A-Za-z0-9_\-]{20,}$"), "{token}"),
+]
+
+
+def canonicalise(url):
+    """Canonical form of url, or None if it is not an http(s) URL. Lowercases
+    scheme and host, drops default ports, fragments and empty path segments,
+    and sorts query parameters."""
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if scheme not in DEFAULT_PORTS or not host:
+        return None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def is_static(path):
+    name = path.rsplit("/", 1)[-1]
+    return "." in name and name.rsplit(".", 1)[-1].lower() in STATIC_EXTENSIONS
+
+
+def path_template(path):
+    segments = []
+    for segment in path.split("/"):
+        for pattern, placeholder in SEGMENT_PATTERNS:
+            if pattern.match(segment):
+                segment = placeholder
+                break
+        segments.append(segment)
+    return "/".join(segments)
+
+
+def cluster_key(url):
+    """(scheme, host, path template, parameter names) for a canonical URL."""
+    parts = urlsplit(url)
+    params = tuple(sorted({name for name, _ in parse_qsl(parts.query, keep_blank_values=True)}))
+    return parts.scheme, parts.netloc, path_template(parts.path), params
+
+
+def cluster_urls(urls):
+    """Yield one representative per (host, path template, parameter set)
+    cluster, in first-seen order. Returns the counts via StopIteration."""
+    stats = {"input": 0, "invalid": 0, "static": 0, "duplicate": 0, "clusters": 0}
+    seen = set()
+    for url in urls:
+        stats["input"] += 1
+        url = canonicalise(url)
+        if url is None:
+            stats["invalid"] += 1
+            continue
+        if is_static(urlsplit(url).path):
+            stats["static"] += 1
+            continue
+        key = cluster_key(url)
+        if key in seen:
+            stats["duplicate"] += 1
+            continue
+        seen.add(key)
+        stats["clusters"] += 1
+        yield url
+    return stats
+
+
+def urls_from_urlfinder(path):
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                url = json.loads(line).get("url")
+            except (json.JSONDecodeError, AttributeError):
+                continue
+            if url:
+                yield url
+
+
+def reduce_file(urlfinder_file, output_file):
+    """Write the cluster representatives of a _urlfinder.json to output_file
+    (one URL per line) and return the counts plus the reduction ratio."""
+    reps = cluster_urls(urls_from_urlfinder(urlfinder_file))
+    with open(output_file, "w") as out:
+        while True:
+            try:
+                out.write(next(reps) + "\n")
+            except StopIteration as stop:
+                stats = stop.value
+                break
+    stats["reduction"] = round(1 - stats["clusters"] / stats["input"], 4) if stats["input"] else 0.0
+    return stats
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python3 urlcluster.py <urlfinder_json> <output_txt>")
+        sys.exit(1)
+
+    stats = reduce_file(sys.argv[1], sys.argv[2])
+    print(f"[+] {stats['input']} URLs -> {stats['clusters']} DAST targets "
+          f"({stats['reduction']:.1%} fewer; {stats['static']} static, {stats['duplicate']} clustered)")
+
+
+if __name__ == "__main__":
+    main()
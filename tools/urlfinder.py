@@ -1,12 +1,15 @@
 import os
 import sys
-import subprocess
+
+from runner import silent_run
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
 
-def silent_run(command):
-    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+# Pipeline stage declaration (see pipeline.py)
+STAGE_INPUTS = []
+STAGE_OUTPUTS = ["urlfinder.json"]
+STAGE_RESOURCE = "network"
 
 def run_urlfinder(domain):
     output_file = os.path.join(OUTPUT_DIR, f"{domain}_urlfinder.json")
@@ -21,7 +24,7 @@ def run_urlfinder(domain):
         "-silent"
     ]
 
-    silent_run(command)
+    silent_run(command, domain=domain, stage="urlfinder", output_file=output_file)
 
 def main():
     if len(sys.argv) != 2:
@@ -0,0 +1,136 @@
+import os
+import sys
+import shutil
+import tempfile
+import importlib
+from contextlib import contextmanager
+
+import compression
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Outputs")
+
+# Kept under Outputs/ by default so publishing is a same-filesystem rename
+WORK_ROOT = os.environ.get("RECON_WORK_DIR", os.path.join(OUTPUT_DIR, ".work"))
+
+# Modules whose OUTPUT_DIR a workspace redirects while a scan runs
+BOUND_MODULES = [
+    "subdomain", "urlfinder", "naabu", "httpx", "theharvester_email", "gobuster_fuzz",
+    "nuclei_dast", "nuclei", "incremental", "batch", "pipeline", "runner", "store",
+    "summary",
+]
+
+# Previous outputs an incremental rescan diffs against and merges into
+CARRY_OVER = ["scan_state.json", "naabu.json", "httpx.json", "nuclei.json"]
+
+# The web UI treats {domain}_subdomain.txt as "results exist", so it goes last
+PUBLISH_LAST = "subdomain.txt"
+
+
+def create(name):
+    """Make a fresh scratch directory for one scan."""
+    os.makedirs(WORK_ROOT, exist_ok=True)
+    path = tempfile.mkdtemp(prefix=f"{name}_", dir=WORK_ROOT)
+    os.makedirs(os.path.join(path, "tmp"))
+    return path
+
+
+def seed(domain, path, carry_over):
+    """Copy domain's published outputs with the given suffixes into a workspace."""
+    for suffix in carry_over:
+        src = compression.resolve(os.path.join(OUTPUT_DIR, f"{domain}_{suffix}"))
+        dst = os.path.join(path, f"{domain}_{suffix}")
+        if not os.path.isfile(src):
+            continue
+        if src.endswith(compression.EXT):
+            compression.decompress_file(src, dst)
+        else:
+            shutil.copy2(src, dst)
+
+
+def bind(path):
+    """Point every tool module (and tempfile) at path; returns the previous
+    bindings for unbind. Bindings are per process, so a process runs one
+    scan at a time - the job manager's workers already do."""
+    previous = {"tempfile": tempfile.tempdir}
+    for name in BOUND_MODULES:
+        module = sys.modules.get(name) or importlib.import_module(name)
+        previous[name] = module.OUTPUT_DIR
+        module.OUTPUT_DIR = path
+    tempfile.tempdir = os.path.join(path, "tmp")
+    return previous
+
+
+def unbind(previous):
+    tempfile.tempdir = previous.pop("tempfile")
+    for name, output_dir in previous.items():
+        sys.modules[name].OUTPUT_DIR = output_dir
+
+
+def move(src, dst):
+    try:
+        os.replace(src, dst)
+    except OSError:
+        # Workspace on another filesystem: copy next to dst, then rename
+        tmp = dst + ".publish"
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+
+
+def publish(domain, path):
+    """Move the scan's {domain}_* files into Outputs/, each replaced atomically.
+    Tool outputs are gzipped on the way (see compression.py)."""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    names = [
+        name for name in os.listdir(path)
+        if name.startswith(f"{domain}_") and os.path.isfile(os.path.join(path, name))
+    ]
+    names.sort(key=lambda name: name == f"{domain}_{PUBLISH_LAST}")
+    for name in names:
+        src = os.path.join(path, name)
+        if compression.ENABLED and compression.should_compress(name):
+            src = compression.compress_file(src)
+            name += compression.EXT
+        dst = os.path.join(OUTPUT_DIR, name)
+        move(src, dst)
+        compression.remove_stale(dst)
+    return names
+
+
+def discard(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def scan_workspace(*domains, carry_over=()):
+    """Run the body against a private workspace and publish each domain's
+    outputs when it completes; on an exception nothing is published."""
+    path = create(domains[0] if len(domains) == 1 else "batch")
+    for domain in domains:
+        seed(domain, path, carry_over)
+    previous = bind(path)
+    try:
+        yield path
+        unbind(previous)
+        previous = None
+        for domain in domains:
+            publish(domain, path)
+    finally:
+        if previous is not None:
+            unbind(previous)
+        discard(path)
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] != "--clean":
+        print("Usage: python3 workspace.py --clean")
+        sys.exit(1)
+
+    # Remove workspaces left behind by killed scans; run while no scan is active
+    if os.path.isdir(WORK_ROOT):
+        for name in os.listdir(WORK_ROOT):
+            discard(os.path.join(WORK_ROOT, name))
+
+
+if __name__ == "__main__":
+    main()